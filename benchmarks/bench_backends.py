@@ -0,0 +1,119 @@
+"""
+Conformance and throughput of the DronePhysicsBatch compute backends.
+
+Every available backend first flies the same random sticks from the same
+random states (some drones starting near the ground, some with nearly
+empty batteries) and is compared with DronePhysics flying each drone on
+its own; the script exits with status 1 if any state differs by more than
+the tolerance. Then each
+backend is timed for several batch sizes and the fastest per size is named,
+which is the backend to configure (DRONE_PHYSICS_BACKEND) for fields of
+that size.
+
+Run from the repository root:
+    python -m benchmarks.bench_backends
+    python -m benchmarks.bench_backends --drones 1 10 100 1000 --tolerance 1e-9
+"""
+import argparse
+import sys
+import time
+import numpy as np
+
+from physics.backends import BACKENDS, available_backends
+from physics.drone_physics import DronePhysics
+from physics.drone_physics_batch import DronePhysicsBatch
+
+STATE_FIELDS = ('position', 'velocity', 'acceleration', 'rotation', 'angular_velocity', 'motor_forces',
+                'battery_remaining', 'power_consumption_rate')
+
+
+def random_drones(count, rng):
+    """Drones in varied states, covering ground contact and battery cut-off."""
+    drones = []
+    for i in range(count):
+        drone = DronePhysics()
+        drone.position = rng.uniform(-10, 10, 3)
+        drone.position[2] = rng.uniform(0.1, 0.5) if i % 4 == 0 else rng.uniform(1.0, 10.0)
+        drone.velocity = rng.uniform(-5, 5, 3)
+        drone.rotation = rng.uniform(-0.5, 0.5, 3)
+        drone.angular_velocity = rng.uniform(-2, 2, 3)
+        drone.mass = rng.uniform(0.3, 0.8)
+        if i % 8 == 1:
+            drone.battery_remaining = 0.5
+        drones.append(drone)
+    return drones
+
+
+def random_batch(backend, count, rng):
+    """A batch of random_drones() on the given backend."""
+    batch = DronePhysicsBatch.from_drones(random_drones(count, rng))
+    batch.backend = BACKENDS[backend]()
+    return batch
+
+
+def conformance(backend, count=32, steps=300, seed=0):
+    """Largest difference per state field between backend and DronePhysics flying each drone on its own."""
+    rng = np.random.default_rng(seed)
+    drones = random_drones(count, rng)
+    batch = DronePhysicsBatch.from_drones(drones)
+    batch.backend = BACKENDS[backend]()
+    sticks = rng.uniform(-1, 1, (steps, 4, count))
+    for throttle, roll, pitch, yaw in sticks:
+        batch.apply_controller_input(throttle, roll, pitch, yaw)
+        batch.update()
+        for i, drone in enumerate(drones):
+            drone.apply_controller_input(throttle[i], roll[i], pitch[i], yaw[i])
+            drone.update()
+    return {name: float(np.abs(getattr(batch, name) - [getattr(drone, name) for drone in drones]).max())
+            for name in STATE_FIELDS}
+
+
+def throughput(backend, count, min_time=0.2):
+    """Batch ticks per second, after a warm-up tick (which includes any JIT compilation)."""
+    batch = random_batch(backend, count, np.random.default_rng(0))
+    batch.apply_controller_input(-0.2, 0.05, -0.05, 0.02)
+    batch.update()
+    ticks = 0
+    start = time.perf_counter()
+    while True:
+        for _ in range(10):
+            batch.apply_controller_input(-0.2, 0.05, -0.05, 0.02)
+            batch.update()
+        ticks += 10
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return ticks / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Physics backend conformance and throughput")
+    parser.add_argument('--drones', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--tolerance', type=float, default=1e-9, help="largest allowed state difference")
+    args = parser.parse_args()
+
+    backends = available_backends()
+    missing = [name for name in BACKENDS if name not in backends]
+    print(f"Backends: {', '.join(backends)}" + (f" (not installed: {', '.join(missing)})" if missing else ""))
+
+    failed = False
+    for backend in backends:
+        differences = conformance(backend)
+        worst = max(differences, key=differences.get)
+        ok = differences[worst] <= args.tolerance
+        failed |= not ok
+        print(f"{backend:>8} vs DronePhysics: max difference {differences[worst]:.3e} ({worst}) "
+              f"{'ok' if ok else 'FAILED'}")
+
+    print(f"\n{'drones':>8}" + "".join(f"{name:>16}" for name in backends) + "   fastest")
+    for count in args.drones:
+        rates = {name: throughput(name, count) for name in backends}
+        fastest = max(rates, key=rates.get)
+        print(f"{count:>8}" + "".join(f"{rates[name] * count:>11.0f} d/s" for name in backends) + f"   {fastest}")
+    print("(d/s: drone-steps per second)")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compare aggregate physics throughput of N independent DronePhysics objects
+against a single DronePhysicsBatch holding N drones.
+
+Run from the repository root:
+    python -m benchmarks.bench_batch_physics --drones 1000
+"""
+import argparse
+import time
+import numpy as np
+
+from physics.drone_physics import DronePhysics
+from physics.drone_physics_batch import DronePhysicsBatch
+
+
+def bench_single(count, steps):
+    drones = [DronePhysics() for _ in range(count)]
+    start = time.perf_counter()
+    for _ in range(steps):
+        for drone in drones:
+            drone.apply_controller_input(0.1, 0.05, -0.05, 0.0)
+            drone.update()
+    elapsed = time.perf_counter() - start
+    return count * steps / elapsed
+
+
+def bench_batch(count, steps):
+    batch = DronePhysicsBatch(count)
+    start = time.perf_counter()
+    for _ in range(steps):
+        batch.apply_controller_input(0.1, 0.05, -0.05, 0.0)
+        batch.update()
+    elapsed = time.perf_counter() - start
+    return count * steps / elapsed
+
+
+def check_equivalence(count=32, steps=500, seed=0):
+    """
+    Return the largest absolute state difference between the batch and per-drone models.
+    """
+    rng = np.random.default_rng(seed)
+    drones = [DronePhysics() for _ in range(count)]
+    for drone in drones:
+        drone.velocity = rng.uniform(-5, 5, 3)
+        drone.angular_velocity = rng.uniform(-2, 2, 3)
+    batch = DronePhysicsBatch.from_drones(drones)
+
+    for _ in range(steps):
+        sticks = rng.uniform(-1, 1, (count, 4))
+        for drone, (throttle, roll, pitch, yaw) in zip(drones, sticks):
+            drone.apply_controller_input(throttle, roll, pitch, yaw)
+            drone.update()
+        batch.apply_controller_input(*sticks.T)
+        batch.update()
+
+    error = 0.0
+    for name in ('position', 'velocity', 'rotation', 'angular_velocity', 'motor_forces'):
+        single = np.array([getattr(drone, name) for drone in drones])
+        error = max(error, float(np.abs(single - getattr(batch, name)).max()))
+    return error
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched physics throughput benchmark")
+    parser.add_argument('--drones', type=int, default=1000)
+    parser.add_argument('--steps', type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"Max state difference (batch vs single): {check_equivalence():.3e}")
+
+    # The per-object loop is slow, so measure it on fewer steps
+    single = bench_single(args.drones, max(1, args.steps // 10))
+    batch = bench_batch(args.drones, args.steps)
+    print(f"DronePhysics loop:   {single:12.0f} drone-steps/s")
+    print(f"DronePhysicsBatch:   {batch:12.0f} drone-steps/s")
+    print(f"Speedup:             {batch / single:12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Per-tick gate collision cost as the course grows.
+
+Compares the original per-gate DroneGate.check_collision loop with the
+grid-indexed GateCollisionIndex on random courses of increasing size
+(constant gate density), and checks both report the same gate.
+
+Run from the repository root:
+    python -m benchmarks.bench_collisions
+"""
+import argparse
+import math
+import time
+import numpy as np
+
+from environment.gate import DroneGate
+from environment.collision import GateCollisionIndex
+
+GATE_COUNTS = (10, 100, 500, 1000, 5000)
+DRONE_SIZE = 0.25
+
+
+def make_course(count, rng, spacing=15.0):
+    """Random gates at roughly constant density: one per spacing x spacing m²."""
+    side = math.sqrt(count) * spacing
+    gates = []
+    for _ in range(count):
+        x, y = rng.uniform(-side / 2, side / 2, 2)
+        gates.append(DroneGate([x, y, rng.uniform(3.0, 8.0)], size=3.0, rotation=rng.uniform(0, 360)))
+    return gates, side
+
+
+def sample_positions(gates, side, rng, count):
+    """Half the samples near gate bars (likely hits), half anywhere on the course."""
+    positions = rng.uniform(-side / 2, side / 2, (count, 3))
+    positions[:, 2] = rng.uniform(0.5, 10.0, count)
+    for i in range(0, count, 2):
+        gate = gates[rng.integers(len(gates))]
+        positions[i] = gate.position + rng.uniform(-1.8, 1.8, 3) * (1, 1, 0.3)
+    return positions
+
+
+def first_hit_loop(gates, position):
+    for index, gate in enumerate(gates):
+        if gate.check_collision(position, DRONE_SIZE):
+            return index
+    return -1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gate collision scaling benchmark")
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--loop-limit', type=int, default=1000,
+                        help="skip the slow per-gate loop above this many gates")
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    print(f"{'gates':>7} {'loop us/tick':>13} {'index us/tick':>14} {'hits':>6} {'agree':>6}")
+    for count in GATE_COUNTS:
+        gates, side = make_course(count, rng)
+        positions = sample_positions(gates, side, rng, args.queries)
+        index = GateCollisionIndex(gates)
+
+        start = time.perf_counter()
+        indexed = [index.query(p, DRONE_SIZE) for p in positions]
+        index_us = (time.perf_counter() - start) / len(positions) * 1e6
+
+        if count <= args.loop_limit:
+            start = time.perf_counter()
+            looped = [first_hit_loop(gates, p) for p in positions]
+            loop_us = f"{(time.perf_counter() - start) / len(positions) * 1e6:13.1f}"
+            agree = str(looped == indexed)
+        else:
+            loop_us, agree = f"{'-':>13}", '-'
+
+        hits = sum(i >= 0 for i in indexed)
+        print(f"{count:7d} {loop_us} {index_us:14.1f} {hits:6d} {agree:>6}")
+
+
+if __name__ == "__main__":
+    main()
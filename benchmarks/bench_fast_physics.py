@@ -0,0 +1,79 @@
+"""
+Single-drone step latency of DronePhysics vs FastDronePhysics.
+
+Both models first fly the same random sticks; the script exits with status
+1 if any state differs by more than the tolerance. DronePhysics' matmuls
+round differently from the written-out sums of FastDronePhysics, so the
+states agree to rounding, not to the last bit.
+
+Run from the repository root:
+    python -m benchmarks.bench_fast_physics
+"""
+import argparse
+import sys
+import time
+import numpy as np
+
+from physics.drone_physics import DronePhysics
+from physics.fast_physics import FastDronePhysics
+
+STATE_FIELDS = ('position', 'velocity', 'acceleration', 'rotation', 'angular_velocity', 'motor_forces')
+
+
+def step_latency(cls, steps):
+    """Mean wall-clock microseconds per apply_controller_input + update"""
+    drone = cls()
+    start = time.perf_counter()
+    for _ in range(steps):
+        drone.apply_controller_input(-0.2, 0.05, -0.05, 0.02)
+        drone.update()
+    return (time.perf_counter() - start) / steps * 1e6
+
+
+def compare(steps=1000, flights=10, seed=0):
+    """
+    Fly both implementations with the same random sticks. Returns the number of
+    ticks whose state was bit-identical, the number of ticks and the largest
+    difference seen. Every other flight starts low, so ground contacts are
+    covered too.
+    """
+    rng = np.random.default_rng(seed)
+    identical = 0
+    max_difference = 0.0
+    for flight in range(flights):
+        reference, fast = DronePhysics(), FastDronePhysics()
+        if flight % 2:
+            reference.position[2] = fast.position[2] = 0.5
+        for _ in range(steps):
+            sticks = rng.uniform(-1, 1, 4) * (1.0, 0.3, 0.3, 0.3) + (-0.25, 0.0, 0.0, 0.0)
+            for drone in (reference, fast):
+                drone.apply_controller_input(*sticks)
+                drone.update()
+            differences = [np.abs(getattr(reference, f) - getattr(fast, f)).max() for f in STATE_FIELDS]
+            differences.append(abs(reference.battery_remaining - fast.battery_remaining))
+            max_difference = max(max_difference, *differences)
+            identical += not any(differences)
+    return identical, steps * flights, max_difference
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-drone physics step latency")
+    parser.add_argument('--steps', type=int, default=20000)
+    parser.add_argument('--tolerance', type=float, default=1e-9, help="largest allowed state difference")
+    args = parser.parse_args()
+
+    identical, total, max_difference = compare()
+    print(f"Bit-identical ticks: {identical}/{total}, max difference {max_difference:.3e}")
+    if max_difference > args.tolerance:
+        print(f"FastDronePhysics differs from DronePhysics by more than {args.tolerance:g}")
+        sys.exit(1)
+
+    baseline = step_latency(DronePhysics, args.steps)
+    fast = step_latency(FastDronePhysics, args.steps)
+    print(f"DronePhysics:      {baseline:8.2f} us/step")
+    print(f"FastDronePhysics:  {fast:8.2f} us/step")
+    print(f"Speedup:           {baseline / fast:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Accuracy-vs-cost benchmark for the attitude integrators.
+
+Every integrator/time-step combination flies the same scripted manoeuvre
+(including a full roll flip) high above the ground. Trajectory error is
+measured against a fine-step RK4 reference, and cost is reported as CPU
+seconds per simulated second.
+
+Run from the repository root:
+    python -m benchmarks.bench_integrators --plot integrators.png
+"""
+import argparse
+import time
+import numpy as np
+
+from physics.drone_physics import DronePhysics
+from physics.quaternion_physics import QuaternionDronePhysics
+
+# Inputs change every 0.1 s so every tested dt samples them identically
+INPUT_PERIOD = 0.1
+DURATION = 4.0
+REFERENCE_DT = 0.0005
+TIME_STEPS = (0.005, 0.01, 0.02, 0.025, 0.05, 0.1)
+
+
+def stick_input(t):
+    """Hover, a hard roll flip, recovery, then a yawing forward run."""
+    if t < 1.0:
+        return -0.2, 0.0, 0.0, 0.0
+    if t < 1.4:
+        return 0.4, 1.0, 0.0, 0.0
+    if t < 2.5:
+        return -0.2, -0.2, 0.1, 0.0
+    return -0.15, 0.0, 0.3, 0.3
+
+
+def fly(drone, duration=DURATION):
+    """
+    Fly the scripted manoeuvre. Returns sampled positions every INPUT_PERIOD
+    and the CPU time spent.
+    """
+    drone.position = np.array([0.0, 0.0, 500.0])
+    steps_per_period = int(round(INPUT_PERIOD / drone.dt))
+    samples = []
+    start = time.process_time()
+    for period in range(int(round(duration / INPUT_PERIOD))):
+        throttle, roll, pitch, yaw = stick_input(period * INPUT_PERIOD)
+        for _ in range(steps_per_period):
+            drone.apply_controller_input(throttle, roll, pitch, yaw)
+            drone.update()
+        samples.append(drone.position.copy())
+    return np.array(samples), time.process_time() - start
+
+
+def make_drone(name, dt):
+    if name == 'euler':
+        drone = DronePhysics()
+        drone.dt = dt
+        return drone
+    return QuaternionDronePhysics(name, dt=dt)
+
+
+def run(names=('euler', 'semi_implicit', 'rk4', 'adaptive')):
+    reference, _ = fly(QuaternionDronePhysics('rk4', dt=REFERENCE_DT))
+    results = []
+    for name in names:
+        for dt in TIME_STEPS:
+            samples, cpu = fly(make_drone(name, dt))
+            error = float(np.max(np.linalg.norm(samples - reference, axis=1)))
+            results.append({
+                'integrator': name,
+                'dt': dt,
+                'max_position_error': error,
+                'cpu_per_sim_second': cpu / DURATION,
+            })
+    return results
+
+
+def plot(results, path):
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("matplotlib is not installed, skipping plot")
+        return
+
+    fig, ax = plt.subplots(figsize=(7, 5))
+    for name in dict.fromkeys(r['integrator'] for r in results):
+        rows = [r for r in results if r['integrator'] == name]
+        ax.loglog([r['cpu_per_sim_second'] for r in rows],
+                  [max(r['max_position_error'], 1e-12) for r in rows], 'o-', label=name)
+    ax.set_xlabel("CPU seconds per simulated second")
+    ax.set_ylabel(f"Max position error vs dt={REFERENCE_DT} RK4 (m)")
+    ax.set_title("Integrator accuracy vs cost")
+    ax.grid(True, which='both', alpha=0.3)
+    ax.legend()
+    fig.savefig(path, dpi=120, bbox_inches='tight')
+    print(f"Saved plot to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Integrator accuracy-vs-cost benchmark")
+    parser.add_argument('--plot', help="save an error-vs-cost plot to this file (needs matplotlib)")
+    args = parser.parse_args()
+
+    results = run()
+    print(f"{'integrator':>14} {'dt':>7} {'max err (m)':>12} {'cpu s / sim s':>14}")
+    for r in results:
+        print(f"{r['integrator']:>14} {r['dt']:7.3f} {r['max_position_error']:12.3e} {r['cpu_per_sim_second']:14.4f}")
+
+    if args.plot:
+        plot(results, args.plot)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Point-in-box vs swept gate collision at increasing physics time steps.
+
+Straight-line fly-bys at racing speed aimed at random points on gate bars
+are sampled once per step. The point test only sees the end of each step and
+misses bars it jumps over; the swept test checks the whole segment.
+
+Run from the repository root:
+    python -m benchmarks.bench_swept_collisions
+"""
+import argparse
+import time
+import numpy as np
+
+from environment.gate import DroneGate
+from environment.collision import GateCollisionIndex
+
+TIME_STEPS = (0.005, 0.01, 0.02, 0.05)
+DRONE_SIZE = 0.25
+
+
+def make_flights(gate, count, speed, rng):
+    """Lines through random points on the gate's bars, crossing the gate plane."""
+    flights = []
+    for _ in range(count):
+        bar = gate.bars[rng.integers(4)]
+        target_local = rng.uniform(bar[:3], bar[3:])
+        angle = np.radians(gate.rotation)
+        # Local-to-world: inverse of DroneGate.world_to_local
+        target = gate.position + np.array([
+            target_local[0] * np.cos(angle) - target_local[1] * np.sin(angle),
+            target_local[0] * np.sin(angle) + target_local[1] * np.cos(angle),
+            target_local[2],
+        ])
+        heading = rng.normal(size=3)
+        heading /= np.linalg.norm(heading)
+        flights.append((target - heading * 10.0, heading * speed))
+    return flights
+
+
+def count_hits(index, flights, dt, swept):
+    hits = 0
+    steps = int(round(20.0 / (np.linalg.norm(flights[0][1]) * dt)))
+    for start, velocity in flights:
+        previous = start
+        for step in range(1, steps + 1):
+            position = start + velocity * (step * dt)
+            if swept:
+                hit = index.sweep(previous, position, DRONE_SIZE)[0] >= 0
+            else:
+                hit = index.query(position, DRONE_SIZE) >= 0
+            if hit:
+                hits += 1
+                break
+            previous = position
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Swept vs point collision benchmark")
+    parser.add_argument('--flights', type=int, default=200)
+    parser.add_argument('--speed', type=float, default=30.0, help="m/s")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    gate = DroneGate([0.0, 0.0, 5.0], size=3.0, rotation=30.0)
+    index = GateCollisionIndex([gate])
+    flights = make_flights(gate, args.flights, args.speed, rng)
+
+    print(f"{args.flights} fly-bys at {args.speed:.0f} m/s, every line passes through a bar")
+    print(f"{'dt':>6} {'steps/sim-s':>12} {'point hits':>11} {'swept hits':>11} {'swept us/test':>14}")
+    for dt in TIME_STEPS:
+        point = count_hits(index, flights, dt, swept=False)
+        start = time.perf_counter()
+        swept = count_hits(index, flights, dt, swept=True)
+        elapsed = time.perf_counter() - start
+        tests = args.flights * int(round(20.0 / (args.speed * dt)))
+        print(f"{dt:6.3f} {1 / dt:12.0f} {point:11d} {swept:11d} {elapsed / tests * 1e6:14.1f}")
+
+
+if __name__ == "__main__":
+    main()
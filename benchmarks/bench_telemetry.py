@@ -0,0 +1,188 @@
+"""
+Simulation-loop overhead of telemetry publishing with 1, 10 and 100 subscribers.
+
+The physics loop is run flat out (step and publish, no sleeping) with the
+given number of UDP or WebSocket clients connected from a separate process,
+so only the server's own work competes with the simulation thread. Rounds
+with the TelemetryServer attached alternate with rounds without it, and
+each row gives the median ticks per second with it and the cost per tick
+against the median without. The "stalled" rows use WebSocket clients that
+never read and ask for the maximum rate; their packets must be dropped
+(--buffer bytes of backlog each) rather than slow anything down.
+
+Run from the repository root:
+    python -m benchmarks.bench_telemetry
+    python -m benchmarks.bench_telemetry --rate 60 --seconds 5
+"""
+import argparse
+import asyncio
+import base64
+import multiprocessing
+import os
+import socket
+import statistics
+import time
+
+from environment.environment import Environment
+from physics.drone_physics import DronePhysics
+from simulation.physics_loop import PhysicsLoop
+from telemetry.server import TelemetryServer, read_websocket_frame
+
+SUBSCRIBER_COUNTS = (1, 10, 100)
+
+
+async def udp_client(port, rate, stop, counts, index):
+    loop = asyncio.get_running_loop()
+
+    class Protocol(asyncio.DatagramProtocol):
+        def datagram_received(self, data, address):
+            counts[index] += 1
+
+    transport, _ = await loop.create_datagram_endpoint(Protocol, remote_addr=('127.0.0.1', port))
+    while not stop.is_set():
+        transport.sendto(f"subscribe {rate:g}".encode('ascii'))
+        await asyncio.sleep(1.0)
+    transport.sendto(b"unsubscribe")
+    transport.close()
+
+
+def handshake(rate):
+    key = base64.b64encode(os.urandom(16)).decode('ascii')
+    return (f"GET /?rate={rate:g} HTTP/1.1\r\nHost: 127.0.0.1\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode('ascii')
+
+
+async def websocket_client(port, rate, stop, counts, index):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(handshake(rate))
+    await reader.readuntil(b"\r\n\r\n")
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(read_websocket_frame(reader), 0.5)
+        except asyncio.TimeoutError:
+            continue
+        except asyncio.IncompleteReadError:
+            break
+        counts[index] += 1
+    writer.transport.abort()
+
+
+async def stalled_client(port, rate, stop):
+    """A WebSocket client that never reads after the handshake, with a tiny receive window."""
+    loop = asyncio.get_running_loop()
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1024)
+    sock.setblocking(False)
+    await loop.sock_connect(sock, ('127.0.0.1', port))
+    await loop.sock_sendall(sock, handshake(rate))
+    response = b""
+    while b"\r\n\r\n" not in response:
+        response += await loop.sock_recv(sock, 1)
+    while not stop.is_set():
+        await asyncio.sleep(0.1)
+    sock.close()
+
+
+def run_clients(kind, count, port, rate, stop, results):
+    """Subscriber process: count clients of one kind, until stop is set; puts the packets received."""
+    async def clients():
+        counts = [0] * count
+        if kind == 'udp':
+            tasks = [udp_client(port, rate, stop, counts, i) for i in range(count)]
+        elif kind == 'websocket':
+            tasks = [websocket_client(port, rate, stop, counts, i) for i in range(count)]
+        else:
+            tasks = [stalled_client(port, rate, stop) for _ in range(count)]
+        await asyncio.gather(*tasks)
+        return sum(counts)
+    results.put(asyncio.run(clients()))
+
+
+def make_loop(telemetry=None):
+    def sticks(tick_time):
+        return (-0.2, 0.05, -0.05, 0.02), tick_time
+    return PhysicsLoop(DronePhysics(), Environment(seed=0), sticks, telemetry=telemetry)
+
+
+def ticks_per_second(loop, seconds):
+    """Step and publish flat out for about the given time."""
+    ticks = 0
+    start = time.perf_counter()
+    while True:
+        for _ in range(100):
+            loop.step()
+            loop.publish()
+        ticks += 100
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return ticks / elapsed
+
+
+def paired_rates(loop, server, seconds, rounds=9):
+    """Median ticks/s (without, with) the server, from alternating rounds."""
+    without, with_server = [], []
+    loop.telemetry = None
+    ticks_per_second(loop, 0.1)
+    for _ in range(rounds):
+        loop.telemetry = None
+        without.append(ticks_per_second(loop, seconds / rounds / 2))
+        loop.telemetry = server
+        with_server.append(ticks_per_second(loop, seconds / rounds / 2))
+    return statistics.median(without), statistics.median(with_server)
+
+
+def bench_subscribers(kind, count, rate, seconds, buffer):
+    """
+    (ticks/s without and with telemetry, packets sent, dropped and received)
+    with count clients of one kind (0 for an idle server).
+    """
+    server = TelemetryServer(udp_port=0, websocket_port=0, max_buffered=buffer)
+    server.start()
+    if not count:
+        rates = paired_rates(make_loop(), server, seconds)
+        server.stop()
+        return rates + (0, 0, 0)
+    if kind == 'stalled':
+        rate = server.max_rate
+    port = server.udp_port if kind == 'udp' else server.websocket_port
+    context = multiprocessing.get_context('spawn')
+    stop = context.Event()
+    results = context.Queue()
+    process = context.Process(target=run_clients, args=(kind, count, port, rate, stop, results))
+    process.start()
+    deadline = time.monotonic() + 10.0
+    while server.subscriber_count < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    if server.subscriber_count < count:
+        raise RuntimeError(f"Only {server.subscriber_count} of {count} {kind} clients subscribed")
+
+    rates = paired_rates(make_loop(), server, seconds)
+    sent, dropped = server.sent_count, server.dropped_count
+    stop.set()
+    received = results.get()
+    process.join()
+    server.stop()
+    return rates + (sent, dropped, received)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Telemetry publishing overhead benchmark")
+    parser.add_argument('--rate', type=float, default=30.0, help="packets per second per subscriber")
+    parser.add_argument('--seconds', type=float, default=4.0, help="measuring time per case")
+    parser.add_argument('--buffer', type=int, default=4096, help="server backlog per WebSocket client in bytes")
+    args = parser.parse_args()
+
+    print(f"{args.rate:g} packets/s per subscriber")
+    print(f"{'transport':>10} {'clients':>8} {'without':>10} {'with':>10} {'overhead':>17} "
+          f"{'sent':>8} {'dropped':>8} {'received':>9}")
+    cases = [('idle', 0)] + [(kind, count) for kind in ('udp', 'websocket', 'stalled') for count in SUBSCRIBER_COUNTS]
+    for kind, count in cases:
+        without, with_server, sent, dropped, received = bench_subscribers(kind, count, args.rate, args.seconds,
+                                                                          args.buffer)
+        overhead = 1e6 / with_server - 1e6 / without
+        print(f"{kind:>10} {count:>8} {without:>10,.0f} {with_server:>10,.0f} "
+              f"{overhead:>+8.2f} us {overhead * without / 1e4:>+4.1f}% {sent:>8} {dropped:>8} {received:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Heightmap terrain: open time, query cost, tile mesh builds and resident memory.
+
+Without --map a map of --size cells is written to a temporary file first
+(a zero-height sparse file, so creating even a multi-GB map is instant).
+The flight path is a 3 km sweep across the middle of the map; resident
+memory should grow with the tiles along it, not with the file size.
+
+Run from the repository root:
+    python -m benchmarks.bench_terrain
+    python -m benchmarks.bench_terrain --size 32768
+    python -m benchmarks.bench_terrain --map hills.map
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+
+from environment.terrain import Terrain, write_header, HEADER_SIZE
+from environment.terrain_mesh import build_terrain_tile
+
+
+def resident_mib():
+    """Resident set size of this process (Linux), or None elsewhere."""
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        return None
+
+
+def sparse_map(path, size, tile_size=256):
+    tiles = max(1, size // tile_size)
+    extent = tiles * tile_size
+    with open(path, 'wb') as file:
+        write_header(file, tile_size, (tiles, tiles), 1.0, (-extent / 2, -extent / 2))
+        file.truncate(HEADER_SIZE + tiles * tiles * (tile_size + 1) ** 2 * 4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Terrain query and memory benchmark")
+    parser.add_argument('--map', default=None, help="terrain file to use instead of a generated one")
+    parser.add_argument('--size', type=int, default=16384, help="edge of the generated map in cells")
+    parser.add_argument('--queries', type=int, default=100000)
+    args = parser.parse_args()
+
+    directory = None
+    path = args.map
+    if path is None:
+        directory = tempfile.TemporaryDirectory()
+        path = os.path.join(directory.name, 'bench.map')
+        sparse_map(path, args.size)
+
+    before = resident_mib()
+    start = time.perf_counter()
+    terrain = Terrain(path)
+    opened = time.perf_counter() - start
+    print(f"{path}: {os.path.getsize(path) / 2 ** 30:.2f} GiB, "
+          f"{terrain.tiles_x} x {terrain.tiles_y} tiles, opened in {opened * 1000:.2f} ms")
+
+    # A flight across the middle of the map
+    x0, y0, x1, y1 = terrain.extent
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    xs = cx + np.linspace(-1500.0, 1500.0, args.queries)
+    ys = cy + np.sin(xs / 300.0) * 200.0
+    points = list(zip(xs.tolist(), ys.tolist()))
+
+    start = time.perf_counter()
+    for x, y in points:
+        terrain.surface_at(x, y)
+    single = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(0, len(xs), 100):
+        terrain.surface(xs[i:i + 100], ys[i:i + 100])
+    batched = time.perf_counter() - start
+    print(f"surface_at: {single / len(points) * 1e6:.2f} us per point, "
+          f"surface (100 points): {batched / len(points) * 1e6:.3f} us per point")
+
+    tiles = sorted({terrain.tile_of(x, y) for x, y in points[::100]})
+    start = time.perf_counter()
+    for tx, ty in tiles:
+        build_terrain_tile(terrain, tx, ty, max(1, terrain.tile_size // 64))
+    built = time.perf_counter() - start
+    print(f"{len(tiles)} tiles under the path: {built / len(tiles) * 1000:.2f} ms per fine mesh")
+
+    after = resident_mib()
+    if before is not None:
+        print(f"Resident memory grew by {after - before:.1f} MiB")
+
+    terrain.close()
+    if directory is not None:
+        directory.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Correctness checks that must hold on every build.
+
+Each check raises AssertionError when it fails. Run them all (exit status 1
+on any failure), or through pytest, which collects the test_ functions:
+    python -m benchmarks.checks
+    python -m pytest benchmarks/checks.py
+"""
+import math
+import sys
+import traceback
+import numpy as np
+
+from benchmarks.bench_backends import conformance
+from benchmarks.bench_collisions import make_course, sample_positions
+from benchmarks.bench_fast_physics import compare
+from environment.collision import GateCollisionIndex
+from environment.gate import DroneGate
+from physics.backends import available_backends
+from physics.drone_physics import DronePhysics
+from recording.format import RECORD_DTYPE, QUANTIZED_SCALES, encode, decode
+
+
+def test_quantized_roundtrip():
+    """Quantized records decode to within half a step of every field's value over its whole range."""
+    count = 1000
+    rng = np.random.default_rng(0)
+    records = np.zeros(count, dtype=RECORD_DTYPE)
+    records['tick'] = np.arange(count)
+    records['position'] = rng.uniform(-1000, 1000, (count, 3))
+    records['velocity'] = rng.uniform(-30, 30, (count, 3))
+    records['rotation'][:, :2] = rng.uniform(-math.pi / 2, math.pi / 2, (count, 2))
+    # Yaw over all of [0, 2 pi), including both ends
+    records['rotation'][:, 2] = np.linspace(0.0, 2 * math.pi, count, endpoint=False)
+    records['rotation'][-1, 2] = np.nextafter(2 * math.pi, 0.0)
+    records['angular_velocity'] = rng.uniform(-30, 30, (count, 3))
+    records['motor_forces'] = rng.uniform(0, 6, (count, 4))
+    records['sticks'] = rng.uniform(-1, 1, (count, 4))
+    decoded = decode(encode(records, 'quantized'), 'quantized', 0.01)
+    for name, scale in QUANTIZED_SCALES.items():
+        error = float(np.abs(decoded[name] - records[name]).max())
+        assert error <= scale / 2 * (1 + 1e-9), f"{name}: round-trip error {error:.3g} above half a step"
+
+
+def test_lift_follows_rotation():
+    """A rotation assigned after the derived state was cached still tilts the lift on the next step."""
+    drone = DronePhysics()
+    drone.apply_controller_input(0.5, 0.0, 0.0, 0.0)
+    drone.derived
+    drone.rotation = np.array([0.5, 0.0, 0.0])
+    reference = DronePhysics()
+    reference.apply_controller_input(0.5, 0.0, 0.0, 0.0)
+    reference.rotation = np.array([0.5, 0.0, 0.0])
+    drone.update()
+    reference.update()
+    assert np.array_equal(drone.acceleration, reference.acceleration), \
+        f"acceleration {drone.acceleration} with a stale cache, {reference.acceleration} without"
+
+
+def test_gate_mesh_matches_collision_frame():
+    """Every vertex of a gate as drawn lies on one of the bars the collision and timing tests use."""
+    for rotation in (0.0, 30.0, 90.0, 217.0):
+        gate = DroneGate([3.0, -2.0, 5.0], size=3.0, rotation=rotation)
+        vertices, _ = gate.build_mesh()
+        for vertex in vertices.astype(float):
+            x, y, z = gate.world_to_local(vertex)
+            assert any(bar[0] - 1e-5 <= x <= bar[3] + 1e-5 and bar[1] - 1e-5 <= y <= bar[4] + 1e-5
+                       and bar[2] - 1e-5 <= z <= bar[5] + 1e-5 for bar in gate.bars), \
+                f"drawn vertex {vertex} of a gate rotated {rotation} deg is off its collision bars"
+
+
+def test_fast_physics_matches():
+    """FastDronePhysics flies like DronePhysics, up to rounding."""
+    _, _, max_difference = compare(steps=500, flights=4)
+    assert max_difference <= 1e-9, f"states differ by up to {max_difference:.3g}"
+
+
+def test_backends_agree():
+    """Every available batch backend flies its drones as DronePhysics flies each of them."""
+    for backend in available_backends():
+        differences = conformance(backend)
+        worst = max(differences, key=differences.get)
+        assert differences[worst] <= 1e-9, f"{backend}: {worst} differs by {differences[worst]:.3g}"
+
+
+def test_collision_index_queries_are_read_only():
+    """Queries leave a GateCollisionIndex untouched, so threads can share one (as the path predictor does)."""
+    rng = np.random.default_rng(0)
+    gates, side = make_course(100, rng)
+    index = GateCollisionIndex(gates)
+    before = {name: (value, value.copy() if isinstance(value, np.ndarray) else None)
+              for name, value in vars(index).items()}
+    starts = sample_positions(gates, side, rng, 200)
+    ends = starts + rng.uniform(-2, 2, starts.shape)
+    for start, end in zip(starts, ends):
+        index.query(start, 0.25)
+        index.sweep(start, end, 0.25)
+    index.sweeps_near(starts, ends, 0.25)
+    assert vars(index).keys() == before.keys(), "a query added or removed attributes"
+    for name, (value, copy) in before.items():
+        assert vars(index)[name] is value, f"a query replaced {name}"
+        assert copy is None or np.array_equal(value, copy), f"a query modified {name}"
+
+
+CHECKS = [test_quantized_roundtrip, test_lift_follows_rotation, test_gate_mesh_matches_collision_frame,
+          test_fast_physics_matches, test_backends_agree, test_collision_index_queries_are_read_only]
+
+
+def main():
+    failed = 0
+    for check in CHECKS:
+        try:
+            check()
+        except AssertionError:
+            failed += 1
+            print(f"{check.__name__}: FAILED")
+            traceback.print_exc()
+        else:
+            print(f"{check.__name__}: ok")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""
+Steady-state throughput suite with JSON baselines.
+
+Every case is warmed up, then timed over several rounds of a calibrated
+number of iterations; the reported rate is the median round. Results are
+saved with machine metadata and can be compared against an earlier run,
+flagging cases that slowed down by more than a threshold. No display or
+joystick is needed (the HUD case uses an off-screen pygame surface).
+
+Run from the repository root:
+    python -m benchmarks.suite --save baseline.json
+    python -m benchmarks.suite --compare baseline.json --threshold 0.1
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+
+from benchmarks.bench_collisions import make_course, sample_positions
+from physics.backends import available_backends
+
+COLLISION_GATE_COUNTS = (10, 100, 1000, 10000)
+
+
+def setup_physics():
+    from physics.drone_physics import DronePhysics
+    drone = DronePhysics()
+
+    def run(n):
+        for _ in range(n):
+            drone.apply_controller_input(-0.2, 0.05, -0.05, 0.02)
+            drone.update()
+    return run
+
+
+def setup_collisions(gate_count):
+    def setup():
+        from environment.environment import Environment
+        from physics.drone_physics import DronePhysics
+        rng = np.random.default_rng(0)
+        environment = Environment(seed=0)
+        gates, side = make_course(gate_count, rng)
+        environment.set_gates(gates)
+        positions = sample_positions(gates, side, rng, 1024)
+        step = np.array([0.1, 0.05, 0.0])
+        drone = DronePhysics()
+
+        def run(n):
+            for i in range(n):
+                position = positions[i & 1023]
+                drone.position = position.copy()
+                drone.velocity = np.zeros(3)
+                environment.check_collisions(drone, position - step)
+        return run
+    return setup
+
+
+def setup_terrain():
+    import tempfile
+    from environment.terrain import Terrain, synthetic_heights, write_terrain
+    from physics.drone_physics import DronePhysics
+    directory = tempfile.TemporaryDirectory()
+    path = os.path.join(directory.name, 'suite.map')
+    write_terrain(path, (4, 4), lambda i, j: synthetic_heights(i - 512.0, j - 512.0), tile_size=256)
+    terrain = Terrain(path)
+    drone = DronePhysics()
+    drone.terrain = terrain
+    # Start on the surface, so every step makes a contact test and most a response
+    drone.position[2] = terrain.height_at(0.0, 0.0) + 0.1
+
+    def run(n):
+        for _ in range(n):
+            drone.apply_controller_input(-0.2, 0.05, -0.05, 0.02)
+            drone.update()
+
+    def close():
+        terrain.close()
+        directory.cleanup()
+    run.close = close
+    return run
+
+
+def setup_flight_controller(rate):
+    def setup():
+        from physics.rate_controlled_physics import RateControlledDronePhysics
+        drone = RateControlledDronePhysics(controller_rate=rate)
+
+        def run(n):
+            for _ in range(n):
+                drone.apply_controller_input(-0.2, 0.05, -0.05, 0.02)
+                drone.update()
+        return run
+    return setup
+
+
+def setup_backend(name):
+    def setup():
+        from physics.drone_physics_batch import DronePhysicsBatch
+        batch = DronePhysicsBatch(100, backend=name)
+
+        def run(n):
+            for _ in range(n):
+                batch.apply_controller_input(-0.2, 0.05, -0.05, 0.02)
+                batch.update()
+        return run
+    return setup
+
+
+def setup_race_field():
+    from environment.environment import Environment
+    from simulation.race import RaceField
+    field = RaceField(Environment(seed=0), 100)
+
+    def run(n):
+        # One tick of 100 AI drones: pilots, batched dynamics and collisions
+        for _ in range(n):
+            field.step()
+    return run
+
+
+def setup_race_timer():
+    from simulation.race_timing import RaceTimer
+    gates, side = make_course(1000, np.random.default_rng(0))
+    timer = RaceTimer(gates, 100)
+    # Every drone drops through its next gate once every 100 ticks
+    centers = timer.centers
+    offsets = np.random.default_rng(1).uniform(-0.5, 0.5, (100, 3)) * (1, 1, 0)
+
+    def run(n):
+        for i in range(n):
+            phase = 1.0 - (i % 100) * 0.02
+            positions = centers[timer.next_gate] + offsets
+            positions[:, 2] += phase
+            timer.update(positions, positions - (0.0, 0.0, 0.02), i * 0.01, 0.01)
+    return run
+
+
+def setup_prediction():
+    from environment.environment import Environment
+    from physics.drone_physics import DronePhysics
+    from simulation.physics_loop import StateSnapshot
+    from simulation.prediction import TrajectoryPredictor
+    drone = DronePhysics()
+    drone.apply_controller_input(0.0, 0.2, 0.1, 0.0)
+    state = StateSnapshot()
+    state.capture(drone, 0, 0.0, 0.0)
+    predictor = TrajectoryPredictor(drone, Environment(seed=0), horizon=3.0, budget=1.0)
+
+    def run(n):
+        # A full 300-tick lookahead with impact tests, as after a stick change
+        for _ in range(n):
+            predictor.forces = None
+            predictor.update(state)
+    return run
+
+
+def setup_rotation_matrix():
+    from utils.math_utils import rotation_matrix_from_euler
+    angles = np.random.default_rng(0).uniform(-1.0, 1.0, (1024, 3))
+    rows = [tuple(row) for row in angles.tolist()]
+
+    def run(n):
+        for i in range(n):
+            rotation_matrix_from_euler(*rows[i & 1023])
+    return run
+
+
+def setup_camera():
+    from physics.drone_physics import DronePhysics
+    from rendering.camera import FPVCamera
+    drone = DronePhysics()
+    drone.rotation = np.array([0.1, -0.2, 0.3])
+    camera = FPVCamera(drone)
+
+    def run(n):
+        # A new physics state every call, as in the render loop
+        for _ in range(n):
+            drone.invalidate_derived()
+            camera.get_view_matrix()
+    return run
+
+
+def setup_hud():
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame
+    from physics.drone_physics import DronePhysics
+    from input.scripted import ScriptedInput
+    from rendering.hud import HUD
+    pygame.init()
+    screen = pygame.Surface((1024, 768))
+    font = pygame.font.SysFont('Arial', 16)
+    drone = DronePhysics()
+    controller = ScriptedInput([(0.0, -0.2, 0.1, -0.1, 0.05)])
+    controller.update()
+    # Refresh on every call so the value-change path is measured too
+    hud = HUD(screen, font, drone, refresh_rate=None)
+    render_stats = {'drawn': 12, 'culled': 4, 'low_detail': 3}
+
+    def run(n):
+        for i in range(n):
+            drone.position[2] = 5.0 + (i & 7) * 0.1
+            drone.invalidate_derived()
+            hud.render(controller, 120.0 + (i & 3), render_stats)
+    return run
+
+
+# name -> (unit, setup); setup returns run(n), which performs n operations and
+# may have a close() that releases the case's resources once it is measured
+CASES = {
+    'physics_step': ('steps/s', setup_physics),
+    'physics_step_terrain': ('steps/s', setup_terrain),
+    'physics_step_fc_1khz': ('steps/s', setup_flight_controller(1000.0)),
+    'physics_step_fc_8khz': ('steps/s', setup_flight_controller(8000.0)),
+    'race_field_100_drones': ('ticks/s', setup_race_field),
+    'race_timer_100_drones_1000_gates': ('ticks/s', setup_race_timer),
+    'trajectory_prediction_3s': ('paths/s', setup_prediction),
+    'rotation_matrix': ('calls/s', setup_rotation_matrix),
+    'camera_view': ('calls/s', setup_camera),
+    'hud_render': ('frames/s', setup_hud),
+}
+for _count in COLLISION_GATE_COUNTS:
+    CASES[f'collisions_{_count}_gates'] = ('checks/s', setup_collisions(_count))
+for _name in available_backends():
+    CASES[f'batch_100_drones_{_name}'] = ('ticks/s', setup_backend(_name))
+
+
+def measure(run, rounds=5, round_time=0.2):
+    """
+    Operations per second of run(n): warm up, pick n so one round takes
+    about round_time, then return the per-round rates.
+    """
+    run(10)
+    n = 10
+    while True:
+        start = time.perf_counter()
+        run(n)
+        elapsed = time.perf_counter() - start
+        if elapsed >= round_time / 4:
+            break
+        n *= 4
+    n = max(1, int(n * round_time / elapsed))
+
+    rates = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        run(n)
+        rates.append(n / (time.perf_counter() - start))
+    return rates
+
+
+def machine_metadata():
+    metadata = {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+    }
+    try:
+        import pygame
+        metadata['pygame'] = pygame.version.ver
+    except ImportError:
+        pass
+    try:
+        import numba
+        metadata['numba'] = numba.__version__
+    except ImportError:
+        pass
+    try:
+        metadata['git_commit'] = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return metadata
+
+
+def run_suite(names, rounds, round_time):
+    results = {}
+    for name in names:
+        unit, setup = CASES[name]
+        run = setup()
+        try:
+            rates = measure(run, rounds, round_time)
+        finally:
+            if hasattr(run, 'close'):
+                run.close()
+        results[name] = {'unit': unit, 'rate': float(np.median(rates)), 'rounds': rates}
+        print(f"{name:28s} {results[name]['rate']:14.1f} {unit}")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Print the change against a baseline; returns the names of cases that
+    got slower by more than threshold (a fraction).
+    """
+    regressions = []
+    print(f"\n{'case':28s} {'baseline':>14s} {'current':>14s} {'change':>8s}")
+    for name, result in results.items():
+        if name not in baseline['results']:
+            continue
+        old = baseline['results'][name]['rate']
+        change = result['rate'] / old - 1.0
+        flag = ''
+        if change < -threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:28s} {old:14.1f} {result['rate']:14.1f} {change * 100:+7.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite with JSON baselines")
+    parser.add_argument('--save', default=None, help="write results and machine metadata to this JSON file")
+    parser.add_argument('--compare', default=None, help="baseline JSON file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="slowdown fraction flagged as a regression (default 0.1)")
+    parser.add_argument('--filter', default=None, help="only run cases whose name contains this")
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--round-time', type=float, default=0.2, help="seconds per timed round")
+    args = parser.parse_args()
+
+    names = [name for name in CASES if args.filter is None or args.filter in name]
+    metadata = machine_metadata()
+    results = run_suite(names, args.rounds, args.round_time)
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump({'metadata': metadata, 'results': results}, file, indent=2)
+        print(f"Saved {args.save}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        if baseline['metadata'].get('platform') != metadata['platform']:
+            print(f"Note: baseline was recorded on {baseline['metadata'].get('platform')}")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
 from .environment import Environment
+from .chunked import ChunkedEnvironment
 from .gate import DroneGate
+from .collision import GateCollisionIndex
+from .terrain import Terrain
 
-__all__ = ['Environment', 'DroneGate']
\ No newline at end of file
+__all__ = ['Environment', 'ChunkedEnvironment', 'DroneGate', 'GateCollisionIndex', 'Terrain']
\ No newline at end of file
@@ -0,0 +1,259 @@
+import math
+import queue
+import threading
+from collections import OrderedDict
+import numpy as np
+
+from environment.environment import Environment
+from environment.gate import DroneGate
+from environment.collision import GateCollisionIndex
+from environment.world_mesh import WorldMesh
+
+
+class Chunk:
+    """
+    One square of the procedural course: its gates, their collision index
+    and the CPU side of its render mesh (uploaded on first draw).
+    """
+
+    def __init__(self, key, seed, chunk_size, gates, mesh):
+        self.key = key
+        self.seed = seed
+        self.x0 = key[0] * chunk_size
+        self.y0 = key[1] * chunk_size
+        self.gates = gates
+        self.collision_index = GateCollisionIndex(gates)
+        self.mesh = mesh
+        self.uploaded = False
+        # Bounding sphere of the chunk for whole-chunk frustum culling
+        self.center = np.array([self.x0 + chunk_size / 2, self.y0 + chunk_size / 2, 5.0])
+        self.radius = chunk_size / math.sqrt(2) + 10.0
+
+
+class ChunkedEnvironment(Environment):
+    """
+    Endless course generated from a seed, chunk by chunk, around the drone.
+
+    Chunks within load_radius (in chunks) of the drone are requested from a
+    loader thread ahead of time. Each chunk's gates come from a generator
+    seeded with (seed, chunk x, chunk y), so a chunk always has the same
+    gates no matter when or in which order it is loaded, and gates never
+    cross chunk borders. At most max_chunks stay in memory; beyond that the
+    least recently needed chunk is evicted together with its collision index
+    and render buffers (freed on the render thread).
+
+    A chunk needed by a collision test before the loader delivers it is
+    generated on the spot (counted in sync_loads), so collision results do
+    not depend on loader timing and runs stay deterministic.
+    """
+
+    def __init__(self, seed=None, chunk_size=100, load_radius=2, max_chunks=None,
+                 gates_per_chunk=(1, 3), gate_size=3.0):
+        self.chunk_size = chunk_size
+        self.load_radius = load_radius
+        self.max_chunks = max_chunks if max_chunks is not None else 2 * (2 * load_radius + 1) ** 2
+        self.gates_per_chunk = gates_per_chunk
+        self.gate_size = gate_size
+
+        self.chunks = OrderedDict()  # key -> Chunk, least recently needed first
+        self.active_chunks = ()      # Chunks around the drone, replaced as a whole
+        self.center_key = None
+        self.sync_loads = 0
+        self.evicted_count = 0
+        self._pending = set()
+        self._requests = queue.SimpleQueue()
+        self._loaded = queue.SimpleQueue()
+        self._released = queue.SimpleQueue()
+        self._stats = {'drawn': 0, 'culled': 0, 'low_detail': 0}
+
+        super().__init__(seed)
+        # No world boundary: the course goes on in every direction
+        self.world_size = math.inf
+
+        self._loader = threading.Thread(target=self._load_loop, name="chunk-loader", daemon=True)
+        self._loader.start()
+        self.update(np.zeros(3))
+
+    def reseed(self, seed=None):
+        previous = self.seed
+        super().reseed(seed)
+        if previous is not None and self.seed != previous:
+            # A new seed is a new course
+            self.clear()
+
+    def clear(self):
+        """Drop every loaded chunk."""
+        evicted = list(self.chunks.values())
+        self.chunks.clear()
+        self.center_key = None
+        self.set_active(())
+        for chunk in evicted:
+            self._released.put(chunk)
+
+    def generate_gates(self, count):
+        # Gates come from the chunks; the flat gate list holds the active ones
+        self.course_changed()
+
+    def chunk_key(self, x, y):
+        return (math.floor(x / self.chunk_size), math.floor(y / self.chunk_size))
+
+    def generate_chunk(self, key):
+        """
+        Build a chunk from the course seed; pure function of (seed, key).
+        """
+        # SeedSequence needs non-negative entropy words
+        rng = np.random.default_rng([self.seed, key[0] + (1 << 31), key[1] + (1 << 31)])
+        x0 = key[0] * self.chunk_size
+        y0 = key[1] * self.chunk_size
+        margin = self.gate_size  # keeps every gate (and its bounds) inside the chunk
+        low, high = self.gates_per_chunk
+        gates = []
+        for _ in range(int(rng.integers(low, high + 1))):
+            x = rng.uniform(x0 + margin, x0 + self.chunk_size - margin)
+            y = rng.uniform(y0 + margin, y0 + self.chunk_size - margin)
+            z = rng.uniform(4.0, 9.0)
+            gates.append(DroneGate([x, y, z], size=self.gate_size, rotation=rng.uniform(0.0, 360.0)))
+        half = self.chunk_size // 2
+        mesh = WorldMesh(self, grid_size=half, tile_size=half, quad_size=10,
+                         origin=(x0 + half, y0 + half), gates=gates)
+        return Chunk(key, self.seed, self.chunk_size, gates, mesh)
+
+    def _load_loop(self):
+        while True:
+            key = self._requests.get()
+            self._loaded.put(self.generate_chunk(key))
+
+    def update(self, position):
+        """
+        Track the drone: collect loaded chunks, request the ones coming into
+        range and evict the least recently needed beyond max_chunks. Cheap
+        when nothing changed; called from check_collisions every tick.
+        """
+        changed = False
+        while True:
+            try:
+                chunk = self._loaded.get_nowait()
+            except queue.Empty:
+                break
+            self._pending.discard(chunk.key)
+            # Skip chunks already generated on demand, or from an older seed
+            if chunk.key not in self.chunks and chunk.seed == self.seed:
+                self.chunks[chunk.key] = chunk
+                changed = True
+
+        key = self.chunk_key(position[0], position[1])
+        if key == self.center_key and not changed:
+            return
+        self.center_key = key
+
+        r = self.load_radius
+        wanted = [(key[0] + dx, key[1] + dy) for dx in range(-r, r + 1) for dy in range(-r, r + 1)]
+        # Nearest chunks first, so the loader fills in around the drone
+        wanted.sort(key=lambda k: max(abs(k[0] - key[0]), abs(k[1] - key[1])))
+        for wanted_key in wanted:
+            if wanted_key in self.chunks:
+                self.chunks.move_to_end(wanted_key)
+            elif wanted_key not in self._pending:
+                self._pending.add(wanted_key)
+                self._requests.put(wanted_key)
+
+        wanted_set = set(wanted)
+        evicted = []
+        while len(self.chunks) > self.max_chunks:
+            old_key, old_chunk = next(iter(self.chunks.items()))
+            if old_key in wanted_set:
+                break
+            del self.chunks[old_key]
+            evicted.append(old_chunk)
+
+        # Publish the new active set before handing evicted chunks to the
+        # render thread, so it never draws a chunk whose buffers it freed
+        self.set_active([self.chunks[k] for k in wanted if k in self.chunks])
+        for chunk in evicted:
+            self._released.put(chunk)
+        self.evicted_count += len(evicted)
+
+    def set_active(self, chunks):
+        self.active_chunks = tuple(chunks)
+        self.gates = [gate for chunk in self.active_chunks for gate in chunk.gates]
+        self.course_version += 1
+
+    def ensure_chunk(self, key):
+        """Return the chunk for key, generating it now if it is not loaded."""
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.generate_chunk(key)
+            self.chunks[key] = chunk
+            self.sync_loads += 1
+            self.set_active(self.active_chunks + (chunk,))
+        return chunk
+
+    def chunks_in_box(self, x_min, x_max, y_min, y_max):
+        ix0, iy0 = self.chunk_key(x_min, y_min)
+        ix1, iy1 = self.chunk_key(x_max, y_max)
+        return [self.ensure_chunk((ix, iy)) for ix in range(ix0, ix1 + 1) for iy in range(iy0, iy1 + 1)]
+
+    def check_collisions(self, drone, previous_position=None):
+        self.update(drone.position)
+        return super().check_collisions(drone, previous_position)
+
+    def gate_at(self, position, radius):
+        x, y = float(position[0]), float(position[1])
+        for chunk in self.chunks_in_box(x - radius, x + radius, y - radius, y + radius):
+            gate_index = chunk.collision_index.query(position, radius)
+            if gate_index >= 0:
+                return chunk.gates[gate_index]
+        return None
+
+    def gate_sweep(self, start, end, radius):
+        best_gate, best_toi = None, 1.0
+        chunks = self.chunks_in_box(min(start[0], end[0]) - radius, max(start[0], end[0]) + radius,
+                                    min(start[1], end[1]) - radius, max(start[1], end[1]) + radius)
+        for chunk in chunks:
+            gate_index, toi = chunk.collision_index.sweep(start, end, radius)
+            if gate_index >= 0 and (best_gate is None or toi < best_toi):
+                best_gate, best_toi = chunk.gates[gate_index], toi
+        return best_gate, best_toi
+
+    def sweeps_near(self, starts, ends, radius):
+        # Gates are spread over chunks; leave the filtering to gate_sweep
+        return np.ones(len(starts), dtype=bool)
+
+    def collision_indices(self):
+        # Only the active chunks; reading them never generates a chunk
+        return tuple(chunk.collision_index for chunk in self.active_chunks)
+
+    def render(self, frustum=None, eye=None):
+        # Free the GPU buffers of evicted chunks (GL calls belong on this thread)
+        while True:
+            try:
+                chunk = self._released.get_nowait()
+            except queue.Empty:
+                break
+            if chunk.uploaded:
+                chunk.mesh.release()
+
+        chunks = self.active_chunks
+        visible = np.ones(len(chunks), dtype=bool)
+        if frustum is not None and chunks:
+            visible = frustum.spheres_visible(np.array([chunk.center for chunk in chunks]),
+                                              np.array([chunk.radius for chunk in chunks]))
+
+        stats = {'drawn': 0, 'culled': 0, 'low_detail': 0}
+        for chunk, chunk_visible in zip(chunks, visible):
+            mesh = chunk.mesh
+            if not chunk_visible:
+                stats['culled'] += mesh.object_count
+                continue
+            if not chunk.uploaded:
+                mesh.upload()
+                chunk.uploaded = True
+            mesh.draw(frustum, eye)
+            stats['drawn'] += mesh.drawn_count
+            stats['culled'] += mesh.culled_count
+            stats['low_detail'] += mesh.low_detail_count
+        self._stats = stats
+
+    @property
+    def render_stats(self):
+        return dict(self._stats)
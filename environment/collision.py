@@ -0,0 +1,213 @@
+import numpy as np
+import math
+
+
+class GateCollisionIndex:
+    """
+    Packed, grid-indexed collision data for a list of DroneGate objects.
+
+    Gate bars are stored as oriented boxes: one (G, 4, 6) array of local-space
+    bar bounds plus per-gate centers and precomputed rotation cos/sin. A
+    uniform grid over the XY plane maps cells to the gates overlapping them,
+    so a query only runs the narrow phase on gates near the drone, and that
+    narrow phase tests every candidate bar in one vectorized expression.
+
+    Results match DroneGate.check_collision: the reported gate is the first
+    colliding gate in list order. An index is never modified after it is
+    built, so threads may query one index at the same time.
+    """
+
+    def __init__(self, gates, cell_size=None):
+        self.gate_count = len(gates)
+        self.centers = np.array([gate.position for gate in gates], dtype=float).reshape(-1, 3)
+        self.bars = np.array([gate.bars for gate in gates], dtype=float).reshape(-1, 4, 6)
+
+        # Same rotation terms as DroneGate.world_to_local, computed once
+        self.cos = np.array([math.cos(math.radians(-gate.rotation)) for gate in gates])
+        self.sin = np.array([math.sin(math.radians(-gate.rotation)) for gate in gates])
+
+        # Radius of each gate's footprint in the XY plane (gates rotate about Z)
+        if self.gate_count:
+            corners_x = np.maximum(np.abs(self.bars[:, :, 0]), np.abs(self.bars[:, :, 3])).max(axis=1)
+            corners_y = np.maximum(np.abs(self.bars[:, :, 1]), np.abs(self.bars[:, :, 4])).max(axis=1)
+            self.bound_radius = np.hypot(corners_x, corners_y)
+        else:
+            self.bound_radius = np.zeros(0)
+
+        # World-space bounding boxes: the XY footprint circle's square and the
+        # bars' height range (gates only rotate about Z)
+        extent = np.empty((self.gate_count, 3))
+        extent[:, 0] = self.bound_radius
+        extent[:, 1] = self.bound_radius
+        extent[:, 2] = np.maximum(np.abs(self.bars[:, :, 2]), np.abs(self.bars[:, :, 5])).max(axis=1)
+        self.bounds_low = self.centers - extent
+        self.bounds_high = self.centers + extent
+        # Bounds of all gates together, to skip the whole index cheaply
+        if self.gate_count:
+            self.course_low = self.bounds_low.min(axis=0)
+            self.course_high = self.bounds_high.max(axis=0)
+        else:
+            self.course_low = np.full(3, np.inf)
+            self.course_high = np.full(3, -np.inf)
+
+        # Default cell size: a little larger than the biggest gate footprint
+        if cell_size is None:
+            cell_size = 2.0 * float(self.bound_radius.max()) if self.gate_count else 10.0
+        self.cell_size = max(cell_size, 1e-3)
+
+        self.grid = self.build_grid()
+        self._empty = np.zeros(0, dtype=np.intp)
+
+    def build_grid(self):
+        """
+        Map every (ix, iy) cell to a sorted array of the gates overlapping it.
+        """
+        cells = {}
+        inv = 1.0 / self.cell_size
+        for index in range(self.gate_count):
+            x, y = self.centers[index, 0], self.centers[index, 1]
+            r = self.bound_radius[index]
+            for ix in range(math.floor((x - r) * inv), math.floor((x + r) * inv) + 1):
+                for iy in range(math.floor((y - r) * inv), math.floor((y + r) * inv) + 1):
+                    cells.setdefault((ix, iy), []).append(index)
+        # Gates are appended in index order, so each list is already sorted
+        return {cell: np.array(indices, dtype=np.intp) for cell, indices in cells.items()}
+
+    def candidates(self, position, radius):
+        """
+        Broad phase: indices of gates whose cells overlap the sphere's XY bounds.
+        """
+        x, y = float(position[0]), float(position[1])
+        return self.candidates_in_box(x - radius, x + radius, y - radius, y + radius)
+
+    def candidates_in_box(self, x_min, x_max, y_min, y_max):
+        """
+        Broad phase: sorted indices of gates in cells overlapping an XY box.
+        """
+        inv = 1.0 / self.cell_size
+        ix0, ix1 = math.floor(x_min * inv), math.floor(x_max * inv)
+        iy0, iy1 = math.floor(y_min * inv), math.floor(y_max * inv)
+        grid = self.grid
+        if ix0 == ix1 and iy0 == iy1:
+            return grid.get((ix0, iy0), self._empty)
+        found = [grid[cell] for cell in
+                 ((ix, iy) for ix in range(ix0, ix1 + 1) for iy in range(iy0, iy1 + 1))
+                 if cell in grid]
+        return np.unique(np.concatenate(found)) if found else self._empty
+
+    def query(self, position, radius):
+        """
+        Return the index of the first gate whose bars (expanded by radius)
+        contain position, or -1 when there is no collision.
+        """
+        candidates = self.candidates(position, radius)
+        if len(candidates) == 0:
+            return -1
+
+        # Narrow phase: all candidate gates and all four bars at once
+        relative = position - self.centers[candidates]
+        cos = self.cos[candidates]
+        sin = self.sin[candidates]
+        local_x = (relative[:, 0] * cos - relative[:, 1] * sin)[:, None]
+        local_y = (relative[:, 0] * sin + relative[:, 1] * cos)[:, None]
+        local_z = relative[:, 2][:, None]
+
+        bars = self.bars[candidates]
+        inside = ((bars[:, :, 0] - radius <= local_x) & (local_x <= bars[:, :, 3] + radius) &
+                  (bars[:, :, 1] - radius <= local_y) & (local_y <= bars[:, :, 4] + radius) &
+                  (bars[:, :, 2] - radius <= local_z) & (local_z <= bars[:, :, 5] + radius))
+        hits = np.flatnonzero(inside.any(axis=1))
+        if len(hits) == 0:
+            return -1
+        return int(candidates[hits[0]])
+
+    def sweep(self, start, end, radius):
+        """
+        Continuous test for a sphere moving from start to end during one step.
+
+        Each bar is expanded by radius (the same box as query) and intersected
+        with the segment using the slab method. Returns (gate_index, t) for the
+        earliest hit, where t in [0, 1] is the fraction of the step at impact,
+        or (-1, 1.0) when the path is clear.
+        """
+        start = np.asarray(start, dtype=float)
+        end = np.asarray(end, dtype=float)
+        candidates = self.candidates_in_box(
+            min(start[0], end[0]) - radius, max(start[0], end[0]) + radius,
+            min(start[1], end[1]) - radius, max(start[1], end[1]) + radius)
+        if len(candidates) == 0:
+            return -1, 1.0
+
+        # Both endpoints in every candidate gate's local frame: (C, 3)
+        cos = self.cos[candidates]
+        sin = self.sin[candidates]
+        local_start = self.to_local(start - self.centers[candidates], cos, sin)
+        local_end = self.to_local(end - self.centers[candidates], cos, sin)
+        direction = (local_end - local_start)[:, None, :]
+        origin = local_start[:, None, :]
+
+        bars = self.bars[candidates]
+        low = bars[:, :, :3] - radius
+        high = bars[:, :, 3:] + radius
+
+        # Slab entry/exit times per axis: (C, 4, 3)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_low = (low - origin) / direction
+            t_high = (high - origin) / direction
+        t_near = np.minimum(t_low, t_high)
+        t_far = np.maximum(t_low, t_high)
+
+        # Axes the segment does not move along: either always inside the slab or never
+        parallel = direction == 0.0
+        if parallel.any():
+            inside = (low <= origin) & (origin <= high)
+            t_near = np.where(parallel, np.where(inside, -np.inf, np.inf), t_near)
+            t_far = np.where(parallel, np.where(inside, np.inf, -np.inf), t_far)
+
+        t_enter = t_near.max(axis=2)
+        t_exit = t_far.min(axis=2)
+        hit = (t_enter <= t_exit) & (t_exit >= 0.0) & (t_enter <= 1.0)
+        if not hit.any():
+            return -1, 1.0
+
+        # Earliest impact per gate; ties go to the lower gate index like query
+        toi = np.where(hit, np.maximum(t_enter, 0.0), np.inf).min(axis=1)
+        first = int(np.argmin(toi))
+        return int(candidates[first]), float(toi[first])
+
+    def sweeps_near(self, starts, ends, radius):
+        """
+        Broad phase for many sweeps at once: (N,) mask of the (N, 3) start to
+        end segments whose bounds, grown by radius, overlap a gate's bounds.
+        Only these can hit anything in sweep().
+        """
+        if self.gate_count == 0:
+            return np.zeros(len(starts), dtype=bool)
+        low = (np.minimum(starts, ends) - radius)[:, None, :]
+        high = (np.maximum(starts, ends) + radius)[:, None, :]
+        overlap = (low <= self.bounds_high) & (high >= self.bounds_low)
+        return overlap.all(axis=2).any(axis=1)
+
+    @staticmethod
+    def to_local(relative, cos, sin):
+        """Rotate gate-relative world offsets (C, 3) into each gate's frame."""
+        local = np.empty_like(relative)
+        local[:, 0] = relative[:, 0] * cos - relative[:, 1] * sin
+        local[:, 1] = relative[:, 0] * sin + relative[:, 1] * cos
+        local[:, 2] = relative[:, 2]
+        return local
+
+
+def ground_time_of_impact(start, end, height):
+    """
+    Fraction of the step at which a point moving from start to end first
+    reaches z = height, or None if it stays above it. A start point already
+    below the plane counts as an impact at 0.
+    """
+    z0 = float(start[2])
+    z1 = float(end[2])
+    if z0 < height:
+        return 0.0
+    if z1 >= height:
+        return None
+    return (z0 - height) / (z0 - z1)
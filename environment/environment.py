@@ -2,13 +2,35 @@ import numpy as np
 from OpenGL.GL import *
 import math
 from environment.gate import DroneGate
+from environment.collision import GateCollisionIndex, ground_time_of_impact
+from environment.world_mesh import WorldMesh
+from environment.terrain_mesh import TerrainRenderer
 
 
 class Environment:
-    def __init__(self):
+    def __init__(self, seed=None, terrain=None):
+        # Seeded generator for all randomness in collision responses: with the
+        # same seed and the same per-tick inputs a flight is reproducible bit
+        # for bit. Without a seed one is drawn, so a run can still be replayed.
+        self.seed = None
+        self.rng = None
+        self.reseed(seed)
         self.world_size = 100.0  # meters
         self.gates = []
         self.ground_height = 0.0
+        # Optional heightmap Terrain replacing the flat ground; the course
+        # then sits on the terrain, which has no boundary walls
+        self.terrain = terrain
+        self.terrain_renderer = None
+        if terrain is not None:
+            self.world_size = math.inf
+        self.collision_index = None
+        # Bumped whenever the course changes; render data is rebuilt lazily
+        self.course_version = 0
+        self.world_mesh = None
+        # Distances beyond which gates and ground tiles use low-detail meshes
+        self.gate_lod_distance = 60.0
+        self.ground_lod_distance = 40.0
         self.generate_gates(10)  # Generate 10 gates
 
     def generate_gates(self, count):
@@ -20,7 +42,7 @@ class Environment:
             # Calculate position
             x = radius * math.cos(angle)
             y = radius * math.sin(angle)
-            z = 5.0  # Height above ground
+            z = 5.0 + self.ground_level(x, y)  # Height above ground
             
             # Make gate face toward center
             rotation = math.degrees(angle) + 90
@@ -31,45 +53,221 @@ class Environment:
             
             self.gates.append(DroneGate([x, y, z], size=3.0, rotation=rotation))
 
-    def check_collisions(self, drone):
+        self.course_changed()
+
+    def reseed(self, seed=None):
+        """
+        Restart the random generator, from a new seed if one is given.
+        """
+        if seed is not None:
+            self.seed = int(seed)
+        elif self.seed is None:
+            self.seed = int(np.random.SeedSequence().entropy % (1 << 63))
+        self.rng = np.random.default_rng(self.seed)
+
+    def ground_level(self, x, y):
+        """Height of the ground at (x, y)."""
+        if self.terrain is None:
+            return self.ground_height
+        return self.terrain.height_at(x, y)
+
+    def ground_levels(self, x, y):
+        """Heights of the ground at arrays of points, shaped like x."""
+        if self.terrain is None:
+            return np.full(np.shape(x), self.ground_height)
+        return self.terrain.heights(x, y)
+
+    def prepare_drone(self, drone):
+        """
+        Set a new drone (DronePhysics or DronePhysicsBatch) up for this
+        world: its ground contact, and on terrain its start height, lifted
+        from the flat ground's to the same height above the terrain.
+        """
+        drone.terrain = self.terrain
+        if self.terrain is None:
+            return
+        # A view of the position array(s), so the lift is applied in place
+        positions = drone.position.reshape(-1, 3)
+        positions[:, 2] += self.terrain.heights(positions[:, 0], positions[:, 1])
+        if hasattr(drone, 'invalidate_derived'):
+            drone.invalidate_derived()
+
+    def reset_drone(self, drone):
+        """
+        Put a flying drone back at the start: 5 m above the ground at the
+        origin, level and at rest (battery and sensitivities are kept).
+        """
+        drone.position = np.array([0.0, 0.0, 5.0 + self.ground_level(0.0, 0.0)])
+        drone.velocity = np.array([0.0, 0.0, 0.0])
+        drone.rotation = np.array([0.0, 0.0, 0.0])
+        drone.angular_velocity = np.array([0.0, 0.0, 0.0])
+        drone.invalidate_derived()
+        controller = getattr(drone, 'flight_controller', None)
+        if controller is not None:
+            controller.reset()
+
+    def set_gates(self, gates):
+        """
+        Replace the course with a new list of gates.
+        """
+        self.gates = list(gates)
+        self.course_changed()
+
+    def course_changed(self):
+        """
+        Repack gate collision data and mark render buffers stale; call after
+        adding, moving or removing gates.
+        """
+        self.collision_index = GateCollisionIndex(self.gates)
+        self.course_version += 1
+
+    def check_collisions(self, drone, previous_position=None):
+        """
+        Detect and respond to gate and world-boundary collisions.
+
+        With previous_position (the drone position before the last physics
+        step) the gate test is swept along the whole step, so thin bars are
+        not tunnelled through at large time steps; the drone is moved back to
+        the point of impact before the usual response is applied.
+        """
         drone_pos = drone.position
-        
-        # Check collisions with gates
-        for gate in self.gates:
-            if gate.check_collision(drone_pos, drone.size):
-                # Collision response - can be improved but works for now
-                direction = drone_pos - gate.position
-                distance = np.linalg.norm(direction)
-                if distance > 0:  # Avoid division by zero
-                    direction = direction / distance
-                    drone.position += direction * 0.3  # Smaller push back
-                    drone.velocity *= 0.8  # Less velocity reduction
-                    # Reduce random spin for more predictable response
-                    drone.angular_velocity += (np.random.random(3) - 0.5) * 0.3
-                return True
+
+        # Check collisions with gates (broad-phase grid + vectorized bar test)
+        if previous_position is None:
+            gate = self.gate_at(drone_pos, drone.size)
+        else:
+            gate, toi = self.gate_sweep(previous_position, drone_pos, drone.size)
+            if gate is not None:
+                # Ignore gate hits the drone only reaches after touching the ground
+                ground = self.ground_level(drone_pos[0], drone_pos[1]) + 0.1
+                ground_toi = ground_time_of_impact(previous_position, drone_pos, ground)
+                if ground_toi is not None and ground_toi < toi:
+                    gate = None
+                elif toi > 0.0:
+                    drone_pos[:] = previous_position + (drone_pos - previous_position) * toi
+
+        if gate is not None:
+            self.apply_gate_response(drone, gate)
+            return True
 
         # Check world boundaries
         for i in range(3):
             if abs(drone.position[i]) > self.world_size/2:
                 drone.position[i] = np.sign(drone.position[i]) * self.world_size/2
                 drone.velocity[i] = -drone.velocity[i] * 0.7
+                drone.invalidate_derived()
                 return True
 
         return False
 
-    def render(self):
-        # Render the ground as a grid of quads
-        glBegin(GL_QUADS)
-        glColor3f(0.2, 0.6, 0.2)  # Green ground
-        grid_size = 100
-        for x in range(-grid_size, grid_size, 10):
-            for y in range(-grid_size, grid_size, 10):
-                glVertex3f(x, y, self.ground_height)
-                glVertex3f(x+10, y, self.ground_height)
-                glVertex3f(x+10, y+10, self.ground_height)
-                glVertex3f(x, y+10, self.ground_height)
-        glEnd()
-
-        # Render gates
-        for gate in self.gates:
-            gate.render()
\ No newline at end of file
+    def gate_at(self, position, radius):
+        """The first gate a sphere at position overlaps, or None."""
+        gate_index = self.collision_index.query(position, radius)
+        return self.gates[gate_index] if gate_index >= 0 else None
+
+    def gate_sweep(self, start, end, radius):
+        """
+        The first gate hit by a sphere moving from start to end and the
+        fraction of the step at impact: (gate, toi), or (None, 1.0).
+        """
+        gate_index, toi = self.collision_index.sweep(start, end, radius)
+        return (self.gates[gate_index], toi) if gate_index >= 0 else (None, 1.0)
+
+    def sweeps_near(self, starts, ends, radius):
+        """(N,) mask of the start to end sweeps that may hit a gate."""
+        return self.collision_index.sweeps_near(starts, ends, radius)
+
+    def collision_indices(self):
+        """
+        The GateCollisionIndex objects covering the course. An index is
+        never modified once built (queries only read it), and the course
+        only replaces them, so other threads can query the returned ones.
+        """
+        return (self.collision_index,)
+
+    def apply_gate_response(self, drone, gate):
+        # Collision response - can be improved but works for now
+        direction = drone.position - gate.position
+        distance = np.linalg.norm(direction)
+        if distance > 0:  # Avoid division by zero
+            direction = direction / distance
+            drone.position += direction * 0.3  # Smaller push back
+            drone.velocity *= 0.8  # Less velocity reduction
+            # Reduce random spin for more predictable response
+            drone.angular_velocity += (self.rng.random(3) - 0.5) * 0.3
+        drone.invalidate_derived()
+
+    def check_collisions_batch(self, batch, previous_positions, rng=None):
+        """
+        Swept gate and boundary collisions for every drone in a DronePhysicsBatch.
+        Returns a boolean (N,) array of drones that collided this step.
+        Collision spin is drawn from rng (the environment's own by default).
+        """
+        if rng is None:
+            rng = self.rng
+        positions = batch.position
+        radius = batch.size
+        collided = np.zeros(batch.count, dtype=bool)
+
+        # Vectorized broad phase first: most drones are nowhere near a gate bar
+        for i in np.flatnonzero(self.sweeps_near(previous_positions, positions, radius)):
+            gate, toi = self.gate_sweep(previous_positions[i], positions[i], radius)
+            if gate is None:
+                continue
+            ground = self.ground_level(positions[i][0], positions[i][1]) + 0.1
+            ground_toi = ground_time_of_impact(previous_positions[i], positions[i], ground)
+            if ground_toi is not None and ground_toi < toi:
+                continue
+            start = previous_positions[i]
+            contact = start + (positions[i] - start) * toi
+            direction = contact - gate.position
+            distance = np.linalg.norm(direction)
+            positions[i] = contact
+            if distance > 0:
+                positions[i] += direction / distance * 0.3
+                batch.velocity[i] *= 0.8
+                batch.angular_velocity[i] += (rng.random(3) - 0.5) * 0.3
+            collided[i] = True
+
+        # World boundaries (only for drones that did not hit a gate, as above)
+        half = self.world_size / 2
+        outside = (np.abs(positions) > half) & ~collided[:, None]
+        if outside.any():
+            # Like check_collisions, only the first offending axis is handled per drone
+            first_axis = outside & (np.cumsum(outside, axis=1) == 1)
+            positions[first_axis] = np.sign(positions[first_axis]) * half
+            batch.velocity[first_axis] *= -0.7
+            collided |= first_axis.any(axis=1)
+
+        return collided
+
+    def render(self, frustum=None, eye=None):
+        """
+        Draw ground and gates. Objects outside the optional view frustum are
+        culled, and objects far from the optional eye position use low detail.
+        """
+        # Ground tiles and all gates live in static GPU buffers that are only
+        # rebuilt when the course changes
+        if self.world_mesh is None or self.world_mesh.version != self.course_version:
+            if self.world_mesh is not None:
+                self.world_mesh.release()
+            # On terrain the flat ground is replaced by the terrain tiles
+            self.world_mesh = WorldMesh(self, grid_size=0 if self.terrain is not None else 100)
+            self.world_mesh.upload()
+        self.world_mesh.draw(frustum, eye)
+
+        if self.terrain is not None:
+            if self.terrain_renderer is None:
+                self.terrain_renderer = TerrainRenderer(self.terrain)
+            self.terrain_renderer.draw(frustum, eye)
+
+    @property
+    def render_stats(self):
+        """Drawn, culled and low-detail object counts from the last render"""
+        stats = {'drawn': 0, 'culled': 0, 'low_detail': 0}
+        for mesh in (self.world_mesh, self.terrain_renderer):
+            if mesh is not None:
+                stats['drawn'] += mesh.drawn_count
+                stats['culled'] += mesh.culled_count
+                stats['low_detail'] += mesh.low_detail_count
+        return stats
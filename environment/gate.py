@@ -75,7 +75,8 @@ class DroneGate:
         
         glPushMatrix()
         glTranslatef(x, y, z)
-        glRotatef(self.rotation, 1, 0, 0)  # Rotate around X axis # Z axis
+        # Same frame as world_to_local (and the collision and timing tests)
+        glRotatef(self.rotation, 0, 0, 1)
         
         glColor3f(*self.color)
         
@@ -98,39 +99,60 @@ class DroneGate:
     def draw_box(self, x1, y1, z1, x2, y2, z2):
         # Helper function to draw a 3D box/cube
         glBegin(GL_QUADS)
+        for vertex in box_vertices(x1, y1, z1, x2, y2, z2):
+            glVertex3f(*vertex)
+        glEnd()
+
+    def build_mesh(self):
+        """
+        World-space triangle mesh of the gate frame, matching render().
+        Returns (vertices, indices) as float32 (V, 3) and uint32 (T*3,) arrays.
+        """
+        half_size = self.size / 2
+        thickness = self.thickness / 2
+        boxes = [
+            (-half_size, -half_size, -thickness, half_size, -half_size + self.thickness, thickness),
+            (-half_size, half_size - self.thickness, -thickness, half_size, half_size, thickness),
+            (-half_size, -half_size, -thickness, -half_size + self.thickness, half_size, thickness),
+            (half_size - self.thickness, -half_size, -thickness, half_size, half_size, thickness),
+        ]
+        local = np.array([v for box in boxes for v in box_vertices(*box)], dtype=float)
+
+        # Same transform as render(): rotate about the Z axis, then translate
+        angle = math.radians(self.rotation)
+        c, s = math.cos(angle), math.sin(angle)
+        world = np.empty_like(local)
+        world[:, 0] = local[:, 0] * c - local[:, 1] * s
+        world[:, 1] = local[:, 0] * s + local[:, 1] * c
+        world[:, 2] = local[:, 2]
+        world += self.position
+
+        return world.astype(np.float32), quad_indices(len(local) // 4)
+
+
+def box_vertices(x1, y1, z1, x2, y2, z2):
+    """
+    The 24 corners of a box as six quads (front, back, top, bottom, right, left).
+    """
+    return (
         # Front face
-        glVertex3f(x1, y1, z2)
-        glVertex3f(x2, y1, z2)
-        glVertex3f(x2, y2, z2)
-        glVertex3f(x1, y2, z2)
-        
+        (x1, y1, z2), (x2, y1, z2), (x2, y2, z2), (x1, y2, z2),
         # Back face
-        glVertex3f(x1, y1, z1)
-        glVertex3f(x1, y2, z1)
-        glVertex3f(x2, y2, z1)
-        glVertex3f(x2, y1, z1)
-        
+        (x1, y1, z1), (x1, y2, z1), (x2, y2, z1), (x2, y1, z1),
         # Top face
-        glVertex3f(x1, y2, z1)
-        glVertex3f(x1, y2, z2)
-        glVertex3f(x2, y2, z2)
-        glVertex3f(x2, y2, z1)
-        
+        (x1, y2, z1), (x1, y2, z2), (x2, y2, z2), (x2, y2, z1),
         # Bottom face
-        glVertex3f(x1, y1, z1)
-        glVertex3f(x2, y1, z1)
-        glVertex3f(x2, y1, z2)
-        glVertex3f(x1, y1, z2)
-        
+        (x1, y1, z1), (x2, y1, z1), (x2, y1, z2), (x1, y1, z2),
         # Right face
-        glVertex3f(x2, y1, z1)
-        glVertex3f(x2, y2, z1)
-        glVertex3f(x2, y2, z2)
-        glVertex3f(x2, y1, z2)
-        
+        (x2, y1, z1), (x2, y2, z1), (x2, y2, z2), (x2, y1, z2),
         # Left face
-        glVertex3f(x1, y1, z1)
-        glVertex3f(x1, y1, z2)
-        glVertex3f(x1, y2, z2)
-        glVertex3f(x1, y2, z1)
-        glEnd()
\ No newline at end of file
+        (x1, y1, z1), (x1, y1, z2), (x1, y2, z2), (x1, y2, z1),
+    )
+
+
+def quad_indices(quad_count, base=0):
+    """
+    Triangle indices for consecutive 4-vertex quads: (a, b, c) and (a, c, d).
+    """
+    starts = base + 4 * np.arange(quad_count, dtype=np.uint32)[:, None]
+    return (starts + np.array([0, 1, 2, 0, 2, 3], dtype=np.uint32)).ravel()
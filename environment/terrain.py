@@ -0,0 +1,426 @@
+"""
+Heightmap terrain, memory-mapped tile by tile.
+
+A terrain file is a fixed-size text header followed by square tiles of
+height samples, stored tile after tile, so one tile is one contiguous run of
+bytes. Each tile holds (tile_size + 1)^2 samples: its last row and column
+repeat the first ones of the neighbouring tiles, so every grid cell (and
+with it every height, normal and mesh query) lies inside a single tile.
+
+Terrain opens the file with np.memmap: opening is instant whatever the
+file size, and the OS pages a tile in only when a query or mesh build near
+the drone touches it. Heights are float32 metres, or int16 with a scale and
+offset stored in the header for maps half the size.
+
+Create a synthetic map, or convert a 2D .npy array of heights:
+    python -m environment.terrain hills.map --size 16384 --cell-size 1.0
+    python -m environment.terrain scan.map --from heights.npy --cell-size 2.0
+"""
+import argparse
+import json
+import math
+import os
+import time
+import numpy as np
+
+MAGIC = b"DRONEMAP"
+HEADER_SIZE = 4096
+FORMAT_VERSION = 1
+DTYPES = ('<f4', '<i2')
+
+# Height of the drone's centre above the surface at contact, as for the flat ground
+CLEARANCE = 0.1
+
+
+def write_header(file, tile_size, tiles, cell_size, origin, dtype='<f4', scale=1.0, offset=0.0):
+    header = {
+        'version': FORMAT_VERSION,
+        'tile_size': int(tile_size),
+        'tiles': [int(tiles[0]), int(tiles[1])],
+        'cell_size': float(cell_size),
+        'origin': [float(origin[0]), float(origin[1])],
+        'dtype': dtype,
+        # Stored sample * scale + offset is the height in metres
+        'scale': float(scale),
+        'offset': float(offset),
+    }
+    text = MAGIC + json.dumps(header).encode('utf-8')
+    if len(text) >= HEADER_SIZE:
+        raise ValueError("Terrain header too large")
+    file.write(text.ljust(HEADER_SIZE - 1) + b"\n")
+
+
+def read_header(file):
+    data = file.read(HEADER_SIZE)
+    if len(data) < HEADER_SIZE or not data.startswith(MAGIC):
+        raise ValueError("Not a terrain file")
+    header = json.loads(data[len(MAGIC):].decode('utf-8').strip())
+    if header.get('version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported terrain format version {header.get('version')}")
+    if header['dtype'] not in DTYPES:
+        raise ValueError(f"Unsupported terrain sample type {header['dtype']}")
+    return header
+
+
+class Terrain:
+    """
+    Read-only heightmap terrain over a memory-mapped terrain file.
+
+    height_at / normal_at answer one point in O(1): the four samples of the
+    grid cell under (x, y) are read from a single tile and interpolated
+    bilinearly. heights / normals do the same for arrays of points. Outside
+    the map the border heights continue flat.
+
+    contact and contact_batch are the ground contact of DronePhysics and
+    DronePhysicsBatch over this surface (set their terrain attribute).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            header = read_header(file)
+        self.header = header
+        self.tile_size = header['tile_size']
+        self.tiles_x, self.tiles_y = header['tiles']
+        self.cell_size = header['cell_size']
+        self.origin = tuple(header['origin'])
+        self.scale = header['scale']
+        self.offset = header['offset']
+        # Samples are stored as heights when no conversion is needed
+        self.raw_heights = header['dtype'] == '<f4' and self.scale == 1.0 and self.offset == 0.0
+
+        side = self.tile_size + 1
+        shape = (self.tiles_y, self.tiles_x, side, side)
+        expected = HEADER_SIZE + int(np.prod(shape)) * np.dtype(header['dtype']).itemsize
+        if os.path.getsize(path) < expected:
+            raise ValueError(f"Terrain file {path} is truncated")
+        self.map = np.memmap(path, dtype=header['dtype'], mode='r', offset=HEADER_SIZE, shape=shape)
+        # Plain ndarray view of the mapping: scalar indexing without memmap overhead
+        self.samples = self.map.view(np.ndarray)
+        self.flat_samples = self.samples.reshape(-1)
+
+        # Grid cells per axis; the map covers origin + [0, cells * cell_size]
+        self.cells_x = self.tiles_x * self.tile_size
+        self.cells_y = self.tiles_y * self.tile_size
+
+    @property
+    def extent(self):
+        """(x0, y0, x1, y1) of the mapped area in world coordinates."""
+        x0, y0 = self.origin
+        return (x0, y0, x0 + self.cells_x * self.cell_size, y0 + self.cells_y * self.cell_size)
+
+    @property
+    def tile_extent(self):
+        """World-space edge length of one tile."""
+        return self.tile_size * self.cell_size
+
+    def tile_of(self, x, y):
+        """(tx, ty) of the tile under a world position, clamped to the map."""
+        t = self.tile_extent
+        tx = min(max(math.floor((x - self.origin[0]) / t), 0), self.tiles_x - 1)
+        ty = min(max(math.floor((y - self.origin[1]) / t), 0), self.tiles_y - 1)
+        return tx, ty
+
+    def surface_at(self, x, y):
+        """
+        Height and unit normal of the surface at one point: (h, nx, ny, nz).
+        """
+        cell = self.cell_size
+        u = (x - self.origin[0]) / cell
+        v = (y - self.origin[1]) / cell
+        cells_x = self.cells_x
+        cells_y = self.cells_y
+        # Beyond the border the surface is flat: clamp and drop that slope
+        inside_x = 0.0 <= u <= cells_x
+        inside_y = 0.0 <= v <= cells_y
+        if not inside_x:
+            u = 0.0 if u < 0.0 else float(cells_x)
+        if not inside_y:
+            v = 0.0 if v < 0.0 else float(cells_y)
+        i = int(u)
+        j = int(v)
+        if i == cells_x:
+            i -= 1
+        if j == cells_y:
+            j -= 1
+        fx = u - i
+        fy = v - j
+        tx, lx = divmod(i, self.tile_size)
+        ty, ly = divmod(j, self.tile_size)
+
+        # Flat index of the cell's first sample; the other three follow in the same tile
+        side = self.tile_size + 1
+        first = ((ty * self.tiles_x + tx) * side + ly) * side + lx
+        samples = self.flat_samples
+        h00 = float(samples[first])
+        h10 = float(samples[first + 1])
+        h01 = float(samples[first + side])
+        h11 = float(samples[first + side + 1])
+        if not self.raw_heights:
+            scale, offset = self.scale, self.offset
+            h00, h10, h01, h11 = (h00 * scale + offset, h10 * scale + offset,
+                                  h01 * scale + offset, h11 * scale + offset)
+
+        bottom = h00 + (h10 - h00) * fx
+        top = h01 + (h11 - h01) * fx
+        height = bottom + (top - bottom) * fy
+        # Gradient of the bilinear patch
+        dx = ((h10 - h00) * (1.0 - fy) + (h11 - h01) * fy) / cell if inside_x else 0.0
+        dy = ((h01 - h00) * (1.0 - fx) + (h11 - h10) * fx) / cell if inside_y else 0.0
+        length = math.sqrt(dx * dx + dy * dy + 1.0)
+        return height, -dx / length, -dy / length, 1.0 / length
+
+    def height_at(self, x, y):
+        return self.surface_at(x, y)[0]
+
+    def normal_at(self, x, y):
+        return self.surface_at(x, y)[1:]
+
+    def surface(self, x, y):
+        """
+        Vectorized surface_at: heights (N,) and unit normals (N, 3) at
+        the points (x[i], y[i]).
+        """
+        cell = self.cell_size
+        u = (np.asarray(x, dtype=float) - self.origin[0]) / cell
+        v = (np.asarray(y, dtype=float) - self.origin[1]) / cell
+        inside_x = (u >= 0.0) & (u <= self.cells_x)
+        inside_y = (v >= 0.0) & (v <= self.cells_y)
+        u = np.clip(u, 0.0, self.cells_x)
+        v = np.clip(v, 0.0, self.cells_y)
+        i = np.minimum(u.astype(np.intp), self.cells_x - 1)
+        j = np.minimum(v.astype(np.intp), self.cells_y - 1)
+        fx = u - i
+        fy = v - j
+        tx, lx = np.divmod(i, self.tile_size)
+        ty, ly = np.divmod(j, self.tile_size)
+
+        # Fancy indexing reads just these samples from the mapping
+        samples = self.samples
+        h00 = samples[ty, tx, ly, lx].astype(float)
+        h10 = samples[ty, tx, ly, lx + 1].astype(float)
+        h01 = samples[ty, tx, ly + 1, lx].astype(float)
+        h11 = samples[ty, tx, ly + 1, lx + 1].astype(float)
+        if not self.raw_heights:
+            for h in (h00, h10, h01, h11):
+                h *= self.scale
+                h += self.offset
+
+        bottom = h00 + (h10 - h00) * fx
+        top = h01 + (h11 - h01) * fx
+        heights = bottom + (top - bottom) * fy
+        normals = np.empty(heights.shape + (3,))
+        normals[..., 0] = -np.where(inside_x, ((h10 - h00) * (1.0 - fy) + (h11 - h01) * fy) / cell, 0.0)
+        normals[..., 1] = -np.where(inside_y, ((h01 - h00) * (1.0 - fx) + (h11 - h10) * fx) / cell, 0.0)
+        normals[..., 2] = 1.0
+        normals /= np.linalg.norm(normals, axis=-1, keepdims=True)
+        return heights, normals
+
+    def heights(self, x, y):
+        return self.surface(x, y)[0]
+
+    def normals(self, x, y):
+        return self.surface(x, y)[1]
+
+    def contact(self, position, velocity, angular_velocity):
+        """
+        Keep one drone above the surface, with DronePhysics' bounce and
+        friction taken along the surface normal instead of the z axis (on
+        level ground it is the same response). Updates the arrays in place;
+        returns whether the drone touched the ground.
+        """
+        height, nx, ny, nz = self.surface_at(position[0], position[1])
+        ground = height + CLEARANCE
+        if position[2] >= ground:
+            return False
+        position[2] = ground
+        vx, vy, vz = velocity.tolist()
+        into = vx * nx + vy * ny + vz * nz
+        if into < 0:  # Only reflect velocity if moving into the surface
+            # 30% bounce along the normal, more damping along the surface
+            velocity[0] = (vx - into * nx) * 0.8 - into * nx * 0.3
+            velocity[1] = (vy - into * ny) * 0.8 - into * ny * 0.3
+            velocity[2] = (vz - into * nz) * 0.8 - into * nz * 0.3
+            angular_velocity *= 0.8
+
+        if np.linalg.norm(velocity) > 3.0:
+            # Hard landing - more energy loss
+            velocity *= 0.1
+            angular_velocity *= 0.1
+        return True
+
+    def contact_batch(self, positions, velocities, angular_velocities):
+        """
+        contact() for every row of (N, 3) state arrays; returns the (N,)
+        mask of drones that touched the ground.
+        """
+        heights, normals = self.surface(positions[:, 0], positions[:, 1])
+        ground = heights + CLEARANCE
+        touching = positions[:, 2] < ground
+        if not touching.any():
+            return touching
+        rows = np.flatnonzero(touching)
+        positions[rows, 2] = ground[rows]
+
+        v = velocities[rows]
+        n = normals[rows]
+        into = np.einsum('ij,ij->i', v, n)[:, None]
+        descending = into[:, 0] < 0
+        bounced = (v - into * n) * 0.8 - into * n * 0.3
+        velocities[rows] = np.where(descending[:, None], bounced, v)
+        angular_velocities[rows[descending]] *= 0.8
+
+        hard_landing = rows[np.linalg.norm(velocities[rows], axis=1) > 3.0]
+        velocities[hard_landing] *= 0.1
+        angular_velocities[hard_landing] *= 0.1
+        return touching
+
+    def tile_heights(self, tx, ty, stride=1):
+        """
+        Heights of one tile every stride samples, as a (k, k) float32 array
+        indexed [y, x], including the shared last row and column. Only this
+        tile's pages are read. stride must divide tile_size.
+        """
+        block = self.samples[ty, tx, ::stride, ::stride]
+        if self.raw_heights:
+            return np.array(block, dtype=np.float32)
+        return (block * np.float32(self.scale) + np.float32(self.offset)).astype(np.float32)
+
+    def tile_origin(self, tx, ty):
+        """World (x, y) of a tile's first sample."""
+        t = self.tile_extent
+        return self.origin[0] + tx * t, self.origin[1] + ty * t
+
+    def close(self):
+        # The mapping is released once the last view of it is gone
+        self.samples = self.flat_samples = self.map = None
+
+
+def synthetic_heights(x, y, seed=0, relief=40.0):
+    """
+    Rolling hills at world coordinates x, y: a sum of sine waves in seeded
+    random directions, from 2 km swells down to 20 m bumps. A pure function
+    of the coordinates, so tiles generated separately join seamlessly.
+    """
+    rng = np.random.default_rng(seed)
+    heights = np.zeros(np.broadcast(x, y).shape)
+    for wavelength, amplitude in octaves(relief):
+        for _ in range(2):
+            angle = rng.uniform(0.0, 2 * math.pi)
+            k = 2 * math.pi / wavelength
+            phase = rng.uniform(0.0, 2 * math.pi)
+            heights += amplitude * np.sin((x * math.cos(angle) + y * math.sin(angle)) * k + phase)
+    return heights
+
+
+def octaves(relief=40.0):
+    """(wavelength, amplitude) of the wave pairs summed by synthetic_heights."""
+    wavelength = 2000.0
+    amplitude = relief
+    while wavelength >= 20.0:
+        yield wavelength, amplitude
+        wavelength /= 2.5
+        amplitude /= 2.8
+
+
+def int16_encoding(low, high):
+    """
+    Scale and offset of int16 samples covering heights from low to high:
+    1 cm steps when the range allows, coarser ones when it is wider than
+    about 655 m.
+    """
+    return max(0.01, (high - low) / 65534), (low + high) / 2
+
+
+def write_terrain(path, tiles, height_fn, tile_size=256, cell_size=1.0, origin=None, dtype='<f4',
+                  scale=1.0, offset=0.0):
+    """
+    Write a terrain file tile by tile: height_fn(i, j) returns the heights
+    at integer sample indices (i along x, j along y; broadcast arrays), so
+    the whole map is never in memory. origin defaults to centring the map
+    on (0, 0). Returns the number of bytes written. With int16 samples a
+    height that does not fit the scale and offset raises ValueError.
+    """
+    tiles_x, tiles_y = tiles
+    if origin is None:
+        origin = (-tiles_x * tile_size * cell_size / 2, -tiles_y * tile_size * cell_size / 2)
+    side = tile_size + 1
+    shape = (tiles_y, tiles_x, side, side)
+    with open(path, 'wb') as file:
+        write_header(file, tile_size, tiles, cell_size, origin, dtype, scale, offset)
+        file.truncate(HEADER_SIZE + int(np.prod(shape)) * np.dtype(dtype).itemsize)
+    data = np.memmap(path, dtype=dtype, mode='r+', offset=HEADER_SIZE, shape=shape)
+
+    local = np.arange(side)
+    for ty in range(tiles_y):
+        for tx in range(tiles_x):
+            i = tx * tile_size + local[None, :]
+            j = ty * tile_size + local[:, None]
+            heights = height_fn(i, j)
+            if dtype == '<f4':
+                data[ty, tx] = heights
+            else:
+                samples = np.round((heights - offset) / scale)
+                if not (samples.min() >= -32768 and samples.max() <= 32767):
+                    raise ValueError(f"Heights from {np.min(heights):.2f} to {np.max(heights):.2f} m do not fit "
+                                     f"int16 samples of {scale:g} m around {offset:g} m")
+                data[ty, tx] = samples
+        # Write back row by row, so dirty pages do not pile up on huge maps
+        data.flush()
+    del data
+    return os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create a heightmap terrain file")
+    parser.add_argument('path')
+    parser.add_argument('--from', dest='source', default=None, metavar='NPY',
+                        help="2D .npy array of heights (rows along y) to convert instead of generating hills")
+    parser.add_argument('--size', type=int, default=4096, help="generated map edge in cells")
+    parser.add_argument('--cell-size', type=float, default=1.0, help="sample spacing in metres")
+    parser.add_argument('--tile-size', type=int, default=256, help="tile edge in cells")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the generated hills")
+    parser.add_argument('--relief', type=float, default=40.0, help="amplitude of the largest generated hills (m)")
+    parser.add_argument('--int16', action='store_true',
+                        help="store int16 samples instead of float32 (1 cm steps where the height range allows)")
+    args = parser.parse_args()
+
+    tile_size = args.tile_size
+    if args.source is not None:
+        source = np.load(args.source, mmap_mode='r')
+        if source.ndim != 2:
+            parser.error("--from needs a 2D array")
+        rows, cols = source.shape
+        # Past the last source sample the border repeats
+        tiles = (max(1, math.ceil((cols - 1) / tile_size)), max(1, math.ceil((rows - 1) / tile_size)))
+
+        def height_fn(i, j):
+            return source[np.minimum(j, rows - 1), np.minimum(i, cols - 1)]
+
+        low, high = float(source.min()), float(source.max())
+    else:
+        count = max(1, math.ceil(args.size / tile_size))
+        tiles = (count, count)
+        # Centred on the origin, as write_terrain places the map
+        half = count * tile_size * args.cell_size / 2
+
+        def height_fn(i, j):
+            return synthetic_heights(i * args.cell_size - half, j * args.cell_size - half,
+                                     args.seed, args.relief)
+
+        # Each octave adds two waves of its amplitude
+        high = sum(2 * abs(amplitude) for _, amplitude in octaves(args.relief))
+        low = -high
+
+    start = time.perf_counter()
+    dtype, (scale, offset) = ('<i2', int16_encoding(low, high)) if args.int16 else ('<f4', (1.0, 0.0))
+    size = write_terrain(args.path, tiles, height_fn, tile_size, args.cell_size, dtype=dtype, scale=scale,
+                         offset=offset)
+    terrain = Terrain(args.path)
+    x0, y0, x1, y1 = terrain.extent
+    print(f"Wrote {args.path}: {tiles[0]} x {tiles[1]} tiles of {tile_size} cells, "
+          f"{x1 - x0:.0f} x {y1 - y0:.0f} m, {size / 2 ** 20:.0f} MiB in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
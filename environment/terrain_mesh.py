@@ -0,0 +1,224 @@
+import ctypes
+import math
+from collections import OrderedDict
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.error import Error as GLError, NullFunctionError
+
+from environment.world_mesh import GROUND_COLOR
+
+# Direction towards the light for the baked terrain shading
+LIGHT_DIRECTION = np.array([0.4, 0.3, 0.87]) / np.linalg.norm([0.4, 0.3, 0.87])
+
+
+def build_terrain_tile(terrain, tx, ty, step):
+    """
+    Mesh of one terrain tile from every step-th sample: (vertices, indices),
+    vertices being interleaved position/color float32 rows with the slope
+    shading baked into the color. Only the tile's own samples are read.
+    """
+    heights = terrain.tile_heights(tx, ty, step)
+    side = heights.shape[0]
+    x0, y0 = terrain.tile_origin(tx, ty)
+    coords = np.arange(side) * (step * terrain.cell_size)
+    x, y = np.meshgrid(x0 + coords, y0 + coords)
+
+    vertices = np.empty((side * side, 6), dtype=np.float32)
+    vertices[:, 0] = x.ravel()
+    vertices[:, 1] = y.ravel()
+    vertices[:, 2] = heights.ravel()
+    normals = terrain.normals(vertices[:, 0], vertices[:, 1])
+    shade = 0.55 + 0.45 * np.clip(normals @ LIGHT_DIRECTION, 0.0, 1.0)
+    vertices[:, 3:] = shade[:, None] * GROUND_COLOR
+
+    # Two triangles per grid cell, rows along y
+    i, j = np.meshgrid(np.arange(side - 1), np.arange(side - 1))
+    a = (j * side + i).ravel()
+    indices = np.stack([a, a + 1, a + side + 1, a, a + side + 1, a + side], axis=1).ravel()
+    return vertices, indices.astype(np.uint32)
+
+
+class TerrainTileMesh:
+    """
+    GPU buffers of one terrain tile at one level of detail, with its
+    bounding sphere. Falls back to a display list without VBO support.
+    """
+
+    def __init__(self, terrain, tx, ty, step):
+        self.key = (tx, ty, step)
+        self.vertices, self.indices = build_terrain_tile(terrain, tx, ty, step)
+        low = self.vertices[:, :3].min(axis=0).astype(float)
+        high = self.vertices[:, :3].max(axis=0).astype(float)
+        self.center = (low + high) / 2
+        self.radius = float(np.linalg.norm(high - low) / 2)
+        self.vbo = None
+        self.ibo = None
+        self.display_list = None
+
+    def upload(self):
+        try:
+            self.vbo = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glBufferData(GL_ARRAY_BUFFER, self.vertices.nbytes, self.vertices, GL_STATIC_DRAW)
+            self.ibo = glGenBuffers(1)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, self.indices.nbytes, self.indices, GL_STATIC_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        except (GLError, NullFunctionError):
+            self.vbo = self.ibo = None
+            self.display_list = glGenLists(1)
+            glNewList(self.display_list, GL_COMPILE)
+            # Client arrays are read while the list is compiled
+            glEnableClientState(GL_VERTEX_ARRAY)
+            glEnableClientState(GL_COLOR_ARRAY)
+            glVertexPointer(3, GL_FLOAT, 0, np.ascontiguousarray(self.vertices[:, :3]))
+            glColorPointer(3, GL_FLOAT, 0, np.ascontiguousarray(self.vertices[:, 3:]))
+            glDrawElements(GL_TRIANGLES, len(self.indices), GL_UNSIGNED_INT, self.indices)
+            glDisableClientState(GL_COLOR_ARRAY)
+            glDisableClientState(GL_VERTEX_ARRAY)
+            glEndList()
+        # The CPU copy is only needed for the upload
+        self.index_count = len(self.indices)
+        self.vertices = self.indices = None
+
+    def release(self):
+        if self.vbo is not None:
+            glDeleteBuffers(2, [self.vbo, self.ibo])
+            self.vbo = self.ibo = None
+        if self.display_list is not None:
+            glDeleteLists(self.display_list, 1)
+            self.display_list = None
+
+    def draw(self):
+        if self.display_list is not None:
+            glCallList(self.display_list)
+            return
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+        glVertexPointer(3, GL_FLOAT, 24, ctypes.c_void_p(0))
+        glColorPointer(3, GL_FLOAT, 24, ctypes.c_void_p(12))
+        glDrawElements(GL_TRIANGLES, self.index_count, GL_UNSIGNED_INT, ctypes.c_void_p(0))
+
+
+class TerrainRenderer:
+    """
+    Draws the terrain tiles around the eye from a cache of per-tile meshes.
+
+    Tiles within view_distance of the eye are drawn, those beyond
+    lod_distance from every coarse_step-th sample and nearer ones from every
+    fine_step-th. A tile's mesh is built from its own samples the first time
+    it is needed (at most builds_per_frame per frame, nearest first, so
+    flying into new terrain does not stall a frame) and kept in an LRU cache
+    of max_meshes meshes; a tile whose fine mesh is not built yet is drawn
+    coarse meanwhile. Only tiles near the flight path are ever read, so the
+    rest of a huge map is never paged in.
+    """
+
+    def __init__(self, terrain, view_distance=500.0, lod_distance=150.0, fine_step=None, coarse_step=None,
+                 max_meshes=128, builds_per_frame=4):
+        self.terrain = terrain
+        self.view_distance = view_distance
+        self.lod_distance = lod_distance
+        # Default detail: 64 and 16 quads along a tile edge (steps divide the tile size)
+        self.fine_step = fine_step if fine_step is not None else max(1, terrain.tile_size // 64)
+        self.coarse_step = coarse_step if coarse_step is not None else max(1, terrain.tile_size // 16)
+        self.max_meshes = max_meshes
+        self.builds_per_frame = builds_per_frame
+        self.meshes = OrderedDict()  # (tx, ty, step) -> TerrainTileMesh, least recently drawn first
+        self.built_count = 0
+        self.evicted_count = 0
+
+        # Statistics from the last draw() call
+        self.drawn_count = 0
+        self.culled_count = 0
+        self.low_detail_count = 0
+
+    def tiles_near(self, eye):
+        """
+        (tx, ty, distance) of the tiles within view_distance of the eye,
+        nearest first; distance is from the eye to the tile's footprint.
+        """
+        terrain = self.terrain
+        size = terrain.tile_extent
+        x, y = float(eye[0]), float(eye[1])
+        first_x, first_y = terrain.tile_of(x - self.view_distance, y - self.view_distance)
+        last_x, last_y = terrain.tile_of(x + self.view_distance, y + self.view_distance)
+        tiles = []
+        for ty in range(first_y, last_y + 1):
+            for tx in range(first_x, last_x + 1):
+                x0, y0 = terrain.tile_origin(tx, ty)
+                dx = max(x0 - x, 0.0, x - (x0 + size))
+                dy = max(y0 - y, 0.0, y - (y0 + size))
+                distance = math.hypot(dx, dy)
+                if distance <= self.view_distance:
+                    tiles.append((tx, ty, distance))
+        tiles.sort(key=lambda tile: tile[2])
+        return tiles
+
+    def cached(self, tx, ty, step):
+        """The cached mesh of a tile at a level of detail, or None."""
+        key = (tx, ty, step)
+        mesh = self.meshes.get(key)
+        if mesh is not None:
+            self.meshes.move_to_end(key)
+        return mesh
+
+    def build(self, tx, ty, step):
+        mesh = TerrainTileMesh(self.terrain, tx, ty, step)
+        mesh.upload()
+        self.meshes[mesh.key] = mesh
+        self.built_count += 1
+        while len(self.meshes) > self.max_meshes:
+            _, evicted = self.meshes.popitem(last=False)
+            evicted.release()
+            self.evicted_count += 1
+        return mesh
+
+    def draw(self, frustum=None, eye=None):
+        """
+        Draw the tiles around the eye (the map origin without one), skipping
+        those outside the optional view frustum.
+        """
+        if eye is None:
+            eye = (0.0, 0.0, 0.0)
+        builds = self.builds_per_frame
+        meshes = []
+        coarse_flags = []
+        for tx, ty, distance in self.tiles_near(eye):
+            coarse = distance > self.lod_distance
+            mesh = self.cached(tx, ty, self.coarse_step if coarse else self.fine_step)
+            if mesh is None and builds > 0:
+                mesh = self.build(tx, ty, self.coarse_step if coarse else self.fine_step)
+                builds -= 1
+            if mesh is None and not coarse:
+                # Fine mesh still pending: the coarse one stands in if it is cached
+                mesh = self.cached(tx, ty, self.coarse_step)
+                coarse = True
+            if mesh is not None:
+                meshes.append(mesh)
+                coarse_flags.append(coarse)
+
+        visible = np.ones(len(meshes), dtype=bool)
+        if frustum is not None and meshes:
+            visible = frustum.spheres_visible(np.array([mesh.center for mesh in meshes]),
+                                              np.array([mesh.radius for mesh in meshes]))
+        if visible.any():
+            glEnableClientState(GL_VERTEX_ARRAY)
+            glEnableClientState(GL_COLOR_ARRAY)
+            for mesh, shown in zip(meshes, visible):
+                if shown:
+                    mesh.draw()
+            glDisableClientState(GL_COLOR_ARRAY)
+            glDisableClientState(GL_VERTEX_ARRAY)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+        self.drawn_count = int(visible.sum())
+        self.culled_count = len(meshes) - self.drawn_count
+        self.low_detail_count = int((visible & np.array(coarse_flags, dtype=bool)).sum())
+
+    def release(self):
+        for mesh in self.meshes.values():
+            mesh.release()
+        self.meshes.clear()
@@ -0,0 +1,235 @@
+import ctypes
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.error import Error as GLError, NullFunctionError
+from environment.gate import quad_indices
+
+GROUND_COLOR = (0.2, 0.6, 0.2)
+
+# Quads of each gate box kept at low detail: the front and back faces
+# (first two quads of box_vertices), i.e. the faces seen when flying through
+GATE_BOX_QUADS = 6
+GATE_LOD_QUADS = (0, 1)
+
+
+def build_ground_tile(x0, y0, tile_size, quad_size, height=0.0):
+    """
+    One square ground tile as a grid of quads, in the same corner order as
+    the old immediate-mode Environment.render. Returns (vertices, indices).
+    """
+    coords = np.arange(0.0, tile_size, quad_size)
+    x, y = np.meshgrid(x0 + coords, y0 + coords, indexing='ij')
+    x = x.ravel()
+    y = y.ravel()
+    corners = np.stack([
+        np.stack([x, y], axis=1),
+        np.stack([x + quad_size, y], axis=1),
+        np.stack([x + quad_size, y + quad_size], axis=1),
+        np.stack([x, y + quad_size], axis=1),
+    ], axis=1).reshape(-1, 2)
+    vertices = np.empty((len(corners), 3), dtype=np.float32)
+    vertices[:, :2] = corners
+    vertices[:, 2] = height
+    return vertices, quad_indices(len(x))
+
+
+class WorldMesh:
+    """
+    Static world geometry (ground tiles and all gates) packed into one
+    interleaved position/color vertex buffer and one index buffer.
+
+    Every object (ground tile or gate) has a full-detail and a low-detail
+    index range plus a bounding sphere, so draw() can cull objects outside the
+    view frustum and switch distant ones to low detail. All full-detail ranges
+    come first in the index buffer, so drawing everything at full detail is a
+    single glDrawElements call. If vertex buffer objects are unavailable each
+    range is compiled into its own display list instead.
+    """
+
+    def __init__(self, environment, grid_size=100, tile_size=50, quad_size=10, origin=(0, 0), gates=None):
+        # Ground covers origin +- grid_size; gates default to the environment's
+        self.version = environment.course_version
+        self.vbo = None
+        self.ibo = None
+        self.display_lists = None
+
+        # Objects: (vertices, fine indices, coarse indices, color, lod distance)
+        objects = []
+        for x0 in range(origin[0] - grid_size, origin[0] + grid_size, tile_size):
+            for y0 in range(origin[1] - grid_size, origin[1] + grid_size, tile_size):
+                vertices, fine = build_ground_tile(x0, y0, tile_size, quad_size, environment.ground_height)
+                # Low detail: one quad over the whole tile
+                coarse_vertices, coarse = build_ground_tile(x0, y0, tile_size, tile_size, environment.ground_height)
+                merged = np.concatenate([vertices, coarse_vertices])
+                objects.append((merged, fine, coarse + len(vertices), GROUND_COLOR, environment.ground_lod_distance))
+        self.ground_tile_count = len(objects)
+
+        for gate in (environment.gates if gates is None else gates):
+            vertices, fine = gate.build_mesh()
+            quads = fine.reshape(-1, GATE_BOX_QUADS, 6)
+            coarse = quads[:, list(GATE_LOD_QUADS)].ravel()
+            objects.append((vertices, fine, coarse, gate.color, environment.gate_lod_distance))
+
+        vertex_chunks = []
+        fine_chunks = []
+        coarse_chunks = []
+        fine_ranges = []
+        coarse_ranges = []
+        centers = []
+        radii = []
+        vertex_count = 0
+        fine_count = 0
+        coarse_count = 0
+        for vertices, fine, coarse, color, _ in objects:
+            chunk = np.empty((len(vertices), 6), dtype=np.float32)
+            chunk[:, :3] = vertices
+            chunk[:, 3:] = color
+            vertex_chunks.append(chunk)
+            fine_chunks.append(fine + vertex_count)
+            coarse_chunks.append(coarse + vertex_count)
+            fine_ranges.append((fine_count, len(fine)))
+            coarse_ranges.append((coarse_count, len(coarse)))
+            vertex_count += len(vertices)
+            fine_count += len(fine)
+            coarse_count += len(coarse)
+
+            # Bounding sphere around the vertex AABB
+            low = vertices.min(axis=0).astype(float)
+            high = vertices.max(axis=0).astype(float)
+            centers.append((low + high) / 2)
+            radii.append(np.linalg.norm(high - low) / 2)
+
+        self.vertices = np.concatenate(vertex_chunks)
+        self.indices = np.concatenate(fine_chunks + coarse_chunks).astype(np.uint32)
+        self.fine_index_count = fine_count
+        self.fine_ranges = np.array(fine_ranges, dtype=np.int64)
+        self.coarse_ranges = np.array(coarse_ranges, dtype=np.int64) + (fine_count, 0)
+        self.centers = np.array(centers)
+        self.radii = np.array(radii)
+        self.lod_distances = np.array([obj[4] for obj in objects], dtype=float)
+
+        # Statistics from the last draw() call
+        self.drawn_count = len(objects)
+        self.culled_count = 0
+        self.low_detail_count = 0
+
+    @property
+    def object_count(self):
+        return len(self.centers)
+
+    def upload(self):
+        """
+        Create the GPU buffers; falls back to display lists without VBO support.
+        """
+        try:
+            self.vbo = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glBufferData(GL_ARRAY_BUFFER, self.vertices.nbytes, self.vertices, GL_STATIC_DRAW)
+            self.ibo = glGenBuffers(1)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, self.indices.nbytes, self.indices, GL_STATIC_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        except (GLError, NullFunctionError):
+            self.vbo = self.ibo = None
+            self.compile_display_lists()
+
+    def compile_display_lists(self):
+        # One list per object and detail level, keyed by index range start
+        ranges = np.concatenate([self.fine_ranges, self.coarse_ranges])
+        base = glGenLists(len(ranges))
+        self.display_lists = {}
+        for offset, (first, count) in enumerate(ranges):
+            glNewList(base + offset, GL_COMPILE)
+            self.draw_immediate(first, count)
+            glEndList()
+            self.display_lists[int(first)] = base + offset
+        self.display_list_base = base
+
+    def release(self):
+        if self.vbo is not None:
+            glDeleteBuffers(2, [self.vbo, self.ibo])
+            self.vbo = self.ibo = None
+        if self.display_lists is not None:
+            glDeleteLists(self.display_list_base, len(self.display_lists))
+            self.display_lists = None
+
+    def draw(self, frustum=None, eye=None):
+        """
+        Draw the world. With a frustum, objects whose bounding sphere is outside
+        it are skipped; with an eye position, objects beyond their LOD distance
+        use the low-detail mesh.
+        """
+        if frustum is None and eye is None:
+            self.drawn_count = self.object_count
+            self.culled_count = 0
+            self.low_detail_count = 0
+            self.draw_ranges(np.array([[0, self.fine_index_count]]))
+            return
+
+        visible = np.ones(self.object_count, dtype=bool)
+        if frustum is not None:
+            visible = frustum.spheres_visible(self.centers, self.radii)
+        low_detail = np.zeros(self.object_count, dtype=bool)
+        if eye is not None:
+            distance = np.linalg.norm(self.centers - np.asarray(eye, dtype=float), axis=1) - self.radii
+            low_detail = visible & (distance > self.lod_distances)
+        full_detail = visible & ~low_detail
+
+        self.drawn_count = int(visible.sum())
+        self.culled_count = self.object_count - self.drawn_count
+        self.low_detail_count = int(low_detail.sum())
+
+        ranges = np.concatenate([self.fine_ranges[full_detail], self.coarse_ranges[low_detail]])
+        if len(ranges):
+            self.draw_ranges(ranges)
+
+    def draw_ranges(self, ranges):
+        """
+        Draw (first, count) index ranges; adjacent ranges are merged and the
+        rest submitted with one glMultiDrawElements call.
+        """
+        if self.display_lists is not None:
+            if len(ranges) == 1 and ranges[0][1] == self.fine_index_count:
+                ranges = self.fine_ranges
+            glCallLists([self.display_lists[int(first)] for first, _ in ranges])
+            return
+
+        # Merge ranges that are contiguous in the index buffer
+        merged = [list(ranges[0])]
+        for first, count in ranges[1:]:
+            if merged[-1][0] + merged[-1][1] == first:
+                merged[-1][1] += count
+            else:
+                merged.append([first, count])
+        merged = np.array(merged, dtype=np.int64)
+
+        stride = self.vertices.strides[0]
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, stride, ctypes.c_void_p(0))
+        glColorPointer(3, GL_FLOAT, stride, ctypes.c_void_p(12))
+
+        if len(merged) == 1:
+            first, count = merged[0]
+            glDrawElements(GL_TRIANGLES, int(count), GL_UNSIGNED_INT, ctypes.c_void_p(int(first) * 4))
+        else:
+            counts = merged[:, 1].astype(np.int32)
+            offsets = (merged[:, 0] * 4).astype(np.uintp)
+            glMultiDrawElements(GL_TRIANGLES, counts, GL_UNSIGNED_INT, offsets, len(merged))
+
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+    def draw_immediate(self, first, count):
+        # Only used while compiling the display-list fallback
+        glBegin(GL_TRIANGLES)
+        for index in self.indices[first:first + count]:
+            vertex = self.vertices[index]
+            glColor3f(*vertex[3:])
+            glVertex3f(*vertex[:3])
+        glEnd()
@@ -1,3 +1,5 @@
 from .controller import ControllerInput
+from .scripted import ScriptedInput
+from .sampler import InputSampler
 
-__all__ = ['ControllerInput']
\ No newline at end of file
+__all__ = ['ControllerInput', 'ScriptedInput', 'InputSampler']
\ No newline at end of file
@@ -15,6 +15,9 @@ class ControllerInput:
             'yaw': 0.0
         }
         self.smoothing_factor = 0.2  # Higher value = more smoothing
+
+        # Last raw joystick reading (display-inverted), see get_raw_values
+        self.raw_values = (-1.0, 0.0, 0.0, 0.0)
         
         # Initialize joystick subsystem
         pygame.joystick.init()
@@ -39,10 +42,10 @@ class ControllerInput:
         yaw_val = self.joystick.get_axis(3)
         pitch_val = self.joystick.get_axis(2)
         roll_val = self.joystick.get_axis(1)
-        
-        # Debug print the raw joystick values
-        print(f"Joystick raw values: throttle={throttle_val:.2f}, yaw={yaw_val:.2f}, pitch={pitch_val:.2f}, roll={roll_val:.2f}")
-        
+
+        # Keep the same reading for display instead of polling the joystick again
+        self.raw_values = (-throttle_val, roll_val, -pitch_val, yaw_val)
+
         # Assign to our variables (inverting as necessary based on controller mapping)
         self.throttle = throttle_val  # Throttle not inverted
         
@@ -67,14 +70,6 @@ class ControllerInput:
         return smoothed
 
     def get_raw_values(self):
-        """Return the raw joystick values for display purposes"""
-        if not self.joystick:
-            return -1.0, 0.0, 0.0, 0.0  # Default values
-            
-        # Read raw values directly from joystick
-        throttle = -self.joystick.get_axis(0)  # Invert throttle
-        yaw = self.joystick.get_axis(3)
-        pitch = -self.joystick.get_axis(2)  # Invert pitch
-        roll = self.joystick.get_axis(1)
-        
-        return throttle, roll, pitch, yaw
+        """Return the raw joystick values from the last update() for display purposes"""
+        # Throttle and pitch are inverted for display
+        return self.raw_values
@@ -0,0 +1,105 @@
+import threading
+import time
+import numpy as np
+
+# Columns of a sample row
+TIME, THROTTLE, ROLL, PITCH, YAW = range(5)
+RAW = slice(5, 9)
+SAMPLE_WIDTH = 9
+
+
+class InputSampler:
+    """
+    Polls an input source on a background thread at a fixed rate and keeps
+    timestamped samples in a ring buffer.
+
+    Each row is (time, throttle, roll, pitch, yaw, raw throttle, raw roll,
+    raw pitch, raw yaw), with time from time.perf_counter. The sampler thread
+    is the only writer: it fills the next row and then bumps write_count, so
+    readers never take a lock. Readers only look at the newest capacity - 1
+    rows, which leaves the row being written out of their view.
+
+    ControllerInput smooths per update() call, so its smoothing factor is
+    rescaled to keep the same time constant it had when polled once per
+    frame at reference_rate.
+    """
+
+    def __init__(self, input_source, rate=1000.0, capacity=1024, reference_rate=120.0):
+        self.input_source = input_source
+        self.rate = rate
+        self.interval = 1.0 / rate
+        self.buffer = np.zeros((capacity, SAMPLE_WIDTH))
+        self.capacity = capacity
+        self.write_count = 0
+
+        if hasattr(input_source, 'smoothing_factor') and reference_rate:
+            input_source.smoothing_factor = input_source.smoothing_factor ** (reference_rate / rate)
+
+        self._running = False
+        self._thread = None
+        # Seed the buffer so readers always have a sample
+        self.poll()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self.run, name="input-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def run(self):
+        next_poll = time.perf_counter()
+        while self._running:
+            self.poll()
+            next_poll += self.interval
+            remaining = next_poll - time.perf_counter()
+            if remaining > 0:
+                time.sleep(remaining)
+            else:
+                # Fell behind (e.g. the process was suspended): do not burst
+                next_poll = time.perf_counter()
+
+    def poll(self):
+        """Read the input source once and append a sample."""
+        sticks = self.input_source.update()
+        raw = self.input_source.get_raw_values()
+        row = self.buffer[self.write_count % self.capacity]
+        row[TIME] = time.perf_counter()
+        row[THROTTLE:YAW + 1] = sticks
+        row[RAW] = raw
+        self.write_count += 1
+
+    def recent(self):
+        """
+        The readable samples in time order, oldest first (a copy).
+        """
+        count = self.write_count
+        available = min(count, self.capacity - 1)
+        start = (count - available) % self.capacity
+        indices = (start + np.arange(available)) % self.capacity
+        return self.buffer[indices]
+
+    def latest(self):
+        """The newest sample row."""
+        return self.buffer[(self.write_count - 1) % self.capacity].copy()
+
+    def sample_at(self, t):
+        """
+        The sample nearest to wall-clock time t, as PhysicsLoop's input_fn:
+        returns ((throttle, roll, pitch, yaw), sample_time).
+        """
+        samples = self.recent()
+        times = samples[:, TIME]
+        index = int(np.searchsorted(times, t))
+        if index >= len(times):
+            index = len(times) - 1
+        elif index > 0 and t - times[index - 1] <= times[index] - t:
+            index -= 1
+        row = samples[index]
+        return (row[THROTTLE], row[ROLL], row[PITCH], row[YAW]), row[TIME]
@@ -0,0 +1,41 @@
+# Climb, hover, then a gentle forward roll/pitch manoeuvre
+DEMO_KEYFRAMES = (
+    (0.0, 0.0, 0.0, 0.0, 0.0),
+    (2.0, -0.35, 0.0, 0.0, 0.0),
+    (5.0, -0.3, 0.1, 0.2, 0.0),
+    (8.0, -0.35, -0.1, -0.2, 0.1),
+)
+
+
+class ScriptedInput:
+    """
+    ControllerInput-compatible input source that plays back a stick script.
+
+    The script is a list of (time, throttle, roll, pitch, yaw) keyframes in
+    simulated seconds; each keyframe is held until the next one starts.
+    """
+
+    def __init__(self, keyframes=None, dt=0.01):
+        self.keyframes = sorted(keyframes or [(0.0, -1.0, 0.0, 0.0, 0.0)])
+        self.dt = dt
+        self.time = 0.0
+        self.mode = "acro"
+        self.throttle, self.roll, self.pitch, self.yaw = self.keyframes[0][1:]
+        self._index = 0
+
+    def reset(self):
+        self.time = 0.0
+        self._index = 0
+        self.throttle, self.roll, self.pitch, self.yaw = self.keyframes[0][1:]
+
+    def update(self):
+        # Advance to the last keyframe that has started
+        while self._index + 1 < len(self.keyframes) and self.keyframes[self._index + 1][0] <= self.time:
+            self._index += 1
+        self.throttle, self.roll, self.pitch, self.yaw = self.keyframes[self._index][1:]
+        self.time += self.dt
+        return self.throttle, self.roll, self.pitch, self.yaw
+
+    def get_raw_values(self):
+        """Return the current stick values for display purposes"""
+        return self.throttle, self.roll, self.pitch, self.yaw
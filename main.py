@@ -4,17 +4,38 @@ from pygame.locals import *
 from OpenGL.GL import *
 from OpenGL.GLU import *
 import sys
+import time
+import datetime
 
 from physics.drone_physics import DronePhysics
+from physics.rate_controlled_physics import RateControlledDronePhysics
 from rendering.camera import FPVCamera
 from rendering.drone_renderer import DroneRenderer
+from rendering.drone_mesh import DroneMesh
+from rendering.swarm_renderer import SwarmRenderer
 from rendering.hud import HUD
+from rendering.path_renderer import PathRenderer
+from rendering.profiler_overlay import ProfilerOverlay
+from rendering.frustum import Frustum
 from environment.environment import Environment
+from environment.chunked import ChunkedEnvironment
+from environment.terrain import Terrain
 from input.controller import ControllerInput
+from input.sampler import InputSampler
+from simulation.physics_loop import PhysicsLoop
+from simulation.race import RaceField
+from simulation.race_timing import RaceTimer
+from simulation.prediction import TrajectoryPredictor
+from recording.recorder import FlightRecorder
+from recording.format import EVENT_RESET
+from telemetry.server import TelemetryServer
+from simulation.determinism import run_metadata
+from utils.profiler import FrameProfiler
 
       
 class DroneSimulator:
-    def __init__(self):
+    def __init__(self, record_path=None, seed=None, endless=False, race_drones=0, controller_rate=None,
+                 physics_backend=None, terrain_path=None, telemetry_port=None):
         pygame.init()
         self.width, self.height = 1024, 768
         pygame.display.set_caption("FPV Drone Simulator - Race Gates")
@@ -25,69 +46,176 @@ class DroneSimulator:
         glClearColor(0.5, 0.7, 1.0, 1.0)  # Sky blue
         glMatrixMode(GL_PROJECTION)
         gluPerspective(90, self.width/self.height, 0.1, 1000.0)
-        self.drone_physics = DronePhysics()
-        self.environment = Environment()
+        # With a controller rate the sticks command body rates through an
+        # acro flight controller instead of driving the motors directly
+        if controller_rate:
+            self.drone_physics = RateControlledDronePhysics(controller_rate=controller_rate)
+        else:
+            self.drone_physics = DronePhysics()
+        # The endless course streams seeded chunks in around the drone; a
+        # terrain file is memory-mapped, so even huge maps open instantly
+        if endless:
+            self.environment = ChunkedEnvironment(seed)
+        else:
+            self.environment = Environment(seed, terrain=Terrain(terrain_path) if terrain_path else None)
+        self.environment.prepare_drone(self.drone_physics)
         self.controller = ControllerInput()
-        self.camera = FPVCamera(self.drone_physics)
-        self.renderer = DroneRenderer(self.drone_physics)
-        self.hud = HUD(self.screen, self.font, self.drone_physics)
+        # Sticks are sampled at 1 kHz on their own thread; each physics tick
+        # takes the sample nearest to the time it simulates. Joystick axes
+        # only change when the main loop pumps events, so the sampler sees a
+        # new stick position once per frame
+        self.input_sampler = InputSampler(self.controller, rate=1000.0)
+        self.input_latency = 0.0
+
+        # Race mode: AI drones flying the course, stepped with the player on
+        # the physics thread as one batch
+        self.race_field = None
+        if race_drones:
+            self.race_field = RaceField(self.environment, race_drones, seed=self.environment.seed,
+                                        backend=physics_backend)
+            print(f"Race field: {race_drones} drones on the {self.race_field.batch.backend.name} physics backend")
+        # Lap and split timing round the fixed course (gate 0 is start/finish)
+        self.race_timer = None if endless else RaceTimer(self.environment.gates)
+
+        # Live state for dashboards: UDP on telemetry_port, WebSocket on the next port
+        self.telemetry = None
+        if telemetry_port is not None:
+            self.telemetry = TelemetryServer(udp_port=telemetry_port, websocket_port=telemetry_port + 1)
+            self.telemetry.start()
+            print(f"Telemetry: udp://127.0.0.1:{self.telemetry.udp_port}, "
+                  f"ws://127.0.0.1:{self.telemetry.websocket_port}/")
+
+        # Physics runs on its own fixed-rate thread; camera, renderer and HUD
+        # read a render-side drone holding the interpolated snapshot
+        self.physics_loop = PhysicsLoop(self.drone_physics, self.environment,
+                                        self.input_sampler.sample_at, max_substeps=10,
+                                        field=self.race_field, timer=self.race_timer, telemetry=self.telemetry)
+        self.state = self.physics_loop.current
+        if record_path is not None:
+            # Physics ticks use one stick sample each and resets and sensitivity
+            # changes are logged, so a recording replays exactly with
+            # simulation.determinism.replay_log
+            self.physics_loop.recorder = FlightRecorder(
+                record_path, self.drone_physics.dt,
+                metadata=run_metadata(self.environment, self.drone_physics))
+        self.render_drone = DronePhysics()
+        self.camera = FPVCamera(self.render_drone)
+        # One cached drone mesh shared by the player's drone and the AI field
+        self.drone_mesh = DroneMesh.for_drone(self.drone_physics)
+        self.renderer = DroneRenderer(self.render_drone, self.drone_mesh)
+        self.swarm_renderer = SwarmRenderer(self.drone_mesh, self.drone_physics.max_motor_thrust)
+        self.hud = HUD(self.screen, self.font, self.render_drone, refresh_rate=30.0)
+        # Predicted path under the current sticks, 2 s ahead; T toggles it
+        self.predictor = TrajectoryPredictor(self.drone_physics, self.environment, horizon=2.0, budget=0.002)
+        self.path_renderer = PathRenderer()
+        self.show_prediction = True
+
+        # Per-stage frame timings; F3 toggles the overlay, F4 exports a Chrome trace
+        self.profiler = FrameProfiler(('input', 'wait', 'interpolate', 'world', 'predict', 'drone', 'hud', 'flip'),
+                                      thread_stages=('physics', 'collision', 'race'))
+        self.profiler_overlay = ProfilerOverlay(self.screen, self.font, self.profiler)
+        self.physics_time = 0.0
+        self.collision_time = 0.0
+        self.field_time = 0.0
         self.running = True
         self.paused = False
         self.clock = pygame.time.Clock()
         self.fps = 120
-        self.physics_accumulator = 0.0
         self.third_person_view = False
         self.sensitivity_step = 0.01
 
+    def reset_drone(self):
+        # Runs on the physics thread (see PhysicsLoop.submit)
+        self.environment.reset_drone(self.drone_physics)
+        if self.race_timer is not None:
+            self.race_timer.reset()
+
+    def adjust_sensitivity(self, control, amount):
+        self.physics_loop.submit(lambda: self.drone_physics.adjust_sensitivity(control, amount))
+
     def run(self):
+        self.input_sampler.start()
+        self.physics_loop.start()
         while self.running:
+            self.profiler.begin_frame()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     self.running = False
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_p:
                         self.paused = not self.paused
+                        self.physics_loop.paused = self.paused
                     if event.key == pygame.K_r:
-                        self.drone_physics.position = np.array([0.0, 0.0, 5.0])
-                        self.drone_physics.velocity = np.array([0.0, 0.0, 0.0])
-                        self.drone_physics.rotation = np.array([0.0, 0.0, 0.0])
-                        self.drone_physics.angular_velocity = np.array([0.0, 0.0, 0.0])
+                        self.physics_loop.submit(self.reset_drone, EVENT_RESET)
                     if event.key == pygame.K_v:
                         self.third_person_view = not self.third_person_view
+                    if event.key == pygame.K_t:
+                        self.show_prediction = not self.show_prediction
+                    if event.key == pygame.K_F3:
+                        self.profiler_overlay.toggle()
+                    if event.key == pygame.K_F4:
+                        path = datetime.datetime.now().strftime("profile_%Y%m%d_%H%M%S.json")
+                        self.profiler.export_chrome_trace(path)
+                        print(f"Frame profile written to {path}")
                     
                     # Sensitivity adjustment keys
                     if event.key == pygame.K_1:
-                        self.drone_physics.adjust_sensitivity('roll', -self.sensitivity_step)
+                        self.adjust_sensitivity('roll', -self.sensitivity_step)
                     if event.key == pygame.K_2:
-                        self.drone_physics.adjust_sensitivity('roll', self.sensitivity_step)
+                        self.adjust_sensitivity('roll', self.sensitivity_step)
                     if event.key == pygame.K_3:
-                        self.drone_physics.adjust_sensitivity('pitch', -self.sensitivity_step)
+                        self.adjust_sensitivity('pitch', -self.sensitivity_step)
                     if event.key == pygame.K_4:
-                        self.drone_physics.adjust_sensitivity('pitch', self.sensitivity_step)
+                        self.adjust_sensitivity('pitch', self.sensitivity_step)
                     if event.key == pygame.K_5:
-                        self.drone_physics.adjust_sensitivity('yaw', -self.sensitivity_step)
+                        self.adjust_sensitivity('yaw', -self.sensitivity_step)
                     if event.key == pygame.K_6:
-                        self.drone_physics.adjust_sensitivity('yaw', self.sensitivity_step)
+                        self.adjust_sensitivity('yaw', self.sensitivity_step)
             
-            # Update controller input - no arming check needed
-            throttle, roll, pitch, yaw = self.controller.update()
-            
-            # Process physics - no arming check needed
-            dt = self.clock.tick(self.fps) / 1000.0
+            self.profiler.lap('input')
+
+            self.clock.tick(self.fps)
             self.fps = self.clock.get_fps()
-            
-            if not self.paused:
-                self.physics_accumulator += dt
-                while self.physics_accumulator >= self.drone_physics.dt:
-                    self.drone_physics.apply_controller_input(throttle, roll, pitch, yaw)
-                    self.drone_physics.update()
-                    self.environment.check_collisions(self.drone_physics)
-                    self.physics_accumulator -= self.drone_physics.dt
-            
-            # Render the scene
+            self.profiler.lap('wait')
+
+            # Render the scene from the interpolated physics state
+            state = self.physics_loop.interpolated_state()
+            state.apply_to(self.render_drone)
+            self.state = state
+            self.profiler.lap('interpolate')
             self.render()
             pygame.display.flip()
-            
+            # Sticks to screen, including render and present; the HUD shows it on the next frame
+            self.input_latency = time.perf_counter() - state.input_time
+            self.profiler.lap('flip')
+
+            # Physics thread time spent since the last frame
+            physics_time = self.physics_loop.physics_time
+            collision_time = self.physics_loop.collision_time
+            self.profiler.add('physics', physics_time - self.physics_time)
+            self.profiler.add('collision', collision_time - self.collision_time)
+            if self.telemetry is not None:
+                self.telemetry.update_frame(self.clock.get_time() / 1000.0, self.fps, self.input_latency,
+                                            physics_time - self.physics_time)
+            self.physics_time, self.collision_time = physics_time, collision_time
+            field_time = self.physics_loop.field_time
+            self.profiler.add('race', field_time - self.field_time)
+            self.field_time = field_time
+            self.profiler.end_frame()
+
+        self.physics_loop.stop()
+        self.input_sampler.stop()
+        if self.telemetry is not None:
+            self.telemetry.stop()
+        if self.physics_loop.recorder is not None:
+            self.physics_loop.recorder.close()
+        if isinstance(self.drone_physics, RateControlledDronePhysics):
+            controller = self.drone_physics.flight_controller
+            print(f"Flight controller: {controller.loop_rate:.0f} Hz achieved, "
+                  f"{controller.cost_per_sim_second * 1000:.1f} ms per simulated second")
+        if self.race_timer is not None and self.race_timer.laps[0]:
+            laps = ", ".join(f"{lap:.2f}" for lap in self.race_timer.laps[0])
+            print(f"Lap times (s): {laps}; best {self.race_timer.best_lap[0]:.2f}")
         pygame.quit()
         sys.exit()
 
@@ -98,11 +226,12 @@ class DroneSimulator:
         
         if self.third_person_view:
             # Third-person view - position the camera behind and above the drone
-            drone_pos = self.drone_physics.position
+            drone_pos = self.render_drone.position
             
             # Position camera behind and above the drone
             camera_offset = np.array([-5.0, 0.0, 3.0])  # behind and above
             camera_pos = drone_pos + camera_offset
+            eye = camera_pos
             
             # Look at the drone
             gluLookAt(
@@ -113,21 +242,36 @@ class DroneSimulator:
         else:
             # First-person view from the drone's perspective
             cam_pos, look_at, up_vector = self.camera.get_view_matrix()
+            eye = cam_pos
             gluLookAt(
                 cam_pos[0], cam_pos[1], cam_pos[2],
                 look_at[0], look_at[1], look_at[2],
                 up_vector[0], up_vector[1], up_vector[2]
             )
         
-        # Render the environment
-        self.environment.render()
+        # Render the environment, culled against the current view frustum
+        frustum = Frustum.from_gl()
+        self.environment.render(frustum, eye)
+        self.profiler.lap('world')
+
+        # Lookahead from the latest whole physics tick, within a fixed time budget
+        if self.show_prediction:
+            path = self.predictor.update(self.physics_loop.latest_state())
+            self.path_renderer.render(path, self.predictor.impact is not None)
+        self.profiler.lap('predict')
         
         # Always render the drone in third-person view
         if self.third_person_view:
             self.renderer.render()
-            
+        # AI drones: one instanced draw for the whole field
+        if self.state.field_position is not None:
+            self.swarm_renderer.render(self.state.field_position, self.state.field_rotation,
+                                       self.state.field_motor_forces, frustum)
+        self.profiler.lap('drone')
+
         # Draw the HUD
         self.draw_hud()
+        self.profiler.lap('hud')
 
     def draw_hud(self):
         glMatrixMode(GL_PROJECTION)
@@ -137,7 +281,9 @@ class DroneSimulator:
         glPushMatrix()
         glLoadIdentity()
         glDisable(GL_DEPTH_TEST)
-        self.hud.render(self.controller, self.fps)  # Pass controller, not self
+        self.hud.render(self.controller, self.fps, self.environment.render_stats, self.input_latency,
+                        self.race_timer)  # Pass controller, not self
+        self.profiler_overlay.render()
         glEnable(GL_DEPTH_TEST)
         glMatrixMode(GL_MODELVIEW)
         glPopMatrix()
@@ -146,5 +292,27 @@ class DroneSimulator:
         glMatrixMode(GL_MODELVIEW)
 
 if __name__ == "__main__":
-    simulator = DroneSimulator()
+    import argparse
+    parser = argparse.ArgumentParser(description="FPV drone simulator")
+    parser.add_argument('--record', default=None, help="write a flight log to this path")
+    parser.add_argument('--seed', type=int, default=None, help="environment random seed")
+    parser.add_argument('--endless', action='store_true', help="fly an endless procedurally generated course")
+    parser.add_argument('--controller-rate', type=float, default=None, metavar='HZ',
+                        help="fly in acro mode through a rate controller running at this rate")
+    parser.add_argument('--race', type=int, default=0, metavar='N', help="race against N AI drones")
+    parser.add_argument('--physics-backend', default=None, choices=('auto', 'numpy', 'python', 'numba'),
+                        help="compute backend for the AI field (default: $DRONE_PHYSICS_BACKEND or auto)")
+    parser.add_argument('--terrain', default=None, metavar='MAP',
+                        help="fly over a heightmap terrain file (see environment.terrain)")
+    parser.add_argument('--telemetry', type=int, default=None, metavar='PORT',
+                        help="stream live state over UDP on PORT and WebSocket on PORT + 1")
+    args = parser.parse_args()
+    if args.race and args.endless:
+        parser.error("--race needs the fixed course; it cannot be combined with --endless")
+    if args.terrain and args.endless:
+        parser.error("--terrain needs the fixed course; it cannot be combined with --endless")
+    simulator = DroneSimulator(record_path=args.record, seed=args.seed, endless=args.endless,
+                               race_drones=args.race, controller_rate=args.controller_rate,
+                               physics_backend=args.physics_backend, terrain_path=args.terrain,
+                               telemetry_port=args.telemetry)
     simulator.run()
\ No newline at end of file
@@ -1,3 +1,11 @@
 from .drone_physics import DronePhysics
+from .drone_physics_batch import DronePhysicsBatch
+from .backends import select_backend, available_backends
+from .quaternion_physics import QuaternionDronePhysics
+from .fast_physics import FastDronePhysics
+from .flight_controller import FlightController, RatePID
+from .rate_controlled_physics import RateControlledDronePhysics
+from .state_hash import state_hash
 
-__all__ = ['DronePhysics']
\ No newline at end of file
+__all__ = ['DronePhysics', 'DronePhysicsBatch', 'select_backend', 'available_backends', 'QuaternionDronePhysics', 'FastDronePhysics',
+           'FlightController', 'RatePID', 'RateControlledDronePhysics', 'state_hash']
\ No newline at end of file
@@ -0,0 +1,361 @@
+"""
+Compute backends for DronePhysicsBatch.
+
+A backend implements the three parts of the drone model on a batch's
+struct-of-arrays state: thrust mixing (apply_controller_input), the
+rigid-body step with battery drain (update) and ground contact.
+
+- 'numpy': vectorized NumPy over all drones; the fastest choice for large
+  batches without Numba.
+- 'python': plain Python floats, one drone at a time; no per-call NumPy
+  overhead, so it wins for a handful of drones.
+- 'numba': the per-drone kernels compiled with Numba's JIT; only available
+  when Numba is installed.
+
+The drone model is written once, in mix_kernel, step_kernel and
+ground_kernel, and every backend runs those functions. They only index
+their arguments (a[i][k]), use math and the clip, where and maximum
+helpers, and have no data-dependent branches. So they run interpreted on
+nested lists ('python'), compile unchanged under numba.njit on arrays
+('numba'), and run once on whole columns with math and the helpers bound
+to their NumPy counterparts ('numpy'): there each drone value is an (N,)
+array holding that value for every drone.
+
+select_backend() picks a backend from a name or the DRONE_PHYSICS_BACKEND
+environment variable. 'auto' (the default) means Numba when it is
+installed and NumPy otherwise; asking for 'numba' without Numba installed
+silently falls back the same way.
+"""
+import math
+import os
+import types
+import numpy as np
+
+
+def clip(value, low, high):
+    """value limited to [low, high]; the kernels use this instead of min(max()) so NumPy can replace it."""
+    return min(max(value, low), high)
+
+
+def where(condition, if_true, if_false):
+    """A branch the kernels can take for every drone at once under NumPy."""
+    return if_true if condition else if_false
+
+
+def maximum(a, b):
+    """max() of two values, replaceable by np.maximum."""
+    return max(a, b)
+
+
+def mix_kernel(throttle, roll, pitch, yaw, sensitivities, max_thrust, forces, power_rate):
+    """X-quad thrust mixing for every drone, as DronePhysics.apply_controller_input."""
+    for i in range(len(forces)):
+        limit = max_thrust[i]
+        thrust_base = (throttle[i] + 1.0) / 2.0 * limit
+        sensitivity = sensitivities[i]
+        roll_force = roll[i] * sensitivity[0] * thrust_base
+        pitch_force = pitch[i] * sensitivity[1] * thrust_base
+        yaw_force = yaw[i] * sensitivity[2] * thrust_base
+
+        f0 = clip(thrust_base - roll_force + pitch_force - yaw_force, 0.0, limit)
+        f1 = clip(thrust_base + roll_force + pitch_force + yaw_force, 0.0, limit)
+        f2 = clip(thrust_base + roll_force - pitch_force - yaw_force, 0.0, limit)
+        f3 = clip(thrust_base - roll_force - pitch_force + yaw_force, 0.0, limit)
+        row = forces[i]
+        row[0] = f0
+        row[1] = f1
+        row[2] = f2
+        row[3] = f3
+        power_rate[i] = (((f0 + f1) + f2) + f3) * 0.1 * 10
+
+
+def step_kernel(dt, g, motor_positions, yaw_constant, mass, drag_coefficient, angular_damping, inertia,
+                position, velocity, acceleration, rotation, angular_velocity, forces,
+                battery_remaining, power_rate):
+    """Battery drain and one semi-implicit Euler step for every drone, as DronePhysics.update."""
+    rx0, ry0 = motor_positions[0][0], motor_positions[0][1]
+    rx1, ry1 = motor_positions[1][0], motor_positions[1][1]
+    rx2, ry2 = motor_positions[2][0], motor_positions[2][1]
+    rx3, ry3 = motor_positions[3][0], motor_positions[3][1]
+    limit = math.pi / 2 - 0.1
+    two_pi = 2 * math.pi
+
+    for i in range(len(position)):
+        # Battery; an empty one cuts the motors
+        force = forces[i]
+        remaining = maximum(battery_remaining[i] - power_rate[i] * dt, 0.0)
+        battery_remaining[i] = remaining
+        empty = remaining <= 0.0
+        f0 = where(empty, 0.0, force[0])
+        f1 = where(empty, 0.0, force[1])
+        f2 = where(empty, 0.0, force[2])
+        f3 = where(empty, 0.0, force[3])
+        force[0] = f0
+        force[1] = f1
+        force[2] = f2
+        force[3] = f3
+        total_force = ((f0 + f1) + f2) + f3
+
+        angles = rotation[i]
+        roll, pitch, yaw = angles[0], angles[1], angles[2]
+        sr, cr = math.sin(roll), math.cos(roll)
+        sp, cp = math.sin(pitch), math.cos(pitch)
+        sy, cy = math.sin(yaw), math.cos(yaw)
+
+        # Lift along the body z-axis: third column of Rz @ Ry @ Rx
+        lift_x = (sy * sr + cy * sp * cr) * total_force
+        lift_y = (sy * sp * cr - cy * sr) * total_force
+        lift_z = (cp * cr) * total_force
+
+        # r x (0, 0, f) = (r_y f, -r_x f, 0) plus alternating reactive yaw torque
+        torque_x = ((ry0 * f0 + ry1 * f1) + ry2 * f2) + ry3 * f3
+        torque_y = ((-(rx0 * f0) - rx1 * f1) - rx2 * f2) - rx3 * f3
+        torque_z = ((f0 * yaw_constant - f1 * yaw_constant) + f2 * yaw_constant) - f3 * yaw_constant
+
+        # Gravity and drag
+        m = mass[i]
+        drag = -drag_coefficient[i]
+        v = velocity[i]
+        vx, vy, vz = v[0], v[1], v[2]
+        ax = (lift_x + drag * vx * abs(vx)) / m
+        ay = (lift_y + drag * vy * abs(vy)) / m
+        az = ((lift_z + -m * g) + drag * vz * abs(vz)) / m
+
+        # Angular acceleration with damping
+        damping = -angular_damping[i]
+        moment = inertia[i]
+        w = angular_velocity[i]
+        wx, wy, wz = w[0], w[1], w[2]
+        alpha_x = torque_x / moment[0] + damping * wx * abs(wx)
+        alpha_y = torque_y / moment[1] + damping * wy * abs(wy)
+        alpha_z = torque_z / moment[2] + damping * wz * abs(wz)
+
+        vx += ax * dt
+        vy += ay * dt
+        vz += az * dt
+        p = position[i]
+        p[0] += vx * dt
+        p[1] += vy * dt
+        p[2] += vz * dt
+        wx += alpha_x * dt
+        wy += alpha_y * dt
+        wz += alpha_z * dt
+
+        # Body rates to Euler angle rates (avoid division by zero near ±90° pitch)
+        cp_safe = maximum(abs(cp), 0.001) * math.copysign(1.0, cp)
+        tp = math.tan(pitch)
+        roll_rate = (wx + sr * tp * wy) + cr * tp * wz
+        pitch_rate = cr * wy + -sr * wz
+        yaw_rate = sr / cp_safe * wy + cr / cp_safe * wz
+        angles[0] = clip(roll + roll_rate * dt, -limit, limit)
+        angles[1] = clip(pitch + pitch_rate * dt, -limit, limit)
+        angles[2] = (yaw + yaw_rate * dt) % two_pi
+
+        a = acceleration[i]
+        a[0] = ax
+        a[1] = ay
+        a[2] = az
+        v[0] = vx
+        v[1] = vy
+        v[2] = vz
+        w[0] = wx
+        w[1] = wy
+        w[2] = wz
+
+
+def ground_kernel(position, velocity, angular_velocity):
+    """Ground contact for every drone, as DronePhysics.apply_ground_contact."""
+    for i in range(len(position)):
+        p = position[i]
+        v = velocity[i]
+        w = angular_velocity[i]
+        on_ground = p[2] < 0.1
+        p[2] = where(on_ground, 0.1, p[2])
+        # A descending drone bounces; the others are scaled by 1.0, which leaves them unchanged
+        descending = on_ground & (v[2] < 0.0)
+        v[2] = where(descending, -v[2] * 0.3, v[2])
+        bounce = where(descending, 0.8, 1.0)
+        v[0] *= bounce
+        v[1] *= bounce
+        w[0] *= bounce
+        w[1] *= bounce
+        w[2] *= bounce
+        # Hard landing - more energy loss
+        hard = on_ground & (math.sqrt(v[0] * v[0] + v[1] * v[1] + v[2] * v[2]) > 3.0)
+        landing = where(hard, 0.1, 1.0)
+        v[0] *= landing
+        v[1] *= landing
+        v[2] *= landing
+        w[0] *= landing
+        w[1] *= landing
+        w[2] *= landing
+
+
+def per_drone(value, count):
+    """A scalar or (N,) stick input as a contiguous (N,) float array."""
+    return np.ascontiguousarray(np.broadcast_to(np.asarray(value, dtype=float), (count,)))
+
+
+def rebind(kernel, functions):
+    """A copy of kernel whose global names in functions refer to the given objects instead."""
+    return types.FunctionType(kernel.__code__, {**kernel.__globals__, **functions}, kernel.__name__,
+                              kernel.__defaults__, kernel.__closure__)
+
+
+def numpy_clip(value, low, high):
+    return np.minimum(np.maximum(value, low), high)
+
+
+# What the kernels call, as NumPy ufuncs working on whole columns
+NUMPY_FUNCTIONS = {
+    'math': types.SimpleNamespace(sin=np.sin, cos=np.cos, tan=np.tan, sqrt=np.sqrt, copysign=np.copysign,
+                                  pi=math.pi),
+    'clip': numpy_clip,
+    'where': np.where,
+    'maximum': np.maximum,
+}
+
+
+class PythonBackend:
+    """
+    The per-drone kernels run by the interpreter on nested lists: the batch
+    arrays are converted with pack() and written back with unpack() after
+    each call.
+    """
+
+    name = 'python'
+
+    def __init__(self):
+        self.mix_kernel = mix_kernel
+        self.step_kernel = step_kernel
+        self.ground_kernel = ground_kernel
+
+    def pack(self, array):
+        return array.tolist()
+
+    def unpack(self, array, values):
+        array[:] = values
+
+    def mix(self, batch, throttle, roll, pitch, yaw):
+        count = batch.count
+        forces = self.pack(batch.motor_forces)
+        power_rate = self.pack(batch.power_consumption_rate)
+        self.mix_kernel(self.pack(per_drone(throttle, count)), self.pack(per_drone(roll, count)),
+                        self.pack(per_drone(pitch, count)), self.pack(per_drone(yaw, count)),
+                        self.pack(batch.sensitivities), self.pack(batch.max_motor_thrust), forces, power_rate)
+        self.unpack(batch.motor_forces, forces)
+        self.unpack(batch.power_consumption_rate, power_rate)
+
+    def step(self, batch):
+        state = [self.pack(getattr(batch, name)) for name in STEP_STATE]
+        self.step_kernel(batch.dt, batch.g, batch.motor_positions.tolist(), batch.yaw_torque_constant,
+                         self.pack(batch.mass), self.pack(batch.drag_coefficient),
+                         self.pack(batch.angular_damping), self.pack(batch.moment_of_inertia), *state)
+        for name, values in zip(STEP_STATE, state):
+            self.unpack(getattr(batch, name), values)
+
+    def ground_contact(self, batch):
+        # Nothing to convert unless a drone is on the ground
+        if batch.position[:, 2].min() >= 0.1:
+            return
+        state = [self.pack(getattr(batch, name)) for name in GROUND_STATE]
+        self.ground_kernel(*state)
+        for name, values in zip(GROUND_STATE, state):
+            self.unpack(getattr(batch, name), values)
+
+
+class NumpyBackend(PythonBackend):
+    """
+    The per-drone kernels run once per call on the whole batch: the kernels
+    see a single drone whose values are (N,) column arrays, and call NumPy
+    ufuncs in place of math, clip, where and maximum.
+    """
+
+    name = 'numpy'
+
+    def __init__(self):
+        self.mix_kernel = rebind(mix_kernel, NUMPY_FUNCTIONS)
+        self.step_kernel = rebind(step_kernel, NUMPY_FUNCTIONS)
+        self.ground_kernel = rebind(ground_kernel, NUMPY_FUNCTIONS)
+
+    def pack(self, array):
+        # Copies, so the kernels' augmented assignments never write into the batch directly
+        return [list(array.T.copy()) if array.ndim == 2 else array.copy()]
+
+    def unpack(self, array, values):
+        if array.ndim == 1:
+            array[:] = values[0]
+            return
+        for k, column in enumerate(values[0]):
+            array[:, k] = column
+
+
+class NumbaBackend(PythonBackend):
+    """
+    The per-drone kernels compiled with numba.njit, working in place on the
+    batch arrays. Raises ImportError when Numba is not installed; the first
+    call of each kernel includes its compilation (cached on disk).
+    """
+
+    name = 'numba'
+
+    def __init__(self):
+        import numba
+        helpers = {name: numba.njit(cache=True)(function)
+                   for name, function in (('clip', clip), ('where', where), ('maximum', maximum))}
+        self.mix_kernel = numba.njit(cache=True)(rebind(mix_kernel, helpers))
+        self.step_kernel = numba.njit(cache=True)(rebind(step_kernel, helpers))
+        self.ground_kernel = numba.njit(cache=True)(rebind(ground_kernel, helpers))
+
+    def mix(self, batch, throttle, roll, pitch, yaw):
+        count = batch.count
+        self.mix_kernel(per_drone(throttle, count), per_drone(roll, count), per_drone(pitch, count),
+                        per_drone(yaw, count), batch.sensitivities, batch.max_motor_thrust,
+                        batch.motor_forces, batch.power_consumption_rate)
+
+    def step(self, batch):
+        self.step_kernel(batch.dt, batch.g, batch.motor_positions, batch.yaw_torque_constant,
+                         batch.mass, batch.drag_coefficient, batch.angular_damping, batch.moment_of_inertia,
+                         *[getattr(batch, name) for name in STEP_STATE])
+
+    def ground_contact(self, batch):
+        self.ground_kernel(*[getattr(batch, name) for name in GROUND_STATE])
+
+
+# Batch arrays the kernels update in place, in kernel argument order
+STEP_STATE = ('position', 'velocity', 'acceleration', 'rotation', 'angular_velocity', 'motor_forces',
+              'battery_remaining', 'power_consumption_rate')
+GROUND_STATE = ('position', 'velocity', 'angular_velocity')
+
+BACKENDS = {cls.name: cls for cls in (NumpyBackend, PythonBackend, NumbaBackend)}
+
+
+def available_backends():
+    """Names of the backends that can be created here."""
+    names = []
+    for name, cls in BACKENDS.items():
+        try:
+            cls()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def select_backend(name=None):
+    """
+    A backend instance by name ('numpy', 'python', 'numba' or 'auto'). With
+    no name, DRONE_PHYSICS_BACKEND decides, defaulting to 'auto'. Numba
+    falls back to NumPy when it is not installed.
+    """
+    if name is None:
+        name = os.environ.get('DRONE_PHYSICS_BACKEND', 'auto')
+    name = name.lower()
+    if name == 'auto':
+        name = 'numba'
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown physics backend {name!r}; choose from auto, {', '.join(BACKENDS)}")
+    try:
+        return BACKENDS[name]()
+    except ImportError:
+        return NumpyBackend()
@@ -0,0 +1,64 @@
+import numpy as np
+import math
+from utils.math_utils import rotation_matrix_from_euler
+
+
+class DerivedState:
+    """
+    Quantities derived from a drone's state, computed once per state version
+    and shared by physics, camera, renderer and HUD.
+    """
+
+    __slots__ = (
+        'version', 'rotation_matrix', 'right', 'forward', 'up',
+        'speed', 'euler_degrees', 'gl_model_matrix',
+    )
+
+    def __init__(self, version, rotation_matrix, position, rotation, velocity):
+        self.version = version
+        self.rotation_matrix = rotation_matrix
+
+        # Body axes in world coordinates: x is right, y is forward (the FPV
+        # camera looks along +y), z is up and carries the lift
+        self.right = rotation_matrix[:, 0]
+        self.forward = rotation_matrix[:, 1]
+        self.up = rotation_matrix[:, 2]
+
+        vx, vy, vz = velocity
+        self.speed = math.sqrt(vx * vx + vy * vy + vz * vz)
+        self.euler_degrees = (math.degrees(rotation[0]), math.degrees(rotation[1]), math.degrees(rotation[2]))
+
+        # Model matrix in the column-major layout glMultMatrixf expects
+        gl_matrix = np.zeros((4, 4), dtype=np.float32)
+        gl_matrix[:3, :3] = rotation_matrix.T
+        gl_matrix[3, :3] = position
+        gl_matrix[3, 3] = 1.0
+        self.gl_model_matrix = gl_matrix
+
+
+class DerivedStateMixin:
+    """
+    Versioned derived-state cache for physics objects.
+
+    The cache serves camera, renderer and HUD; the physics step never reads
+    it. Anything that changes position, rotation or velocity must call
+    invalidate_derived() afterwards; update() does this itself.
+    """
+
+    __slots__ = ()
+
+    def invalidate_derived(self):
+        self.state_version += 1
+
+    def compute_rotation_matrix(self):
+        roll, pitch, yaw = self.rotation
+        return rotation_matrix_from_euler(roll, pitch, yaw)
+
+    @property
+    def derived(self):
+        cached = self._derived
+        if cached is None or cached.version != self.state_version:
+            cached = DerivedState(self.state_version, self.compute_rotation_matrix(),
+                                  self.position, self.rotation, self.velocity)
+            self._derived = cached
+        return cached
@@ -1,9 +1,14 @@
 import numpy as np
 import math
-from utils.math_utils import rotation_matrix_from_euler
+from physics.derived_state import DerivedStateMixin
 
-class DronePhysics:
+class DronePhysics(DerivedStateMixin):
     def __init__(self):
+        # Derived-state cache (rotation matrix, body axes, speed, ...),
+        # recomputed lazily whenever state_version changes
+        self.state_version = 0
+        self._derived = None
+
         # Drone physical properties
         self.mass = 0.5  # kg
         self.size = 0.25  # meters
@@ -44,6 +49,11 @@ class DronePhysics:
         self.battery_voltage = 3.7 * 4  # 4S LiPo (V)
         self.power_consumption_rate = 0.0  # mAh/s
 
+        # Optional ground surface (e.g. environment.terrain.Terrain) with a
+        # contact(position, velocity, angular_velocity) method; None is the
+        # flat ground at z = 0
+        self.terrain = None
+
     def apply_controller_input(self, throttle, roll, pitch, yaw):
         # Fix throttle mapping: -1.0 should be zero thrust, 1.0 should be max thrust
         # Map from -1.0,1.0 to 0.0,1.0 correctly
@@ -79,19 +89,14 @@ class DronePhysics:
         self.power_consumption_rate = power_draw * 10  # mAh/s
 
     def update(self):
-        # Update battery
-        self.battery_remaining -= self.power_consumption_rate * self.dt
-        self.battery_remaining = max(0, self.battery_remaining)
-        if self.battery_remaining <= 0:
-            self.motor_forces = np.zeros(4)
+        self.update_battery()
 
         # Calculate forces and torques from motors
         total_force = np.sum(self.motor_forces)
 
-        # Calculate lift force (assuming it's aligned with the drone's z-axis)
-        rotation_matrix = self.get_rotation_matrix()
-        lift_vector = rotation_matrix @ np.array([0, 0, 1])
-        lift_force = lift_vector * total_force
+        # Calculate lift force (aligned with the drone's z-axis), from the
+        # rotation itself: the derived-state cache is for readers of the state
+        lift_force = self.compute_rotation_matrix()[:, 2] * total_force
 
         # Calculate torques
         torque = np.zeros(3)
@@ -149,6 +154,25 @@ class DronePhysics:
         # Normalize yaw angle (keeping yaw between 0 and 2π)
         self.rotation[2] = self.rotation[2] % (2 * math.pi)
 
+        self.apply_ground_contact()
+        self.invalidate_derived()
+
+    def update_battery(self):
+        """
+        Drain the battery for one time step and cut the motors when it is empty.
+        """
+        self.battery_remaining -= self.power_consumption_rate * self.dt
+        self.battery_remaining = max(0, self.battery_remaining)
+        if self.battery_remaining <= 0:
+            self.motor_forces = np.zeros(4)
+
+    def apply_ground_contact(self):
+        """
+        Keep the drone above the ground and apply bounce/friction on contact.
+        """
+        if self.terrain is not None:
+            self.terrain.contact(self.position, self.velocity, self.angular_velocity)
+            return
         # Improved ground collision detection
         if self.position[2] < 0.1:  # Slightly above ground to prevent clipping
             self.position[2] = 0.1
@@ -168,9 +192,9 @@ class DronePhysics:
     def get_rotation_matrix(self):
         """
         Get the current rotation matrix based on drone's orientation.
+        The matrix is shared through the derived-state cache; do not modify it.
         """
-        roll, pitch, yaw = self.rotation
-        return rotation_matrix_from_euler(roll, pitch, yaw)
+        return self.derived.rotation_matrix
     
 
     def adjust_sensitivity(self, control, amount):
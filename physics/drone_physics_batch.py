@@ -0,0 +1,144 @@
+import numpy as np
+from physics.drone_physics import DronePhysics
+from physics.backends import select_backend
+from utils.math_utils import rotation_matrices_from_euler
+
+
+class DronePhysicsBatch:
+    """
+    Struct-of-arrays version of DronePhysics that steps N drones at once.
+
+    Every per-drone quantity is stored as an (N,) or (N, k) array, and
+    apply_controller_input / update run the same model as DronePhysics for
+    all drones in a single call to a compute backend (see physics.backends):
+    a backend instance or name, or None for select_backend()'s choice.
+    """
+
+    def __init__(self, count, template=None, backend=None):
+        self.count = count
+        if backend is None or isinstance(backend, str):
+            backend = select_backend(backend)
+        self.backend = backend
+
+        # Shared geometry and constants are taken from a single-drone template
+        if template is None:
+            template = DronePhysics()
+
+        self.size = template.size
+        self.g = template.g
+        self.dt = template.dt
+        self.motor_positions = np.array(template.motor_positions, dtype=float)
+        # Motor spin direction used for the reactive yaw torque (+1 / -1)
+        self.motor_torque_directions = np.array([1.0, -1.0, 1.0, -1.0])
+        self.yaw_torque_constant = 0.3
+
+        # Drone physical properties (one entry per drone, so sweeps can vary them)
+        self.mass = np.full(count, float(template.mass))
+        self.drag_coefficient = np.full(count, float(template.drag_coefficient))
+        self.max_motor_thrust = np.full(count, float(template.max_motor_thrust))
+        self.angular_damping = np.full(count, float(template.angular_damping))
+        self.moment_of_inertia = np.tile(np.asarray(template.moment_of_inertia, dtype=float), (count, 1))
+
+        # State
+        self.position = np.tile(np.asarray(template.position, dtype=float), (count, 1))
+        self.velocity = np.tile(np.asarray(template.velocity, dtype=float), (count, 1))
+        self.acceleration = np.tile(np.asarray(template.acceleration, dtype=float), (count, 1))
+        # roll, pitch, yaw (radians)
+        self.rotation = np.tile(np.asarray(template.rotation, dtype=float), (count, 1))
+        self.angular_velocity = np.tile(np.asarray(template.angular_velocity, dtype=float), (count, 1))
+
+        # Motor forces (N)
+        self.motor_forces = np.tile(np.asarray(template.motor_forces, dtype=float), (count, 1))
+
+        # Control sensitivity settings: columns are roll, pitch, yaw
+        self.sensitivities = np.tile(
+            np.array([template.roll_sensitivity, template.pitch_sensitivity, template.yaw_sensitivity], dtype=float),
+            (count, 1)
+        )
+
+        # Battery simulation
+        self.battery_capacity = np.full(count, float(template.battery_capacity))
+        self.battery_remaining = np.full(count, float(template.battery_remaining))
+        self.battery_voltage = template.battery_voltage
+        self.power_consumption_rate = np.full(count, float(template.power_consumption_rate))
+
+        # Optional ground surface with a contact_batch(positions, velocities,
+        # angular_velocities) method, as DronePhysics.terrain
+        self.terrain = getattr(template, 'terrain', None)
+
+    @classmethod
+    def from_drones(cls, drones):
+        """
+        Build a batch whose rows are copies of the given DronePhysics objects.
+        """
+        batch = cls(len(drones), template=drones[0])
+        for i, drone in enumerate(drones):
+            batch.set_drone_state(i, drone)
+        return batch
+
+    def set_drone_state(self, index, drone):
+        """
+        Copy the state and tunable parameters of a single DronePhysics into row `index`.
+        """
+        self.mass[index] = drone.mass
+        self.drag_coefficient[index] = drone.drag_coefficient
+        self.max_motor_thrust[index] = drone.max_motor_thrust
+        self.angular_damping[index] = drone.angular_damping
+        self.moment_of_inertia[index] = drone.moment_of_inertia
+        self.position[index] = drone.position
+        self.velocity[index] = drone.velocity
+        self.acceleration[index] = drone.acceleration
+        self.rotation[index] = drone.rotation
+        self.angular_velocity[index] = drone.angular_velocity
+        self.motor_forces[index] = drone.motor_forces
+        self.sensitivities[index] = (drone.roll_sensitivity, drone.pitch_sensitivity, drone.yaw_sensitivity)
+        self.battery_capacity[index] = drone.battery_capacity
+        self.battery_remaining[index] = drone.battery_remaining
+        self.power_consumption_rate[index] = drone.power_consumption_rate
+
+    def get_drone_state(self, index, drone):
+        """
+        Write the state of row `index` back into a single DronePhysics object.
+        """
+        drone.position = self.position[index].copy()
+        drone.velocity = self.velocity[index].copy()
+        drone.acceleration = self.acceleration[index].copy()
+        drone.rotation = self.rotation[index].copy()
+        drone.angular_velocity = self.angular_velocity[index].copy()
+        drone.motor_forces = self.motor_forces[index].copy()
+        drone.battery_remaining = float(self.battery_remaining[index])
+        drone.power_consumption_rate = float(self.power_consumption_rate[index])
+        drone.invalidate_derived()
+        return drone
+
+    def apply_controller_input(self, throttle, roll, pitch, yaw):
+        """
+        Apply stick inputs to every drone. Each argument is a scalar or an (N,) array.
+        """
+        self.backend.mix(self, throttle, roll, pitch, yaw)
+
+    def update(self):
+        self.backend.step(self)
+        if self.terrain is None:
+            self.backend.ground_contact(self)
+        else:
+            # Terrain contact is vectorized NumPy whatever the backend
+            self.terrain.contact_batch(self.position, self.velocity, self.angular_velocity)
+
+    def get_rotation_matrices(self):
+        """
+        Get the (N, 3, 3) rotation matrices for every drone's orientation.
+        """
+        return rotation_matrices_from_euler(self.rotation)
+
+    def adjust_sensitivity(self, control, amount, index=None):
+        """
+        Adjust the sensitivity of a specific control for one drone or all drones
+        control: 'roll', 'pitch', or 'yaw'
+        amount: positive to increase, negative to decrease
+        """
+        column = {'roll': 0, 'pitch': 1, 'yaw': 2}.get(control)
+        if column is None:
+            return
+        rows = slice(None) if index is None else index
+        self.sensitivities[rows, column] = np.clip(self.sensitivities[rows, column] + amount, 0.01, 1.0)
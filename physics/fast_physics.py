@@ -0,0 +1,240 @@
+import numpy as np
+import math
+from physics.derived_state import DerivedStateMixin
+
+
+class FastDronePhysics(DerivedStateMixin):
+    """
+    Allocation-free drop-in replacement for DronePhysics.
+
+    Same attributes and the same model evaluated in the same operation order,
+    but the hot path works on Python floats: state arrays are preallocated once
+    and updated in place, the torque for the X-quad motor layout is written out
+    in closed form, and no temporary NumPy arrays are created per tick.
+
+    Results agree with DronePhysics to rounding: its matmuls may round
+    differently from the sums written out here (a BLAS build may fuse
+    multiply-adds), so states can differ in the last bits.
+    """
+
+    __slots__ = (
+        'mass', 'size', 'drag_coefficient', 'max_motor_thrust',
+        'position', 'velocity', 'acceleration', 'rotation', 'angular_velocity',
+        'angular_damping', 'motor_forces', 'motor_positions',
+        'g', 'dt', 'moment_of_inertia',
+        'roll_sensitivity', 'pitch_sensitivity', 'yaw_sensitivity',
+        'battery_capacity', 'battery_remaining', 'battery_voltage', 'power_consumption_rate',
+        'terrain', 'state_version', '_derived',
+    )
+
+    def __init__(self):
+        # Drone physical properties
+        self.mass = 0.5  # kg
+        self.size = 0.25  # meters
+        self.drag_coefficient = 0.5
+        self.max_motor_thrust = 3.0  # Newtons
+        self.position = np.array([0.0, 0.0, 5.0])  # x, y, z (meters)
+        self.velocity = np.array([0.0, 0.0, 0.0])  # m/s
+        self.acceleration = np.array([0.0, 0.0, 0.0])  # m/s²
+        # roll, pitch, yaw (radians)
+        self.rotation = np.array([0.0, 0.0, 0.0])
+        self.angular_velocity = np.array([0.0, 0.0, 0.0])  # rad/s
+        self.angular_damping = 2.0
+
+        # Motor properties
+        self.motor_forces = np.array([0.0, 0.0, 0.0, 0.0])
+        self.motor_positions = np.array([
+            [-self.size, -self.size, 0],  # motor 1: front left
+            [self.size, -self.size, 0],   # motor 2: front right
+            [self.size, self.size, 0],    # motor 3: rear right
+            [-self.size, self.size, 0]    # motor 4: rear left
+        ])
+
+        # Constants
+        self.g = 9.81  # gravity acceleration (m/s²)
+        self.dt = 0.01  # physics time step (s)
+        self.moment_of_inertia = np.array([0.01, 0.01, 0.02])  # kg·m²
+
+        # Control sensitivity settings
+        self.roll_sensitivity = 0.3
+        self.pitch_sensitivity = 0.3
+        self.yaw_sensitivity = 2
+
+        # Battery simulation
+        self.battery_capacity = 1500  # mAh
+        self.battery_remaining = 1500  # mAh
+        self.battery_voltage = 3.7 * 4  # 4S LiPo (V)
+        self.power_consumption_rate = 0.0  # mAh/s
+
+        # Optional ground surface, see DronePhysics
+        self.terrain = None
+
+        # Derived-state cache, see DerivedStateMixin
+        self.state_version = 0
+        self._derived = None
+
+    def apply_controller_input(self, throttle, roll, pitch, yaw):
+        max_thrust = self.max_motor_thrust
+        thrust_base = (throttle + 1.0) / 2.0 * max_thrust
+
+        roll_force = roll * self.roll_sensitivity * thrust_base
+        pitch_force = pitch * self.pitch_sensitivity * thrust_base
+        yaw_force = yaw * self.yaw_sensitivity * thrust_base
+
+        # X configuration mixing, clamped to [0, max thrust]
+        f0 = min(max(thrust_base - roll_force + pitch_force - yaw_force, 0.0), max_thrust)
+        f1 = min(max(thrust_base + roll_force + pitch_force + yaw_force, 0.0), max_thrust)
+        f2 = min(max(thrust_base + roll_force - pitch_force - yaw_force, 0.0), max_thrust)
+        f3 = min(max(thrust_base - roll_force - pitch_force + yaw_force, 0.0), max_thrust)
+
+        forces = self.motor_forces
+        forces[0] = f0
+        forces[1] = f1
+        forces[2] = f2
+        forces[3] = f3
+
+        # Power consumption: sum * 0.1 W-equivalent, * 10 for mAh/s
+        self.power_consumption_rate = (((f0 + f1) + f2) + f3) * 0.1 * 10
+
+    def update(self):
+        dt = self.dt
+        self.update_battery()
+
+        f0, f1, f2, f3 = self.motor_forces.tolist()
+        total_force = ((f0 + f1) + f2) + f3
+
+        roll, pitch, yaw = self.rotation.tolist()
+        sr, cr = math.sin(roll), math.cos(roll)
+        sp, cp = math.sin(pitch), math.cos(pitch)
+        sy, cy = math.sin(yaw), math.cos(yaw)
+
+        # Lift along the body z-axis: third column of Rz @ Ry @ Rx
+        lift_x = (sy * sr + cy * sp * cr) * total_force
+        lift_y = (sy * sp * cr - cy * sr) * total_force
+        lift_z = (cp * cr) * total_force
+
+        # Closed-form torque for the X layout: r x (0, 0, f) = (r_y f, -r_x f, 0)
+        # plus alternating reactive yaw torque from the propellers
+        (rx0, ry0, _), (rx1, ry1, _), (rx2, ry2, _), (rx3, ry3, _) = self.motor_positions.tolist()
+        torque_x = ((ry0 * f0 + ry1 * f1) + ry2 * f2) + ry3 * f3
+        torque_y = ((-(rx0 * f0) - rx1 * f1) - rx2 * f2) - rx3 * f3
+        torque_z = ((f0 * 0.3 - f1 * 0.3) + f2 * 0.3) - f3 * 0.3
+
+        # Gravity and drag forces
+        mass = self.mass
+        drag = -self.drag_coefficient
+        vx, vy, vz = self.velocity.tolist()
+        ax = (lift_x + drag * vx * abs(vx)) / mass
+        ay = (lift_y + drag * vy * abs(vy)) / mass
+        az = ((lift_z + -mass * self.g) + drag * vz * abs(vz)) / mass
+
+        # Angular acceleration with damping (air resistance for rotation)
+        damping = -self.angular_damping
+        ix, iy, iz = self.moment_of_inertia.tolist()
+        wx, wy, wz = self.angular_velocity.tolist()
+        alpha_x = torque_x / ix + damping * wx * abs(wx)
+        alpha_y = torque_y / iy + damping * wy * abs(wy)
+        alpha_z = torque_z / iz + damping * wz * abs(wz)
+
+        # Semi-implicit Euler integration for position and velocity
+        vx += ax * dt
+        vy += ay * dt
+        vz += az * dt
+        px, py, pz = self.position.tolist()
+        px += vx * dt
+        py += vy * dt
+        pz += vz * dt
+
+        # Angular velocity in the drone's local frame
+        wx += alpha_x * dt
+        wy += alpha_y * dt
+        wz += alpha_z * dt
+
+        # Body rates to Euler angle rates (avoid division by zero near ±90° pitch)
+        cp_safe = max(abs(cp), 0.001) * math.copysign(1, cp)
+        tp = math.tan(pitch)
+        roll_rate = (wx + sr * tp * wy) + cr * tp * wz
+        pitch_rate = cr * wy + -sr * wz
+        yaw_rate = sr / cp_safe * wy + cr / cp_safe * wz
+
+        # Constrain roll and pitch to avoid gimbal lock, keep yaw in [0, 2π)
+        limit = math.pi / 2 - 0.1
+        roll = min(max(roll + roll_rate * dt, -limit), limit)
+        pitch = min(max(pitch + pitch_rate * dt, -limit), limit)
+        yaw = (yaw + yaw_rate * dt) % (2 * math.pi)
+
+        # Write back into the preallocated state arrays
+        acceleration = self.acceleration
+        acceleration[0] = ax
+        acceleration[1] = ay
+        acceleration[2] = az
+        velocity = self.velocity
+        velocity[0] = vx
+        velocity[1] = vy
+        velocity[2] = vz
+        position = self.position
+        position[0] = px
+        position[1] = py
+        position[2] = pz
+        angular_velocity = self.angular_velocity
+        angular_velocity[0] = wx
+        angular_velocity[1] = wy
+        angular_velocity[2] = wz
+        rotation = self.rotation
+        rotation[0] = roll
+        rotation[1] = pitch
+        rotation[2] = yaw
+
+        if pz < 0.1 or self.terrain is not None:
+            self.apply_ground_contact()
+        self.state_version += 1
+
+    def update_battery(self):
+        """
+        Drain the battery for one time step and cut the motors when it is empty.
+        """
+        self.battery_remaining -= self.power_consumption_rate * self.dt
+        self.battery_remaining = max(0, self.battery_remaining)
+        if self.battery_remaining <= 0:
+            self.motor_forces.fill(0.0)
+
+    def apply_ground_contact(self):
+        """
+        Keep the drone above the ground and apply bounce/friction on contact.
+        """
+        if self.terrain is not None:
+            self.terrain.contact(self.position, self.velocity, self.angular_velocity)
+            return
+        if self.position[2] < 0.1:  # Slightly above ground to prevent clipping
+            self.position[2] = 0.1
+            if self.velocity[2] < 0:  # Only reflect velocity if moving downward
+                self.velocity[2] = -self.velocity[2] * 0.3  # 30% bounce
+                self.velocity[0] *= 0.8
+                self.velocity[1] *= 0.8
+                self.angular_velocity *= 0.8
+
+            landing_velocity = np.linalg.norm(self.velocity)
+            if landing_velocity > 3.0:
+                # Hard landing - more energy loss
+                self.velocity *= 0.1
+                self.angular_velocity *= 0.1
+
+    def get_rotation_matrix(self):
+        """
+        Get the current rotation matrix based on drone's orientation.
+        The matrix is shared through the derived-state cache; do not modify it.
+        """
+        return self.derived.rotation_matrix
+
+    def adjust_sensitivity(self, control, amount):
+        """
+        Adjust the sensitivity of a specific control
+        control: 'roll', 'pitch', or 'yaw'
+        amount: positive to increase, negative to decrease
+        """
+        if control == 'roll':
+            self.roll_sensitivity = max(0.01, min(1.0, self.roll_sensitivity + amount))
+        elif control == 'pitch':
+            self.pitch_sensitivity = max(0.01, min(1.0, self.pitch_sensitivity + amount))
+        elif control == 'yaw':
+            self.yaw_sensitivity = max(0.01, min(1.0, self.yaw_sensitivity + amount))
@@ -0,0 +1,130 @@
+import math
+
+
+class RatePID:
+    """
+    PID on one body rate. The derivative acts on the measurement, so setpoint
+    steps from the sticks do not kick, and the integral is clamped.
+    """
+
+    __slots__ = ('kp', 'ki', 'kd', 'integral_limit', 'integral', 'previous')
+
+    def __init__(self, kp, ki, kd, integral_limit):
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.integral_limit = integral_limit
+        self.integral = 0.0
+        self.previous = None
+
+    def reset(self):
+        self.integral = 0.0
+        self.previous = None
+
+    def update(self, setpoint, measurement, dt):
+        error = setpoint - measurement
+        integral = self.integral + error * self.ki * dt
+        self.integral = max(-self.integral_limit, min(self.integral_limit, integral))
+        derivative = 0.0 if self.previous is None else (measurement - self.previous) / dt
+        self.previous = measurement
+        return self.kp * error + self.integral - self.kd * derivative
+
+
+class FlightController:
+    """
+    Acro-mode flight controller: sticks set body-rate targets, a rate PID
+    per axis turns rate errors into angular accelerations, and a mixer turns
+    those into motor thrust commands for an X quad.
+
+    The stick axes drive the same body axes, in the same direction, as the
+    direct mixing in DronePhysics.apply_controller_input, so the controls
+    feel the same way round. The mixer keeps the requested torques when the
+    collective would push a motor out of range by shifting the collective
+    (as "air mode" does) and only clips when no shift can fit them.
+
+    Motors follow their commands with a first-order lag of time constant
+    motor_time_constant, integrated exactly (see spin_up_factors).
+    """
+
+    def __init__(self, drone, rate=1000.0, max_rates=(10.0, 10.0, 6.0), gains=None,
+                 motor_time_constant=0.02):
+        if rate <= 0:
+            raise ValueError(f"Controller rate must be positive, got {rate}")
+        self.rate = float(rate)
+        # Body-rate targets at full stick (rad/s) for the roll, pitch and yaw sticks
+        self.max_rates = tuple(max_rates)
+        self.motor_time_constant = motor_time_constant
+
+        # Geometry and limits taken from the drone
+        self.arm = float(drone.size)
+        self.yaw_torque_constant = 0.3
+        self.max_motor_thrust = float(drone.max_motor_thrust)
+        self.inertia = tuple(float(i) for i in drone.moment_of_inertia)
+
+        # (kp, ki, kd, integral limit) per body axis x, y, z; outputs are rad/s²
+        if gains is None:
+            gains = ((25.0, 40.0, 0.15, 40.0), (25.0, 40.0, 0.15, 40.0), (15.0, 20.0, 0.0, 20.0))
+        self.pids = tuple(RatePID(*axis) for axis in gains)
+
+        # Counters: controller iterations, the simulated time they covered and
+        # the wall-clock time spent in the controller-rate loop
+        self.loop_count = 0
+        self.sim_time = 0.0
+        self.loop_time = 0.0
+
+    @property
+    def loop_rate(self):
+        """Achieved controller iterations per simulated second."""
+        return self.loop_count / self.sim_time if self.sim_time else 0.0
+
+    @property
+    def cost_per_sim_second(self):
+        """Wall-clock seconds spent in the controller-rate loop per simulated second."""
+        return self.loop_time / self.sim_time if self.sim_time else 0.0
+
+    def reset(self):
+        for pid in self.pids:
+            pid.reset()
+
+    def loops_per_tick(self, dt):
+        """Controller iterations per physics tick of length dt (at least one)."""
+        return max(1, round(self.rate * dt))
+
+    def spin_up_factors(self, dt):
+        """
+        For a motor commanded to c for dt seconds from thrust f, the lag gives
+        f' = c + (f - c) * decay and a mean thrust of c + (f - c) * mean over
+        the step. Returns (decay, mean).
+        """
+        tau = self.motor_time_constant
+        if tau <= 0.0:
+            return 0.0, 0.0
+        decay = math.exp(-dt / tau)
+        return decay, tau * (1.0 - decay) / dt
+
+    def motor_commands(self, throttle, roll, pitch, yaw, rates, dt):
+        """One controller iteration: four motor thrust commands (N)."""
+        # Stick to body-rate targets; signs follow DronePhysics' mixing, where a
+        # pitch stick turns the drone about body x, a roll stick about body y
+        target_x = -pitch * self.max_rates[1]
+        target_y = -roll * self.max_rates[0]
+        target_z = -yaw * self.max_rates[2]
+        pid_x, pid_y, pid_z = self.pids
+        torque_x = pid_x.update(target_x, rates[0], dt) * self.inertia[0]
+        torque_y = pid_y.update(target_y, rates[1], dt) * self.inertia[1]
+        torque_z = pid_z.update(target_z, rates[2], dt) * self.inertia[2]
+
+        # Invert the X-quad torques: tau_x = -4 * arm * p, tau_y = -4 * arm * r,
+        # tau_z = -4 * yaw_torque_constant * y for the differential forces p, r, y
+        p = -torque_x / (4.0 * self.arm)
+        r = -torque_y / (4.0 * self.arm)
+        y = -torque_z / (4.0 * self.yaw_torque_constant)
+        mix = (-r + p - y, r + p + y, r - p - y, -r - p + y)
+
+        # Shift the collective so the differential fits between 0 and max thrust
+        base = (throttle + 1.0) / 2.0 * self.max_motor_thrust
+        low = -min(mix)
+        high = self.max_motor_thrust - max(mix)
+        base = max(low, min(high, base)) if low <= high else (low + high) / 2.0
+        limit = self.max_motor_thrust
+        return [max(0.0, min(limit, base + m)) for m in mix]
@@ -0,0 +1,202 @@
+import numpy as np
+import math
+from physics.drone_physics import DronePhysics
+from utils.math_utils import (
+    quaternion_multiply,
+    quaternion_from_euler,
+    euler_from_quaternion,
+    rotation_matrix_from_quaternion,
+)
+
+# Dormand-Prince 5(4) tableau used by the adaptive integrator
+DP_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+DP_B5 = (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0.0)
+DP_B4 = (5179 / 57600, 0.0, 7571 / 16695, 393 / 640, -92097 / 339200, 187 / 2100, 1 / 40)
+
+
+class QuaternionDronePhysics(DronePhysics):
+    """
+    DronePhysics variant that keeps attitude as a unit quaternion.
+
+    There is no gimbal lock, so roll and pitch are not clamped and the drone
+    can flip. The rigid-body state (position, velocity, orientation, body
+    rates) is advanced by one of three integrators:
+      - 'semi_implicit': same scheme as DronePhysics, exact rotation per step
+      - 'rk4': classic fourth-order Runge-Kutta
+      - 'adaptive': Dormand-Prince 5(4) with error-controlled substeps
+    Motor forces are held constant over each physics step.
+    """
+
+    INTEGRATORS = ('semi_implicit', 'rk4', 'adaptive')
+
+    def __init__(self, integrator='rk4', dt=None, tolerance=1e-6):
+        if integrator not in self.INTEGRATORS:
+            raise ValueError(f"Unknown integrator '{integrator}', expected one of {self.INTEGRATORS}")
+        super().__init__()
+        self.integrator = integrator
+        if dt is not None:
+            self.dt = dt
+
+        # Adaptive integrator settings and statistics
+        self.tolerance = tolerance
+        self.min_substep = 1e-5
+        self.substep = self.dt
+        self.derivative_evaluations = 0
+
+    @property
+    def rotation(self):
+        """
+        Euler angles (roll, pitch, yaw) derived from the orientation quaternion.
+        The array is a read-only copy: assign a whole new rotation instead of
+        writing into it (drone.rotation[2] = yaw raises ValueError).
+        """
+        rotation = euler_from_quaternion(self.orientation)
+        rotation.flags.writeable = False
+        return rotation
+
+    @rotation.setter
+    def rotation(self, value):
+        roll, pitch, yaw = value
+        self.orientation = quaternion_from_euler(roll, pitch, yaw)
+        self.invalidate_derived()
+
+    def compute_rotation_matrix(self):
+        return rotation_matrix_from_quaternion(self.orientation)
+
+    def get_motor_torque(self):
+        """
+        Body-frame torque from the motors: r x (0, 0, f) plus reactive yaw torque.
+        """
+        f = self.motor_forces
+        r = self.motor_positions
+        return np.array([
+            f[0] * r[0][1] + f[1] * r[1][1] + f[2] * r[2][1] + f[3] * r[3][1],
+            -(f[0] * r[0][0] + f[1] * r[1][0] + f[2] * r[2][0] + f[3] * r[3][0]),
+            (f[0] - f[1] + f[2] - f[3]) * 0.3
+        ])
+
+    def derivatives(self, state, total_force, torque):
+        """
+        Time derivative of the 13-element state [position, velocity, quaternion, body rates].
+        """
+        self.derivative_evaluations += 1
+        velocity = state[3:6]
+        w, x, y, z = state[6:10]
+        angular_velocity = state[10:13]
+
+        # Lift along the body z-axis (third column of the rotation matrix)
+        lift = np.array([2 * (x * z + w * y), 2 * (y * z - w * x), 1 - 2 * (x * x + y * y)]) * total_force
+        drag = -self.drag_coefficient * velocity * np.abs(velocity)
+        acceleration = (lift + drag) / self.mass
+        acceleration[2] -= self.g
+
+        # Quaternion kinematics for body-frame angular velocity
+        q_dot = 0.5 * quaternion_multiply(state[6:10], (0.0, *angular_velocity))
+
+        angular_acceleration = (torque / self.moment_of_inertia
+                                - self.angular_damping * angular_velocity * np.abs(angular_velocity))
+
+        derivative = np.empty(13)
+        derivative[0:3] = velocity
+        derivative[3:6] = acceleration
+        derivative[6:10] = q_dot
+        derivative[10:13] = angular_acceleration
+        return derivative
+
+    def get_state_vector(self):
+        return np.concatenate((self.position, self.velocity, self.orientation, self.angular_velocity))
+
+    def set_state_vector(self, state):
+        self.position = state[0:3].copy()
+        self.velocity = state[3:6].copy()
+        self.orientation = state[6:10] / np.linalg.norm(state[6:10])
+        self.angular_velocity = state[10:13].copy()
+
+    def update(self):
+        self.update_battery()
+
+        total_force = float(np.sum(self.motor_forces))
+        torque = self.get_motor_torque()
+        state = self.get_state_vector()
+
+        if self.integrator == 'semi_implicit':
+            state = self.step_semi_implicit(state, total_force, torque, self.dt)
+        elif self.integrator == 'rk4':
+            state = self.step_rk4(state, total_force, torque, self.dt)
+        else:
+            state = self.step_adaptive(state, total_force, torque, self.dt)
+
+        # Average acceleration over the step
+        self.acceleration = (state[3:6] - self.velocity) / self.dt
+        self.set_state_vector(state)
+        self.apply_ground_contact()
+        self.invalidate_derived()
+
+    def step_semi_implicit(self, state, total_force, torque, dt):
+        derivative = self.derivatives(state, total_force, torque)
+        new_state = state.copy()
+
+        # Velocity first, then position with the new velocity
+        new_state[3:6] += derivative[3:6] * dt
+        new_state[0:3] += new_state[3:6] * dt
+        new_state[10:13] += derivative[10:13] * dt
+
+        # Rotate by the new body rates over dt (exact for constant rates)
+        rates = new_state[10:13]
+        angle = float(np.linalg.norm(rates)) * dt
+        if angle > 0.0:
+            axis = rates / np.linalg.norm(rates)
+            half = angle / 2
+            delta = (math.cos(half), *(axis * math.sin(half)))
+            new_state[6:10] = quaternion_multiply(state[6:10], delta)
+        return new_state
+
+    def step_rk4(self, state, total_force, torque, dt):
+        k1 = self.derivatives(state, total_force, torque)
+        k2 = self.derivatives(state + k1 * (dt / 2), total_force, torque)
+        k3 = self.derivatives(state + k2 * (dt / 2), total_force, torque)
+        k4 = self.derivatives(state + k3 * dt, total_force, torque)
+        new_state = state + (k1 + 2 * k2 + 2 * k3 + k4) * (dt / 6)
+        new_state[6:10] /= np.linalg.norm(new_state[6:10])
+        return new_state
+
+    def step_adaptive(self, state, total_force, torque, dt):
+        """
+        Cover dt with as many Dormand-Prince substeps as the error tolerance needs.
+        The substep size carries over between calls.
+        """
+        remaining = dt
+        h = min(self.substep, dt)
+        while remaining > 1e-12:
+            h = min(h, remaining)
+            stages = []
+            for i in range(7):
+                stage_state = state.copy()
+                for a, k in zip(DP_A[i], stages):
+                    if a:
+                        stage_state += k * (a * h)
+                stages.append(self.derivatives(stage_state, total_force, torque))
+
+            fifth = state + h * sum(b * k for b, k in zip(DP_B5, stages) if b)
+            fourth = state + h * sum(b * k for b, k in zip(DP_B4, stages) if b)
+            scale = self.tolerance * (1.0 + np.maximum(np.abs(state), np.abs(fifth)))
+            error = float(np.max(np.abs(fifth - fourth) / scale))
+
+            if error <= 1.0 or h <= self.min_substep:
+                state = fifth
+                state[6:10] /= np.linalg.norm(state[6:10])
+                remaining -= h
+            # Standard step-size controller with safety factor and growth limits
+            factor = 5.0 if error == 0.0 else 0.9 * error ** -0.2
+            h = max(self.min_substep, h * min(5.0, max(0.2, factor)))
+
+        self.substep = h
+        return state
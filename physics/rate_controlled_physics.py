@@ -0,0 +1,122 @@
+import math
+import time
+import numpy as np
+from physics.drone_physics import DronePhysics
+from physics.flight_controller import FlightController
+
+
+class RateControlledDronePhysics(DronePhysics):
+    """
+    DronePhysics flown through an acro FlightController.
+
+    The sticks are rate commands for the controller, which runs
+    controller_rate times per simulated second: each physics tick of dt is
+    split into loops_per_tick controller iterations. The fast dynamics are
+    sub-stepped with them: motor spin-up is integrated exactly over each
+    sub-step (the command is held for its length), and body rates and
+    attitude advance with the mean motor thrust of the sub-step. Position
+    and velocity, which change slowly, are integrated once per tick with the
+    lift averaged over the sub-steps, so a high controller rate only costs
+    a few float operations per iteration.
+    """
+
+    def __init__(self, controller_rate=1000.0, motor_time_constant=0.02):
+        super().__init__()
+        self.flight_controller = FlightController(self, rate=controller_rate,
+                                                  motor_time_constant=motor_time_constant)
+        self.sticks = (-1.0, 0.0, 0.0, 0.0)
+
+    @property
+    def controller_rate(self):
+        return self.flight_controller.rate
+
+    def apply_controller_input(self, throttle, roll, pitch, yaw):
+        # Stick commands are consumed by the controller loop in update()
+        self.sticks = (float(throttle), float(roll), float(pitch), float(yaw))
+
+    def update(self):
+        start = time.perf_counter()
+        controller = self.flight_controller
+        self.update_battery()
+        powered = self.battery_remaining > 0
+
+        dt = self.dt
+        loops = controller.loops_per_tick(dt)
+        h = dt / loops
+        decay, mean = controller.spin_up_factors(h)
+
+        throttle, roll_stick, pitch_stick, yaw_stick = self.sticks
+        forces = [float(f) for f in self.motor_forces]
+        (x0, y0, _), (x1, y1, _), (x2, y2, _), (x3, y3, _) = self.motor_positions
+        ix, iy, iz = (float(i) for i in self.moment_of_inertia)
+        damping = self.angular_damping
+        yaw_constant = controller.yaw_torque_constant
+        wx, wy, wz = (float(w) for w in self.angular_velocity)
+        roll, pitch, yaw = (float(a) for a in self.rotation)
+        limit = math.pi / 2 - 0.1
+        lift_x = lift_y = lift_z = 0.0
+        thrust_sum = 0.0
+
+        for _ in range(loops):
+            if powered:
+                commands = controller.motor_commands(throttle, roll_stick, pitch_stick, yaw_stick,
+                                                     (wx, wy, wz), h)
+            else:
+                commands = (0.0, 0.0, 0.0, 0.0)
+
+            # Exact first-order motor response over the sub-step
+            f0 = commands[0] + (forces[0] - commands[0]) * mean
+            f1 = commands[1] + (forces[1] - commands[1]) * mean
+            f2 = commands[2] + (forces[2] - commands[2]) * mean
+            f3 = commands[3] + (forces[3] - commands[3]) * mean
+            forces = [c + (f - c) * decay for c, f in zip(commands, forces)]
+            thrust = f0 + f1 + f2 + f3
+            thrust_sum += thrust
+
+            # Same torques as DronePhysics.update: r x (0, 0, f) plus reactive yaw
+            torque_x = f0 * y0 + f1 * y1 + f2 * y2 + f3 * y3
+            torque_y = -(f0 * x0 + f1 * x1 + f2 * x2 + f3 * x3)
+            torque_z = (f0 - f1 + f2 - f3) * yaw_constant
+            wx += (torque_x / ix - damping * wx * abs(wx)) * h
+            wy += (torque_y / iy - damping * wy * abs(wy)) * h
+            wz += (torque_z / iz - damping * wz * abs(wz)) * h
+
+            # Body rates to Euler angle rates, as in DronePhysics.update
+            sr, cr = math.sin(roll), math.cos(roll)
+            cos_p = math.cos(pitch)
+            cp = max(abs(cos_p), 0.001) * math.copysign(1, cos_p)
+            tp = math.tan(pitch)
+            roll += (wx + sr * tp * wy + cr * tp * wz) * h
+            pitch += (cr * wy - sr * wz) * h
+            yaw += (sr / cp * wy + cr / cp * wz) * h
+            roll = max(-limit, min(limit, roll))
+            pitch = max(-limit, min(limit, pitch))
+
+            # Lift along the body z axis (third column of Rz @ Ry @ Rx)
+            sr, cr = math.sin(roll), math.cos(roll)
+            sp, cp = math.sin(pitch), math.cos(pitch)
+            sy, cy = math.sin(yaw), math.cos(yaw)
+            lift_x += (sy * sr + cy * sp * cr) * thrust
+            lift_y += (sy * sp * cr - cy * sr) * thrust
+            lift_z += cp * cr * thrust
+
+        self.motor_forces = np.array(forces)
+        self.angular_velocity = np.array([wx, wy, wz])
+        self.rotation = np.array([roll, pitch, yaw % (2 * math.pi)])
+        # Battery drain for the next tick, from the mean thrust of this one
+        self.power_consumption_rate = thrust_sum / loops * 0.1 * 10
+
+        # Translational dynamics once per tick, with the mean lift
+        lift_force = np.array([lift_x, lift_y, lift_z]) / loops
+        gravity_force = np.array([0, 0, -self.mass * self.g])
+        drag_force = -self.drag_coefficient * self.velocity * np.abs(self.velocity)
+        self.acceleration = (lift_force + gravity_force + drag_force) / self.mass
+        self.velocity += self.acceleration * dt
+        self.position += self.velocity * dt
+
+        self.apply_ground_contact()
+        self.invalidate_derived()
+
+        controller.loop_count += loops
+        controller.sim_time += dt
+        controller.loop_time += time.perf_counter() - start
@@ -0,0 +1,22 @@
+import hashlib
+import struct
+import numpy as np
+
+# Everything that carries over from one physics tick to the next
+HASHED_FIELDS = ('position', 'velocity', 'rotation', 'angular_velocity', 'motor_forces')
+
+
+def state_hash(drone):
+    """
+    64-bit hash of a drone's simulation state, for bit-for-bit comparison of
+    runs. Any change in any bit of the hashed floats changes the hash.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    for name in HASHED_FIELDS:
+        h.update(np.asarray(getattr(drone, name), dtype=np.float64).tobytes())
+    # Quaternion models keep their attitude in orientation
+    orientation = getattr(drone, 'orientation', None)
+    if orientation is not None:
+        h.update(np.asarray(orientation, dtype=np.float64).tobytes())
+    h.update(struct.pack('<d', float(drone.battery_remaining)))
+    return int.from_bytes(h.digest(), 'little')
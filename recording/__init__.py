@@ -0,0 +1,5 @@
+from .format import RECORD_DTYPE, QUANTIZED_DTYPE, QUANTIZED_SCALES
+from .recorder import FlightRecorder
+from .log import FlightLog
+
+__all__ = ['FlightRecorder', 'FlightLog', 'RECORD_DTYPE', 'QUANTIZED_DTYPE', 'QUANTIZED_SCALES']
\ No newline at end of file
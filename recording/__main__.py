@@ -0,0 +1,45 @@
+"""
+Summarize a flight log, or print the state at a given time.
+
+Run from the repository root:
+    python -m recording flight.log
+    python -m recording flight.log --at 12.5
+"""
+import argparse
+import numpy as np
+
+from recording.log import FlightLog
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect a flight log")
+    parser.add_argument('path')
+    parser.add_argument('--at', type=float, default=None, help="print the state at this simulated time (s)")
+    args = parser.parse_args()
+
+    log = FlightLog(args.path)
+    print(f"{args.path}: {len(log)} records, {log.encoding} encoding, "
+          f"dt={log.dt * 1000:.1f} ms, {log.duration:.1f} s")
+
+    if args.at is not None:
+        record = log.state_at(args.at)
+        print(f"t={record['time']:.3f} s (tick {record['tick']})")
+        for name in ('position', 'velocity', 'rotation', 'angular_velocity', 'motor_forces', 'sticks'):
+            print(f"  {name:17s} {np.round(record[name], 3)}")
+        print(f"  {'battery_remaining':17s} {record['battery_remaining']:.1f} mAh")
+        return
+
+    if len(log) == 0:
+        return
+    max_altitude = -np.inf
+    max_speed = 0.0
+    for chunk in log.iter_chunks():
+        max_altitude = max(max_altitude, float(chunk['position'][:, 2].max()))
+        max_speed = max(max_speed, float(np.linalg.norm(chunk['velocity'], axis=1).max()))
+    last = log[-1]
+    print(f"Max altitude {max_altitude:.1f} m, max speed {max_speed:.1f} m/s, "
+          f"battery used {log[0]['battery_remaining'] - last['battery_remaining']:.1f} mAh")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+On-disk layout of flight logs.
+
+A log is a fixed-size text header followed by back-to-back fixed-size
+records of one NumPy structured dtype, so a file can be appended to while
+flying and opened later with np.memmap at offset HEADER_SIZE.
+
+Two encodings exist:
+  - 'raw': every field as float64, including the time. Sticks are stored
+    exactly, so raw logs can be replayed (see simulation.determinism).
+  - 'quantized': fixed-point integers with the scales stored in the header
+    and the time implied by tick * dt. Records stay fixed-size, so random
+    access and memmap still work; files are about a third of the size.
+
+Besides the state, every record holds what is needed to re-fly its tick:
+the sticks, the control sensitivities in effect and the events (such as a
+reset of the drone) applied just before it. Version 1 logs, which had
+neither events nor sensitivities nor state hashes, can still be read;
+their records are converted with those fields zeroed (NaN sensitivities).
+"""
+import json
+import numpy as np
+
+MAGIC = b"DRONELOG"
+HEADER_SIZE = 512
+FORMAT_VERSION = 2
+
+# Bits of a record's events field
+EVENT_RESET = 1  # the drone was put back at the start (see Environment.reset_drone)
+
+RECORD_DTYPE = np.dtype([
+    ('tick', '<u8'),
+    ('time', '<f8'),
+    ('position', '<f8', (3,)),
+    ('velocity', '<f8', (3,)),
+    ('rotation', '<f8', (3,)),
+    ('angular_velocity', '<f8', (3,)),
+    ('motor_forces', '<f8', (4,)),
+    ('battery_remaining', '<f8'),
+    ('sticks', '<f8', (4,)),         # throttle, roll, pitch, yaw, exactly as applied
+    ('sensitivities', '<f8', (3,)),  # roll, pitch and yaw sensitivity during the tick
+    ('events', '<u1'),               # EVENT_ bits applied before the tick
+    ('state_hash', '<u8'),           # physics.state_hash.state_hash after the tick
+])
+
+QUANTIZED_DTYPE = np.dtype([
+    ('tick', '<u4'),
+    ('position', '<i4', (3,)),
+    ('velocity', '<i4', (3,)),
+    ('rotation', '<i2', (3,)),
+    ('angular_velocity', '<i2', (3,)),
+    ('motor_forces', '<u2', (4,)),
+    ('battery_remaining', '<f4'),
+    ('sticks', '<i2', (4,)),
+    ('sensitivities', '<f4', (3,)),
+    ('events', '<u1'),
+    ('state_hash', '<u8'),
+])
+
+# Size of one integer step per quantized field
+QUANTIZED_SCALES = {
+    'position': 1e-4,          # 0.1 mm, range +-214 km
+    'velocity': 1e-3,          # 1 mm/s
+    'rotation': 2e-4,          # rad, range +-6.55 (yaw is kept in [0, 2 pi))
+    'angular_velocity': 1e-3,  # rad/s, range +-32.7
+    'motor_forces': 1e-4,      # N, range 0-6.5
+    'sticks': 1.0 / 32767,
+}
+
+ENCODINGS = {
+    'raw': RECORD_DTYPE,
+    'quantized': QUANTIZED_DTYPE,
+}
+
+# On-disk dtypes of earlier format versions
+LEGACY_ENCODINGS = {
+    1: {
+        'raw': np.dtype([(name, RECORD_DTYPE.fields[name][0]) for name in RECORD_DTYPE.names
+                         if name not in ('sticks', 'sensitivities', 'events', 'state_hash')]
+                        + [('sticks', '<f4', (4,))]),
+        'quantized': np.dtype([(name, QUANTIZED_DTYPE.fields[name][0]) for name in QUANTIZED_DTYPE.names
+                               if name not in ('sensitivities', 'events', 'state_hash')]),
+    },
+}
+
+
+def write_header(file, encoding, dt, scales=None, metadata=None):
+    header = {
+        'version': FORMAT_VERSION,
+        'encoding': encoding,
+        'dt': dt,
+        'scales': scales if scales is not None else (QUANTIZED_SCALES if encoding == 'quantized' else {}),
+        # Free-form run description, e.g. the environment seed for replays
+        'metadata': metadata or {},
+    }
+    text = MAGIC + json.dumps(header).encode('utf-8')
+    if len(text) >= HEADER_SIZE:
+        raise ValueError("Flight log header too large")
+    file.write(text.ljust(HEADER_SIZE - 1) + b"\n")
+
+
+def read_header(file):
+    data = file.read(HEADER_SIZE)
+    if len(data) < HEADER_SIZE or not data.startswith(MAGIC):
+        raise ValueError("Not a flight log")
+    header = json.loads(data[len(MAGIC):].decode('utf-8'))
+    if header['version'] != FORMAT_VERSION and header['version'] not in LEGACY_ENCODINGS:
+        raise ValueError(f"Unsupported flight log version {header['version']}")
+    if header['encoding'] not in ENCODINGS:
+        raise ValueError(f"Unknown flight log encoding {header['encoding']!r}")
+    return header
+
+
+def record_dtype(header):
+    """On-disk record dtype of a log with this header."""
+    if header['version'] == FORMAT_VERSION:
+        return ENCODINGS[header['encoding']]
+    return LEGACY_ENCODINGS[header['version']][header['encoding']]
+
+
+def upgrade(records, encoding):
+    """
+    Records of an earlier format version in the current on-disk dtype of
+    their encoding; fields they lack are zeroed, sensitivities are NaN.
+    """
+    out = np.zeros(records.shape, dtype=ENCODINGS[encoding])
+    out['sensitivities'] = np.nan
+    for name in records.dtype.names:
+        out[name] = records[name]
+    return out
+
+
+def encode(records, encoding, scales=QUANTIZED_SCALES):
+    """
+    Convert RECORD_DTYPE records to the on-disk dtype of an encoding.
+    """
+    if encoding == 'raw':
+        return records
+    out = np.empty(len(records), dtype=QUANTIZED_DTYPE)
+    out['tick'] = records['tick']
+    for name in ('battery_remaining', 'sensitivities', 'events', 'state_hash'):
+        out[name] = records[name]
+    for name, scale in scales.items():
+        info = np.iinfo(QUANTIZED_DTYPE[name].base)
+        out[name] = np.clip(np.rint(records[name] / scale), info.min, info.max)
+    return out
+
+
+def decode(records, encoding, dt, scales=QUANTIZED_SCALES):
+    """
+    Convert on-disk records back to RECORD_DTYPE. Raw records are returned
+    unchanged (a view when they come from a memmap); records of an earlier
+    format version are upgraded first.
+    """
+    if records.dtype != ENCODINGS[encoding]:
+        records = upgrade(records, encoding)
+    if encoding == 'raw':
+        return records
+    out = np.empty(records.shape, dtype=RECORD_DTYPE)
+    out['tick'] = records['tick']
+    out['time'] = records['tick'] * dt
+    for name in ('battery_remaining', 'sensitivities', 'events', 'state_hash'):
+        out[name] = records[name]
+    for name, scale in scales.items():
+        out[name] = records[name] * scale
+    return out
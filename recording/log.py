@@ -0,0 +1,80 @@
+import os
+import numpy as np
+
+from recording.format import HEADER_SIZE, read_header, record_dtype, decode
+
+
+class FlightLog:
+    """
+    Read-only view of a flight log, memory-mapped for random access.
+
+    Records are only read from disk when indexed, so opening and seeking in
+    multi-hour logs is instant. Indexing returns RECORD_DTYPE records: raw
+    logs return memmap views (zero-copy), quantized logs decode the slice
+    that was asked for. A partly written last record (e.g. after a crash)
+    is ignored.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            self.header = read_header(file)
+        self.encoding = self.header['encoding']
+        self.dt = self.header['dt']
+        self.scales = self.header['scales']
+        self.version = self.header['version']
+        self.dtype = record_dtype(self.header)
+
+        count = (os.path.getsize(path) - HEADER_SIZE) // self.dtype.itemsize
+        if count > 0:
+            self.records = np.memmap(path, dtype=self.dtype, mode='r', offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return decode(self.records[index], self.encoding, self.dt, self.scales)
+        index = range(len(self.records))[index]
+        return decode(self.records[index:index + 1], self.encoding, self.dt, self.scales)[0]
+
+    @property
+    def duration(self):
+        if len(self.records) == 0:
+            return 0.0
+        return (int(self.records['tick'][-1]) - int(self.records['tick'][0]) + 1) * self.dt
+
+    def field(self, name, start=None, stop=None):
+        """One decoded field over a range of records, e.g. field('position')."""
+        return self[start:stop][name]
+
+    def index_at(self, t):
+        """
+        Index of the last record at or before simulated time t, found by a
+        binary search over the tick column (touches O(log n) pages).
+        """
+        ticks = self.records['tick']
+        target = t / self.dt
+        low, high = 0, len(ticks)
+        while low < high:
+            middle = (low + high) // 2
+            if ticks[middle] <= target + 1e-9:
+                low = middle + 1
+            else:
+                high = middle
+        return max(low - 1, 0)
+
+    def state_at(self, t):
+        """The record at (or just before) simulated time t."""
+        return self[self.index_at(t)]
+
+    def iter_chunks(self, chunk_size=1 << 20):
+        """Decoded records in chunks, for whole-log analysis in bounded memory."""
+        for start in range(0, len(self.records), chunk_size):
+            yield self[start:start + chunk_size]
+
+    def close(self):
+        # The mapping is released once the last view of it is gone
+        self.records = np.zeros(0, dtype=self.dtype)
@@ -0,0 +1,115 @@
+import queue
+import threading
+import numpy as np
+
+from physics.state_hash import state_hash
+from recording.format import RECORD_DTYPE, ENCODINGS, QUANTIZED_SCALES, write_header, encode
+
+
+class FlightRecorder:
+    """
+    Black-box recorder: one fixed-size record per physics tick.
+
+    record() only copies the drone state into a preallocated staging chunk.
+    Full chunks are handed to a background writer thread, which encodes and
+    appends them to the log file, so the simulation loop never waits on the
+    disk. If the writer falls more than max_pending chunks behind, new chunks
+    are dropped and counted in dropped_records rather than blocking.
+    """
+
+    def __init__(self, path, dt, encoding='raw', chunk_size=1024, max_pending=64, metadata=None):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding {encoding!r}, expected one of {sorted(ENCODINGS)}")
+        self.path = path
+        self.dt = dt
+        self.encoding = encoding
+        self.chunk_size = chunk_size
+
+        self.file = open(path, 'wb')
+        write_header(self.file, encoding, dt, metadata=metadata)
+
+        self.record_count = 0
+        self.dropped_records = 0
+        self.written_records = 0
+
+        self._chunk = np.zeros(chunk_size, dtype=RECORD_DTYPE)
+        self._fill = 0
+        self._pending = queue.Queue(max_pending)
+        self._spare = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_loop, name="flight-recorder", daemon=True)
+        self._writer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def record(self, tick, drone, sticks, digest=None, events=0):
+        """
+        Append the state of drone after physics tick `tick`, with the
+        (throttle, roll, pitch, yaw) sticks applied during that tick and the
+        EVENT_ bits (recording.format) of what was done to the drone just
+        before it. digest is the tick's state hash, computed here when not
+        given.
+        """
+        if digest is None:
+            digest = state_hash(drone)
+        chunk = self._chunk
+        i = self._fill
+        chunk['tick'][i] = tick
+        chunk['time'][i] = tick * self.dt
+        chunk['position'][i] = drone.position
+        chunk['velocity'][i] = drone.velocity
+        chunk['rotation'][i] = drone.rotation
+        chunk['angular_velocity'][i] = drone.angular_velocity
+        chunk['motor_forces'][i] = drone.motor_forces
+        chunk['battery_remaining'][i] = drone.battery_remaining
+        chunk['sticks'][i] = sticks
+        chunk['sensitivities'][i] = (drone.roll_sensitivity, drone.pitch_sensitivity, drone.yaw_sensitivity)
+        chunk['events'][i] = events
+        chunk['state_hash'][i] = digest
+        self._fill = i + 1
+        self.record_count += 1
+        if self._fill == self.chunk_size:
+            self._submit()
+
+    def flush(self):
+        """Hand the partly filled chunk to the writer."""
+        if self._fill:
+            self._submit()
+
+    def close(self):
+        if self.file is None:
+            return
+        self.flush()
+        self._pending.put(None)
+        self._writer.join()
+        self.file.close()
+        self.file = None
+
+    def _submit(self):
+        chunk, count = self._chunk, self._fill
+        try:
+            self._pending.put_nowait((chunk, count))
+        except queue.Full:
+            self.dropped_records += count
+            self._fill = 0
+            return
+        try:
+            self._chunk = self._spare.get_nowait()
+        except queue.Empty:
+            self._chunk = np.zeros(self.chunk_size, dtype=RECORD_DTYPE)
+        self._fill = 0
+
+    def _write_loop(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                break
+            chunk, count = item
+            data = encode(chunk[:count], self.encoding, QUANTIZED_SCALES)
+            self.file.write(data.tobytes())
+            self.file.flush()
+            self.written_records += count
+            self._spare.put(chunk)
@@ -1,5 +1,11 @@
 from .drone_renderer import DroneRenderer
+from .drone_mesh import DroneMesh
+from .swarm_renderer import SwarmRenderer
+from .path_renderer import PathRenderer
 from .hud import HUD
 from .camera import FPVCamera
+from .frustum import Frustum
+from .overlay import OverlayTexture
+from .profiler_overlay import ProfilerOverlay
 
-__all__ = ['DroneRenderer', 'HUD', 'FPVCamera']
\ No newline at end of file
+__all__ = ['DroneRenderer', 'DroneMesh', 'SwarmRenderer', 'PathRenderer', 'HUD', 'FPVCamera', 'Frustum', 'OverlayTexture', 'ProfilerOverlay']
\ No newline at end of file
@@ -9,28 +9,34 @@ class FPVCamera:
         self.offset = np.array([0, 0.1, 0])
         self.camera_angle = 20  # Camera tilt angle in degrees (typical for FPV cameras)
 
+        # Cached view for the last (state version, tilt angle) seen
+        self._cache_key = None
+        self._cached_view = None
+
     def get_view_matrix(self):
+        derived = self.drone_physics.derived
+        cache_key = (derived.version, self.camera_angle)
+        if cache_key == self._cache_key:
+            return self._cached_view
+
         # Get the drone's position and rotation
         position = self.drone_physics.position
-        rotation_matrix = self.drone_physics.get_rotation_matrix()
+        rotation_matrix = derived.rotation_matrix
 
         # Apply the camera offset
         camera_pos = position + rotation_matrix @ self.offset
 
-        # Apply the tilt (rotate about the x-axis)
+        # Apply the tilt (rotate about the x-axis): only the rotated y and z
+        # axes are needed for the look direction and up vector
         tilt_rad = math.radians(self.camera_angle)
-        tilt_matrix = np.array([
-            [1, 0, 0],
-            [0, math.cos(tilt_rad), -math.sin(tilt_rad)],
-            [0, math.sin(tilt_rad), math.cos(tilt_rad)]
-        ])
-
-        # Combine rotations for the final view
-        look_rotation = rotation_matrix @ tilt_matrix
+        cos_tilt = math.cos(tilt_rad)
+        sin_tilt = math.sin(tilt_rad)
 
         # Calculate the look direction and up vector
-        look_dir = look_rotation @ np.array([0, 1, 0])
-        up_vector = look_rotation @ np.array([0, 0, 1])
+        look_dir = derived.forward * cos_tilt + derived.up * sin_tilt
+        up_vector = derived.up * cos_tilt - derived.forward * sin_tilt
         look_at_point = camera_pos + look_dir
 
-        return camera_pos, look_at_point, up_vector
\ No newline at end of file
+        self._cache_key = cache_key
+        self._cached_view = (camera_pos, look_at_point, up_vector)
+        return self._cached_view
@@ -0,0 +1,207 @@
+import ctypes
+import math
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.error import Error as GLError, NullFunctionError
+
+from environment.gate import box_vertices, quad_indices
+
+BODY_COLOR = (1.0, 1.0, 1.0)
+MOTOR_COLOR = (0.3, 0.3, 0.3)
+ARROW_COLOR = (1.0, 0.0, 0.0)
+CENTER_COLOR = (1.0, 1.0, 0.0)
+# Front left, front right, rear right, rear left
+PROP_COLORS = ((1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0), (1.0, 1.0, 0.0))
+
+# Vertex layout: position (3), color (3), prop pivot (3) and motor index (1),
+# the motor index being -1 for vertices that do not spin
+VERTEX_FLOATS = 10
+
+
+def arm_box(length, width, angle):
+    """Triangles of a thin box of the given length through the origin, rotated about Z."""
+    corners = np.array(box_vertices(-length / 2, -width / 2, -width / 2, length / 2, width / 2, width / 2))
+    c, s = math.cos(angle), math.sin(angle)
+    rotated = corners.copy()
+    rotated[:, 0] = corners[:, 0] * c - corners[:, 1] * s
+    rotated[:, 1] = corners[:, 0] * s + corners[:, 1] * c
+    return rotated, quad_indices(6)
+
+
+def cylinder(radius, height, segments):
+    """Side wall of an open cylinder along +Z, like gluCylinder."""
+    angles = np.linspace(0.0, 2 * math.pi, segments + 1)[:-1]
+    ring = np.stack([radius * np.cos(angles), radius * np.sin(angles)], axis=1)
+    vertices = np.zeros((2 * segments, 3))
+    vertices[:segments, :2] = ring
+    vertices[segments:, :2] = ring
+    vertices[segments:, 2] = height
+    i = np.arange(segments)
+    j = (i + 1) % segments
+    indices = np.stack([i, j, j + segments, i, j + segments, i + segments], axis=1).ravel()
+    return vertices, indices
+
+
+def sphere(radius, slices, stacks):
+    """UV sphere, like gluSphere."""
+    theta = np.linspace(0.0, math.pi, stacks + 1)
+    phi = np.linspace(0.0, 2 * math.pi, slices + 1)
+    t, p = np.meshgrid(theta, phi, indexing='ij')
+    vertices = np.stack([radius * np.sin(t) * np.cos(p),
+                         radius * np.sin(t) * np.sin(p),
+                         radius * np.cos(t)], axis=-1).reshape(-1, 3)
+    row = slices + 1
+    i, j = np.meshgrid(np.arange(stacks), np.arange(slices), indexing='ij')
+    a = (i * row + j).ravel()
+    indices = np.stack([a, a + row, a + row + 1, a, a + row + 1, a + 1], axis=1).ravel()
+    return vertices, indices
+
+
+class DroneMesh:
+    """
+    Triangle mesh of a quad, built once and shared by every drone drawn.
+
+    It matches the old immediate-mode DroneRenderer: a cross-shaped body,
+    a cylinder and a two-blade propeller per motor, a red arrow to the
+    front and a yellow sphere in the middle. Indices are ordered body first,
+    then one range per propeller, so a single drone can spin its propellers
+    with the fixed-function matrix stack, while instanced drawing spins them
+    in a vertex shader from the pivot and motor index stored per vertex.
+    """
+
+    def __init__(self, size, motor_positions):
+        self.size = size
+        self.radius = 1.5 * size + 0.1  # Bounding sphere for culling
+        parts = []  # (vertices, indices, color, pivot, motor)
+
+        diagonal = math.hypot(2 * size, 2 * size)
+        parts.append(arm_box(diagonal, 0.02, math.pi / 4) + (BODY_COLOR, (0, 0, 0), -1))
+        parts.append(arm_box(diagonal, 0.02, -math.pi / 4) + (BODY_COLOR, (0, 0, 0), -1))
+        arrow, arrow_indices = arm_box(1.5 * size, 0.02, math.pi / 2)
+        parts.append((arrow + (0, 0.75 * size, 0), arrow_indices, ARROW_COLOR, (0, 0, 0), -1))
+        parts.append(sphere(0.05, 8, 8) + (CENTER_COLOR, (0, 0, 0), -1))
+        for motor_position in motor_positions:
+            vertices, indices = cylinder(0.05, 0.03, 8)
+            parts.append((vertices + motor_position, indices, MOTOR_COLOR, (0, 0, 0), -1))
+
+        # Propellers last, one index range per motor
+        body_parts = len(parts)
+        for motor, motor_position in enumerate(motor_positions):
+            blades = []
+            for angle in (0.0, math.pi):
+                blades.extend([(0.0, 0.0, 0.03),
+                               (0.10 * math.cos(angle), 0.10 * math.sin(angle), 0.03),
+                               (0.02 * math.cos(angle + 0.5), 0.02 * math.sin(angle + 0.5), 0.03)])
+            vertices = np.array(blades) + motor_position
+            parts.append((vertices, np.arange(len(vertices)), PROP_COLORS[motor % 4], motor_position, motor))
+
+        vertex_chunks = []
+        index_chunks = []
+        ranges = []
+        vertex_count = 0
+        index_count = 0
+        for vertices, indices, color, pivot, motor in parts:
+            chunk = np.empty((len(vertices), VERTEX_FLOATS), dtype=np.float32)
+            chunk[:, 0:3] = vertices
+            chunk[:, 3:6] = color
+            chunk[:, 6:9] = pivot
+            chunk[:, 9] = motor
+            vertex_chunks.append(chunk)
+            index_chunks.append(np.asarray(indices) + vertex_count)
+            ranges.append((index_count, len(indices)))
+            vertex_count += len(vertices)
+            index_count += len(indices)
+
+        self.vertices = np.concatenate(vertex_chunks)
+        self.indices = np.concatenate(index_chunks).astype(np.uint32)
+        self.body_range = (0, ranges[body_parts][0])
+        self.prop_ranges = ranges[body_parts:]
+        self.pivots = np.asarray(motor_positions, dtype=np.float32)
+        # Tightly packed copies for client-side arrays
+        self.positions = np.ascontiguousarray(self.vertices[:, 0:3])
+        self.colors = np.ascontiguousarray(self.vertices[:, 3:6])
+        self.vbo = None
+        self.ibo = None
+        self.uploaded = False
+
+    @classmethod
+    def for_drone(cls, drone):
+        return cls(drone.size, drone.motor_positions)
+
+    @property
+    def vertex_count(self):
+        return len(self.vertices)
+
+    @property
+    def index_count(self):
+        return len(self.indices)
+
+    def upload(self):
+        """Create the GPU buffers; without VBO support draws use client-side arrays."""
+        self.uploaded = True
+        try:
+            self.vbo = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glBufferData(GL_ARRAY_BUFFER, self.vertices.nbytes, self.vertices, GL_STATIC_DRAW)
+            self.ibo = glGenBuffers(1)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, self.indices.nbytes, self.indices, GL_STATIC_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        except (GLError, NullFunctionError):
+            self.vbo = self.ibo = None
+
+    def release(self):
+        if self.vbo is not None:
+            glDeleteBuffers(2, [self.vbo, self.ibo])
+            self.vbo = self.ibo = None
+        self.uploaded = False
+
+    def bind(self):
+        """Set up the fixed-function vertex and color arrays; pair with unbind()."""
+        if not self.uploaded:
+            self.upload()
+        stride = self.vertices.strides[0]
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        if self.vbo is not None:
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+            glVertexPointer(3, GL_FLOAT, stride, ctypes.c_void_p(0))
+            glColorPointer(3, GL_FLOAT, stride, ctypes.c_void_p(12))
+        else:
+            glVertexPointer(3, GL_FLOAT, 0, self.positions)
+            glColorPointer(3, GL_FLOAT, 0, self.colors)
+
+    def unbind(self):
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        if self.vbo is not None:
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+    def draw_range(self, first, count):
+        if self.ibo is not None:
+            glDrawElements(GL_TRIANGLES, count, GL_UNSIGNED_INT, ctypes.c_void_p(first * 4))
+        else:
+            glDrawElements(GL_TRIANGLES, count, GL_UNSIGNED_INT, self.indices[first:first + count])
+
+    def draw(self, model_matrix, prop_angles):
+        """
+        Draw one drone with the fixed-function pipeline: model_matrix is a
+        column-major 4x4 (as in DerivedState.gl_model_matrix) and prop_angles
+        the four propeller angles in degrees.
+        """
+        glPushMatrix()
+        glMultMatrixf(model_matrix)
+        self.bind()
+        self.draw_range(*self.body_range)
+        for (first, count), pivot, angle in zip(self.prop_ranges, self.pivots, prop_angles):
+            glPushMatrix()
+            glTranslatef(pivot[0], pivot[1], pivot[2])
+            glRotatef(angle, 0, 0, 1)
+            glTranslatef(-pivot[0], -pivot[1], -pivot[2])
+            self.draw_range(first, count)
+            glPopMatrix()
+        self.unbind()
+        glPopMatrix()
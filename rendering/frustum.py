@@ -0,0 +1,40 @@
+import numpy as np
+from OpenGL.GL import glGetFloatv, GL_PROJECTION_MATRIX, GL_MODELVIEW_MATRIX
+
+
+class Frustum:
+    """
+    View frustum as six inward-facing planes (a, b, c, d) in world space,
+    with a point p inside when a*x + b*y + c*z + d >= 0 for every plane.
+    """
+
+    def __init__(self, clip_matrix):
+        m = np.asarray(clip_matrix, dtype=float)
+        # Gribb/Hartmann plane extraction from the combined clip matrix
+        planes = np.array([
+            m[3] + m[0],  # left
+            m[3] - m[0],  # right
+            m[3] + m[1],  # bottom
+            m[3] - m[1],  # top
+            m[3] + m[2],  # near
+            m[3] - m[2],  # far
+        ])
+        planes /= np.linalg.norm(planes[:, :3], axis=1)[:, None]
+        self.planes = planes
+
+    @classmethod
+    def from_gl(cls):
+        """
+        Build the frustum from the current OpenGL projection and modelview matrices.
+        """
+        # OpenGL returns column-major matrices, so transpose to row-major
+        projection = np.asarray(glGetFloatv(GL_PROJECTION_MATRIX), dtype=float).reshape(4, 4).T
+        modelview = np.asarray(glGetFloatv(GL_MODELVIEW_MATRIX), dtype=float).reshape(4, 4).T
+        return cls(projection @ modelview)
+
+    def spheres_visible(self, centers, radii):
+        """
+        Boolean mask of the (N, 3) bounding spheres that intersect the frustum.
+        """
+        distances = centers @ self.planes[:, :3].T + self.planes[:, 3]
+        return np.all(distances >= -np.asarray(radii)[:, None], axis=1)
@@ -1,188 +1,319 @@
 import pygame
-import numpy as np
 import math
+import time
+from rendering.overlay import OverlayTexture
+
+WHITE = (255, 255, 255)
+GRAY = (200, 200, 200)
+
+# Characters pre-rendered into the glyph atlas for the changing numbers
+ATLAS_CHARACTERS = "0123456789.-+ "
 
 
 class HUD:
-    def __init__(self, screen, font, drone_physics):
+    """
+    Heads-up display drawn into a cached overlay surface.
+
+    Backgrounds, labels and the stick/horizon frames are rasterized once into
+    a static layer. Every value on screen is a widget with a rectangle on the
+    overlay; on each HUD refresh only widgets whose displayed value changed
+    are restored from the static layer and redrawn, numbers being composed
+    from a pre-rendered glyph atlas. On an OpenGL screen the overlay lives in
+    a texture (only the changed rectangles are re-uploaded) and is composited
+    with one textured draw call per frame (a quad for each of the top and
+    bottom bands); on a plain pygame surface the bands are blitted.
+
+    refresh_rate limits how often widget values are re-read (Hz), separately
+    from the render rate; None refreshes on every render call.
+    """
+
+    def __init__(self, screen, font, drone_physics, refresh_rate=30.0):
         self.screen = screen
         self.font = font
         self.drone_physics = drone_physics
         self.width, self.height = screen.get_size()
-        
+        self.refresh_rate = refresh_rate
+        self.use_gl = bool(screen.get_flags() & pygame.OPENGL)
+
         # Create a larger font for some elements
         self.large_font = pygame.font.SysFont('Arial', 24)
+        self.line_height = font.get_linesize()
+
+        self.stick_radius = 60
+        self.left_center = (self.width // 4, self.height - 90)
+        self.right_center = (3 * self.width // 4, self.height - 90)
+        horizon_width, horizon_height = 200, 100
+        self.horizon_rect = pygame.Rect((self.width - horizon_width) // 2,
+                                        self.height - horizon_height - 40,  # Positioned at bottom of screen
+                                        horizon_width, horizon_height)
+
+        self.overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        self.static_layer = None
+        self.overlay_texture = OverlayTexture(self.overlay)
+        self.glyphs = {}
+        self.text_cache = {}
+        self.widget_values = {}
+        self.last_refresh = None
+
+        # Statistics: widgets redrawn during the last refresh and in total
+        self.redrawn_widgets = 0
+        self.total_redraws = 0
+
+    def render(self, controller, fps, render_stats=None, input_latency=None, race_timer=None):
+        if self.static_layer is None:
+            self.build_static_layer()
+
+        now = time.perf_counter()
+        if (self.last_refresh is None or not self.refresh_rate or
+                now - self.last_refresh >= 1.0 / self.refresh_rate):
+            self.last_refresh = now
+            self.refresh(controller, fps, render_stats, input_latency, race_timer)
+
+        if self.use_gl:
+            # One textured quad per band; the transparent middle is never filled
+            self.overlay_texture.upload()
+            self.overlay_texture.draw(self.bands, (0, 0), (self.width, self.height))
+        else:
+            self.overlay_texture.dirty_rects = []
+            for band in self.bands:
+                self.screen.blit(self.overlay, band, band)
+
+    def refresh(self, controller, fps, render_stats=None, input_latency=None, race_timer=None):
+        """
+        Re-read every widget value and redraw the ones whose text or shape changed.
+        """
+        self.redrawn_widgets = 0
+        physics = self.drone_physics
+
+        # Telemetry (speed and angles come from the derived-state cache)
+        derived = physics.derived
+        roll_deg, pitch_deg, yaw_deg = derived.euler_degrees
+        telemetry = (
+            f"{fps:.1f}",
+            f"{physics.battery_remaining:.0f}",
+            f"{physics.position[2]:.1f}",
+            f"{derived.speed:.1f}",
+            f"{roll_deg:.1f}",
+            f"{pitch_deg:.1f}",
+            f"{yaw_deg:.1f}",
+        )
+        for i, value in enumerate(telemetry):
+            self.update_text_widget(('telemetry', i), value, WHITE)
+        self.update_text_widget(('telemetry', 7), controller.mode.upper(), WHITE)
+
+        # Motor forces and sensitivity settings
+        for i in range(4):
+            self.update_text_widget(('motor', i), f"{physics.motor_forces[i]:.2f}", GRAY)
+        sensitivities = (physics.roll_sensitivity, physics.pitch_sensitivity, physics.yaw_sensitivity)
+        for i, value in enumerate(sensitivities):
+            self.update_text_widget(('sensitivity', i), f"{value:.2f}", GRAY)
+
+        # World object counts (frustum culling / LOD)
+        if render_stats is not None:
+            for i, key in enumerate(('drawn', 'culled', 'low_detail')):
+                self.update_text_widget(('render_stats', i), str(render_stats[key]), GRAY)
+
+        # Age of the stick sample behind the displayed state (seconds)
+        if input_latency is not None:
+            self.update_text_widget('input_latency', f"{input_latency * 1000.0:.1f}", GRAY)
+
+        # Current lap and the latest split or lap time of the first timed drone
+        if race_timer is not None:
+            lap = len(race_timer.laps[0]) + 1 if race_timer.started[0] else 0
+            split = race_timer.last_split[0]
+            self.update_text_widget('lap', str(lap), WHITE)
+            self.update_text_widget('split', "-" if math.isnan(split) else f"{split:.2f}", WHITE)
 
-    def render(self, controller, fps):
-        # Draw a semi-transparent background for the top HUD
-        top_hud = pygame.Surface((self.width, 120), pygame.SRCALPHA)
-        top_hud.fill((0, 0, 0, 128))
-        self.screen.blit(top_hud, (0, 0))
-        
-        # Draw a semi-transparent background for the bottom HUD
-        bottom_hud = pygame.Surface((self.width, 180), pygame.SRCALPHA)
-        bottom_hud.fill((0, 0, 0, 128))
-        self.screen.blit(bottom_hud, (0, self.height - 180))
-        
-        # Display telemetry
-        telemetry = [
-            f"FPS: {fps:.1f}",
-            f"Battery: {self.drone_physics.battery_remaining:.0f} mAh",
-            f"Altitude: {self.drone_physics.position[2]:.1f} m",
-            f"Velocity: {np.linalg.norm(self.drone_physics.velocity):.1f} m/s",
-            f"Roll: {math.degrees(self.drone_physics.rotation[0]):.1f}°",
-            f"Pitch: {math.degrees(self.drone_physics.rotation[1]):.1f}°",
-            f"Yaw: {math.degrees(self.drone_physics.rotation[2]):.1f}°",
-            f"Mode: {controller.mode.upper()}"
-        ]
-        
-        # Display motor forces
-        motor_info = [
-            f"Motor FL: {self.drone_physics.motor_forces[0]:.2f} N",
-            f"Motor FR: {self.drone_physics.motor_forces[1]:.2f} N", 
-            f"Motor RR: {self.drone_physics.motor_forces[2]:.2f} N",
-            f"Motor RL: {self.drone_physics.motor_forces[3]:.2f} N"
-        ]
-        
-        # Display sensitivity settings
-        sensitivity_info = [
-            f"Roll Sens: {self.drone_physics.roll_sensitivity:.2f}",
-            f"Pitch Sens: {self.drone_physics.pitch_sensitivity:.2f}",
-            f"Yaw Sens: {self.drone_physics.yaw_sensitivity:.2f}"
-        ]
-        
-        # Render telemetry
-        y_offset = 10
-        for i, text in enumerate(telemetry):
-            text_surface = self.font.render(text, True, (255, 255, 255))
-            self.screen.blit(text_surface, (10 + i * 150, y_offset))
-        
-        # Render motor info
-        y_offset = 40
-        for i, text in enumerate(motor_info):
-            text_surface = self.font.render(text, True, (200, 200, 200))
-            self.screen.blit(text_surface, (10 + i * 200, y_offset))
-        
-        # Render sensitivity info
-        y_offset = 70
-        for i, text in enumerate(sensitivity_info):
-            text_surface = self.font.render(text, True, (200, 200, 200))
-            self.screen.blit(text_surface, (10 + i * 150, y_offset))
-        
-        # Render controls info
-        controls_info = "Press 1-6 to adjust sensitivity, V for view toggle, R to reset, P to pause"
-        controls_text = self.font.render(controls_info, True, (255, 255, 255))
-        self.screen.blit(controls_text, (10, 100))
-        
-        # Draw enhanced joystick visualization at bottom of screen
         self.draw_enhanced_sticks(controller)
-        
-        # Draw artificial horizon
         self.draw_horizon()
 
+    # --- Static layer -----------------------------------------------------
+
+    def build_static_layer(self):
+        """
+        Rasterize everything that never changes and lay out the value widgets.
+        """
+        layer = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        # Top and bottom bands: everything the HUD draws lies inside them
+        self.bands = [pygame.Rect(0, 0, self.width, 120),
+                      pygame.Rect(0, self.height - 180, self.width, 180)]
+        for band in self.bands:
+            layer.fill((0, 0, 0, 128), band)
+
+        # Widget layout: name -> (value rect, suffix)
+        self.widgets = {}
+
+        telemetry = (("FPS: ", ""), ("Battery: ", " mAh"), ("Altitude: ", " m"),
+                     ("Velocity: ", " m/s"), ("Roll: ", "°"), ("Pitch: ", "°"),
+                     ("Yaw: ", "°"), ("Mode: ", ""))
+        for i, (label, suffix) in enumerate(telemetry):
+            self.add_label(layer, ('telemetry', i), label, suffix, (10 + i * 150, 10), 150, WHITE)
+
+        for i, name in enumerate(("FL", "FR", "RR", "RL")):
+            self.add_label(layer, ('motor', i), f"Motor {name}: ", " N", (10 + i * 200, 40), 200, GRAY)
+
+        for i, name in enumerate(("Roll", "Pitch", "Yaw")):
+            self.add_label(layer, ('sensitivity', i), f"{name} Sens: ", "", (10 + i * 150, 70), 150, GRAY)
+
+        # Render stats share one line; each count gets room for six digits
+        x = 10 + 3 * 150
+        digit_width = self.font.size("0")[0] * 6
+        for i, label in enumerate(("Drawn: ", "Culled: ", "Low LOD: ")):
+            self.add_label(layer, ('render_stats', i), label, "", (x, 70), None, GRAY, digit_width)
+            x = self.widgets[('render_stats', i)][0].right + self.font.size("  ")[0]
+
+        controls_info = "Press 1-6 to adjust sensitivity, V for view toggle, T for path, R to reset, P to pause"
+        layer.blit(self.font.render(controls_info, True, WHITE), (10, 100))
+        self.add_label(layer, 'input_latency', "Input lag: ", " ms", (10 + 4 * 150, 100), 150, GRAY)
+        self.add_label(layer, 'lap', "Lap: ", "", (10 + 4 * 200, 40), 200, WHITE)
+        self.add_label(layer, 'split', "Split: ", " s", (10 + 4 * 200, 100), 200, WHITE)
+
+        # Stick titles, backgrounds and crosshairs
+        radius = self.stick_radius
+        layer.blit(self.font.render("LEFT STICK (Throttle/Yaw)", True, WHITE),
+                   (self.width // 4 - 100, self.height - 170))
+        layer.blit(self.font.render("RIGHT STICK (Roll/Pitch)", True, WHITE),
+                   (3 * self.width // 4 - 100, self.height - 170))
+        for center in (self.left_center, self.right_center):
+            self.draw_stick_frame(layer, center)
+
+        labels = (("Throttle: ", self.left_center, 10), ("Yaw: ", self.left_center, 30),
+                  ("Roll: ", self.right_center, 10), ("Pitch: ", self.right_center, 30))
+        for i, (label, center, offset) in enumerate(labels):
+            position = (center[0] - 60, center[1] + radius + offset)
+            self.add_label(layer, ('stick_label', i), label, "", position, 150, WHITE)
+
+        # Horizon background
+        pygame.draw.rect(layer, (0, 0, 0), self.horizon_rect)
+
+        self.static_layer = layer
+        self.overlay.fill((0, 0, 0, 0))
+        self.overlay.blit(layer, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+        self.widget_values = {}
+        self.overlay_texture.mark_dirty()
+
+    def add_label(self, layer, name, label, suffix, position, column_width, color, value_width=None):
+        """
+        Draw a static label and reserve the rectangle to its right for the value.
+        """
+        surface = self.font.render(label, True, color)
+        layer.blit(surface, position)
+        x = position[0] + surface.get_width()
+        if value_width is None:
+            value_width = position[0] + column_width - x
+        rect = pygame.Rect(x, position[1], max(value_width, 0), self.line_height)
+        self.widgets[name] = (rect, suffix)
+
+    def draw_stick_frame(self, surface, center):
+        radius = self.stick_radius
+        pygame.draw.circle(surface, (40, 40, 40), center, radius)
+        pygame.draw.circle(surface, (100, 100, 100), center, radius, 2)
+        pygame.draw.line(surface, (70, 70, 70),
+                         (center[0] - radius, center[1]), (center[0] + radius, center[1]), 1)
+        pygame.draw.line(surface, (70, 70, 70),
+                         (center[0], center[1] - radius), (center[0], center[1] + radius), 1)
+
+    # --- Widgets ----------------------------------------------------------
+
+    def begin_widget(self, name, key, rect):
+        """
+        Return True (with the rect restored from the static layer and clipped)
+        if the widget's key changed and it must be redrawn.
+        """
+        if self.widget_values.get(name) == key:
+            return False
+        self.widget_values[name] = key
+        self.overlay.fill((0, 0, 0, 0), rect)
+        self.overlay.blit(self.static_layer, rect, rect, special_flags=pygame.BLEND_RGBA_MAX)
+        self.overlay.set_clip(rect)
+        self.overlay_texture.mark_dirty(rect)
+        self.redrawn_widgets += 1
+        self.total_redraws += 1
+        return True
+
+    def update_text_widget(self, name, text, color):
+        rect, suffix = self.widgets[name]
+        if not self.begin_widget(name, text, rect):
+            return
+        x = self.draw_text(text, (rect.x, rect.y), color)
+        if suffix:
+            self.draw_text(suffix, (x, rect.y), color)
+        self.overlay.set_clip(None)
+
+    def draw_text(self, text, position, color):
+        """
+        Draw text onto the overlay, composing atlas characters glyph by glyph.
+        Returns the x coordinate after the text.
+        """
+        x, y = position
+        glyphs = self.glyph_atlas(color)
+        if all(character in glyphs for character in text):
+            for character in text:
+                glyph = glyphs[character]
+                self.overlay.blit(glyph, (x, y))
+                x += glyph.get_width()
+            return x
+
+        # Labels outside the atlas (mode names, units) are cached whole
+        surface = self.text_cache.get((text, color))
+        if surface is None:
+            surface = self.font.render(text, True, color)
+            self.text_cache[(text, color)] = surface
+        self.overlay.blit(surface, (x, y))
+        return x + surface.get_width()
+
+    def glyph_atlas(self, color):
+        glyphs = self.glyphs.get(color)
+        if glyphs is None:
+            glyphs = {character: self.font.render(character, True, color)
+                      for character in ATLAS_CHARACTERS}
+            self.glyphs[color] = glyphs
+        return glyphs
+
     def draw_enhanced_sticks(self, controller):
-        # Create an enhanced visualization of both joysticks
         # Get both processed and raw values
         throttle, roll, pitch, yaw = controller.throttle, controller.roll, controller.pitch, controller.yaw
         raw_throttle, raw_roll, raw_pitch, raw_yaw = controller.get_raw_values()
-        
-        # Left stick (throttle/yaw)
-        left_title = self.font.render("LEFT STICK (Throttle/Yaw)", True, (255, 255, 255))
-        self.screen.blit(left_title, (self.width // 4 - 100, self.height - 170))
-        
-        # Right stick (roll/pitch)
-        right_title = self.font.render("RIGHT STICK (Roll/Pitch)", True, (255, 255, 255))
-        self.screen.blit(right_title, (3 * self.width // 4 - 100, self.height - 170))
-        
-        # Left stick visualization (centered in left half)
-        stick_radius = 60
-        left_center = (self.width // 4, self.height - 90)
-        
-        # Background circle
-        pygame.draw.circle(self.screen, (40, 40, 40), left_center, stick_radius)
-        pygame.draw.circle(self.screen, (100, 100, 100), left_center, stick_radius, 2)
-        
-        # Crosshairs
-        pygame.draw.line(self.screen, (70, 70, 70), 
-                         (left_center[0] - stick_radius, left_center[1]),
-                         (left_center[0] + stick_radius, left_center[1]), 1)
-        pygame.draw.line(self.screen, (70, 70, 70), 
-                         (left_center[0], left_center[1] - stick_radius),
-                         (left_center[0], left_center[1] + stick_radius), 1)
-        
-        # Stick position (processed values)
-        pygame.draw.circle(self.screen, (0, 255, 0),
-                           (int(left_center[0] + yaw * stick_radius),
-                            int(left_center[1] - throttle * stick_radius)),
-                           8)
-        
-        # Raw stick position
-        pygame.draw.circle(self.screen, (255, 255, 0),
-                           (int(left_center[0] + raw_yaw * stick_radius),
-                            int(left_center[1] - raw_throttle * stick_radius)),
-                           4)
-        
-        # Right stick visualization (centered in right half)
-        right_center = (3 * self.width // 4, self.height - 90)
-        
-        # Background circle
-        pygame.draw.circle(self.screen, (40, 40, 40), right_center, stick_radius)
-        pygame.draw.circle(self.screen, (100, 100, 100), right_center, stick_radius, 2)
-        
-        # Crosshairs
-        pygame.draw.line(self.screen, (70, 70, 70), 
-                         (right_center[0] - stick_radius, right_center[1]),
-                         (right_center[0] + stick_radius, right_center[1]), 1)
-        pygame.draw.line(self.screen, (70, 70, 70), 
-                         (right_center[0], right_center[1] - stick_radius),
-                         (right_center[0], right_center[1] + stick_radius), 1)
-        
-        # Stick position (processed values)
-        pygame.draw.circle(self.screen, (0, 255, 0),
-                           (int(right_center[0] + roll * stick_radius),
-                            int(right_center[1] - pitch * stick_radius)),
-                           8)
-        
-        # Raw stick position
-        pygame.draw.circle(self.screen, (255, 255, 0),
-                           (int(right_center[0] + raw_roll * stick_radius),
-                            int(right_center[1] - raw_pitch * stick_radius)),
-                           4)
-        
-        # Add labels
-        throttle_label = self.font.render(f"Throttle: {throttle:.2f}", True, (255, 255, 255))
-        yaw_label = self.font.render(f"Yaw: {yaw:.2f}", True, (255, 255, 255))
-        roll_label = self.font.render(f"Roll: {roll:.2f}", True, (255, 255, 255))
-        pitch_label = self.font.render(f"Pitch: {pitch:.2f}", True, (255, 255, 255))
-        
-        self.screen.blit(throttle_label, (left_center[0] - 60, left_center[1] + stick_radius + 10))
-        self.screen.blit(yaw_label, (left_center[0] - 60, left_center[1] + stick_radius + 30))
-        self.screen.blit(roll_label, (right_center[0] - 60, right_center[1] + stick_radius + 10))
-        self.screen.blit(pitch_label, (right_center[0] - 60, right_center[1] + stick_radius + 30))
+        radius = self.stick_radius
+
+        # Left stick (throttle/yaw) and right stick (roll/pitch)
+        sticks = (('left_stick', self.left_center, yaw, throttle, raw_yaw, raw_throttle),
+                  ('right_stick', self.right_center, roll, pitch, raw_roll, raw_pitch))
+        for name, center, x, y, raw_x, raw_y in sticks:
+            stick = (int(center[0] + x * radius), int(center[1] - y * radius))
+            raw_stick = (int(center[0] + raw_x * radius), int(center[1] - raw_y * radius))
+            # Room for the dots even when the stick is at full deflection
+            rect = pygame.Rect(center[0] - radius - 8, center[1] - radius - 8,
+                               2 * radius + 17, 2 * radius + 17)
+            if self.begin_widget(name, (stick, raw_stick), rect):
+                # Stick position (processed values) and raw stick position
+                pygame.draw.circle(self.overlay, (0, 255, 0), stick, 8)
+                pygame.draw.circle(self.overlay, (255, 255, 0), raw_stick, 4)
+                self.overlay.set_clip(None)
+
+        for i, value in enumerate((throttle, yaw, roll, pitch)):
+            self.update_text_widget(('stick_label', i), f"{value:.2f}", WHITE)
 
     def draw_horizon(self):
-        horizon_width = 200
-        horizon_height = 100
-        horizon_x = (self.width - horizon_width) // 2
-        horizon_y = self.height - horizon_height - 40  # Positioned at bottom of screen
-        pygame.draw.rect(self.screen, (0, 0, 0), (horizon_x, horizon_y, horizon_width, horizon_height))
+        rect = self.horizon_rect
         roll = self.drone_physics.rotation[0]
         pitch = self.drone_physics.rotation[1]
-        center_x = horizon_x + horizon_width // 2
-        center_y = horizon_y + horizon_height // 2
+        center_x = rect.x + rect.width // 2
+        center_y = rect.y + rect.height // 2
         pitch_offset = pitch * 40
-        pygame.draw.line(
-            self.screen,
-            (0, 255, 0),
-            (center_x - math.cos(roll) * horizon_width,
-             center_y - math.sin(roll) * horizon_width + pitch_offset),
-            (center_x + math.cos(roll) * horizon_width,
-             center_y + math.sin(roll) * horizon_width + pitch_offset),
-            2
-        )
-        pygame.draw.line(self.screen, (255, 255, 255),
-                         (center_x - 10, center_y),
-                         (center_x + 10, center_y), 1)
-        pygame.draw.line(self.screen, (255, 255, 255),
-                         (center_x, center_y - 10),
-                         (center_x, center_y + 10), 1)
\ No newline at end of file
+        # The horizon line is clipped to its box, so the box is the whole widget
+        start = (round(center_x - math.cos(roll) * rect.width),
+                 round(center_y - math.sin(roll) * rect.width + pitch_offset))
+        end = (round(center_x + math.cos(roll) * rect.width),
+               round(center_y + math.sin(roll) * rect.width + pitch_offset))
+        if not self.begin_widget('horizon', (start, end), rect):
+            return
+        pygame.draw.line(self.overlay, (0, 255, 0), start, end, 2)
+        pygame.draw.line(self.overlay, (255, 255, 255),
+                         (center_x - 10, center_y), (center_x + 10, center_y), 1)
+        pygame.draw.line(self.overlay, (255, 255, 255),
+                         (center_x, center_y - 10), (center_x, center_y + 10), 1)
+        self.overlay.set_clip(None)
+
+    def release(self):
+        self.overlay_texture.release()
@@ -0,0 +1,89 @@
+import pygame
+from OpenGL.GL import *
+
+
+class OverlayTexture:
+    """
+    RGBA texture mirroring a pygame overlay surface.
+
+    Changed rectangles of the surface are marked dirty and re-uploaded with
+    glTexSubImage2D; draw() composites regions of the texture onto the
+    screen as textured quads in a single draw call.
+    """
+
+    def __init__(self, surface):
+        self.surface = surface
+        self.width, self.height = surface.get_size()
+        self.texture = None
+        self.dirty_rects = []
+
+    def mark_dirty(self, rect=None):
+        """Flag a rectangle (default: the whole surface) for the next upload."""
+        self.dirty_rects.append(pygame.Rect(rect) if rect is not None else self.surface.get_rect())
+
+    def upload(self):
+        """
+        Copy the dirty rectangles into the texture, creating it on first use.
+        """
+        if self.texture is None:
+            self.texture = glGenTextures(1)
+            glBindTexture(GL_TEXTURE_2D, self.texture)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, self.width, self.height, 0,
+                         GL_RGBA, GL_UNSIGNED_BYTE, None)
+            self.dirty_rects = [self.surface.get_rect()]
+        if not self.dirty_rects:
+            return
+
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        bounds = self.surface.get_rect()
+        for rect in self.dirty_rects:
+            rect = rect.clip(bounds)
+            if rect.width == 0 or rect.height == 0:
+                continue
+            # Texture rows run top to bottom like the surface; draw() flips them
+            pixels = pygame.image.tobytes(self.surface.subsurface(rect), 'RGBA')
+            glTexSubImage2D(GL_TEXTURE_2D, 0, rect.x, rect.y, rect.width, rect.height,
+                            GL_RGBA, GL_UNSIGNED_BYTE, pixels)
+        self.dirty_rects = []
+
+    def draw(self, regions, position, screen_size):
+        """
+        Draw regions (rects in surface pixels) of the texture with the
+        surface's top-left corner at position (screen pixels). Expects
+        identity projection and modelview matrices.
+        """
+        screen_width, screen_height = screen_size
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glEnable(GL_TEXTURE_2D)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glColor4f(1.0, 1.0, 1.0, 1.0)
+        glBegin(GL_QUADS)
+        for region in regions:
+            u0, u1 = region.left / self.width, region.right / self.width
+            v0, v1 = region.top / self.height, region.bottom / self.height
+            # Screen pixels to normalized device coordinates (y up)
+            x0 = 2.0 * (position[0] + region.left) / screen_width - 1.0
+            x1 = 2.0 * (position[0] + region.right) / screen_width - 1.0
+            y0 = 1.0 - 2.0 * (position[1] + region.top) / screen_height
+            y1 = 1.0 - 2.0 * (position[1] + region.bottom) / screen_height
+            glTexCoord2f(u0, v0)
+            glVertex2f(x0, y0)
+            glTexCoord2f(u1, v0)
+            glVertex2f(x1, y0)
+            glTexCoord2f(u1, v1)
+            glVertex2f(x1, y1)
+            glTexCoord2f(u0, v1)
+            glVertex2f(x0, y1)
+        glEnd()
+        glDisable(GL_BLEND)
+        glDisable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    def release(self):
+        if self.texture is not None:
+            glDeleteTextures([self.texture])
+            self.texture = None
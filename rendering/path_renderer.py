@@ -0,0 +1,34 @@
+import numpy as np
+from OpenGL.GL import *
+
+PATH_COLOR = (0.2, 1.0, 0.3)
+IMPACT_COLOR = (1.0, 0.2, 0.1)
+
+
+class PathRenderer:
+    """
+    Draws a predicted flight path as one line strip from a client-side
+    vertex array, plus a marker where the path ends in an impact. The path
+    turns from PATH_COLOR to IMPACT_COLOR when it ends in one.
+    """
+
+    def __init__(self, line_width=2.0, marker_size=8.0):
+        self.line_width = line_width
+        self.marker_size = marker_size
+
+    def render(self, points, impact=False):
+        """points: (n, 3) float32 positions; impact: whether the last point is an impact."""
+        if len(points) < 2:
+            return
+        points = np.ascontiguousarray(points, dtype=np.float32)
+        glLineWidth(self.line_width)
+        glColor3f(*(IMPACT_COLOR if impact else PATH_COLOR))
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, points)
+        glDrawArrays(GL_LINE_STRIP, 0, len(points))
+        if impact:
+            glPointSize(self.marker_size)
+            glDrawArrays(GL_POINTS, len(points) - 1, 1)
+            glPointSize(1.0)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glLineWidth(1.0)
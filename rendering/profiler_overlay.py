@@ -0,0 +1,74 @@
+import time
+import pygame
+from rendering.overlay import OverlayTexture
+
+ROW_COLOR = (220, 220, 220)
+HEADER_COLOR = (255, 255, 0)
+
+
+class ProfilerOverlay:
+    """
+    Toggleable table of p50/p95/p99 per-stage frame times from a FrameProfiler.
+
+    The table is re-rasterized only refresh_rate times per second; in between,
+    the cached surface (or texture, on an OpenGL screen) is drawn as is.
+    """
+
+    def __init__(self, screen, font, profiler, position=(10, 130), refresh_rate=4.0):
+        self.screen = screen
+        self.font = font
+        self.profiler = profiler
+        self.position = position
+        self.refresh_rate = refresh_rate
+        self.visible = False
+        self.use_gl = bool(screen.get_flags() & pygame.OPENGL)
+
+        self.rows = list(profiler.stages) + ['frame', 'allocated_blocks']
+        self.line_height = font.get_linesize()
+        self.columns = (0, 140, 200, 260)
+        height = (len(self.rows) + 1) * self.line_height + 8
+        self.surface = pygame.Surface((330, height), pygame.SRCALPHA)
+        self.overlay_texture = OverlayTexture(self.surface)
+        self.last_refresh = None
+
+    def toggle(self):
+        self.visible = not self.visible
+        self.last_refresh = None
+
+    def render(self):
+        if not self.visible:
+            return
+        now = time.perf_counter()
+        if self.last_refresh is None or now - self.last_refresh >= 1.0 / self.refresh_rate:
+            self.last_refresh = now
+            self.refresh()
+
+        if self.use_gl:
+            self.overlay_texture.upload()
+            self.overlay_texture.draw([self.surface.get_rect()], self.position, self.screen.get_size())
+        else:
+            self.screen.blit(self.surface, self.position)
+
+    def refresh(self):
+        surface = self.surface
+        surface.fill((0, 0, 0, 160))
+        x, y = 6, 4
+        header = ("stage (ms)", "p50", "p95", "p99")
+        for column, text in zip(self.columns, header):
+            surface.blit(self.font.render(text, True, HEADER_COLOR), (x + column, y))
+
+        stats = self.profiler.percentiles()
+        for row in self.rows:
+            y += self.line_height
+            values = stats.get(row)
+            label = "alloc blocks" if row == 'allocated_blocks' else row
+            cells = [label]
+            if values is not None:
+                fmt = "{:.0f}" if row == 'allocated_blocks' else "{:.2f}"
+                cells += [fmt.format(value) for value in values]
+            for column, text in zip(self.columns, cells):
+                surface.blit(self.font.render(text, True, ROW_COLOR), (x + column, y))
+        self.overlay_texture.mark_dirty()
+
+    def release(self):
+        self.overlay_texture.release()
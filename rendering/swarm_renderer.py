@@ -0,0 +1,239 @@
+import ctypes
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.GL import shaders
+from OpenGL.error import Error as GLError, NullFunctionError
+
+from utils.math_utils import rotation_matrices_from_euler
+
+# Per-instance data: the three rows of the model transform [R | t] and the
+# four propeller angles (radians)
+INSTANCE_FLOATS = 16
+
+# Attribute locations shared by the mesh and instance buffers
+ATTRIBUTES = {'position': 0, 'color': 1, 'pivot': 2, 'row0': 3, 'row1': 4, 'row2': 5, 'props': 6}
+
+VERTEX_SHADER = """
+#version 120
+attribute vec3 position;
+attribute vec3 color;
+attribute vec4 pivot;
+attribute vec4 row0;
+attribute vec4 row1;
+attribute vec4 row2;
+attribute vec4 props;
+
+void main() {
+    vec3 p = position;
+    if (pivot.w >= 0.0) {
+        // Spin propeller vertices about their motor
+        float angle = dot(props, vec4(equal(vec4(pivot.w), vec4(0.0, 1.0, 2.0, 3.0))));
+        float c = cos(angle);
+        float s = sin(angle);
+        vec2 d = p.xy - pivot.xy;
+        p.xy = pivot.xy + vec2(c * d.x - s * d.y, s * d.x + c * d.y);
+    }
+    vec4 local = vec4(p, 1.0);
+    gl_Position = gl_ModelViewProjectionMatrix * vec4(dot(row0, local), dot(row1, local), dot(row2, local), 1.0);
+    gl_FrontColor = vec4(color, 1.0);
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 120
+void main() {
+    gl_FragColor = gl_Color;
+}
+"""
+
+
+class SwarmRenderer:
+    """
+    Draws many drones sharing one DroneMesh with a single draw call.
+
+    Per frame the drones' positions and Euler angles are turned into model
+    transforms in one vectorized call, drones outside the view frustum are
+    dropped, and the rest are uploaded together as one instance buffer and
+    drawn with glDrawElementsInstanced; a small vertex shader applies each
+    instance's transform and propeller spin. Where shaders or instancing are
+    unavailable the same transforms are applied on the CPU into one streamed
+    vertex buffer, which is still a single glDrawElements call.
+    """
+
+    def __init__(self, mesh, max_thrust):
+        self.mesh = mesh
+        self.max_thrust = max_thrust
+        self.prop_angles = np.zeros((0, 4))
+        self.program = None
+        self.instance_vbo = None
+        self.initialized = False
+        self.instanced = False
+
+        # CPU fallback buffers, grown as needed
+        self.stream_vbo = None
+        self.stream_ibo = None
+        self.stream_capacity = 0
+
+        # Statistics from the last render() call
+        self.drawn_count = 0
+        self.culled_count = 0
+
+    def initialize(self):
+        """Compile the instancing shader, falling back to CPU transforms on failure."""
+        self.initialized = True
+        self.mesh.upload()
+        if self.mesh.vbo is None or not (bool(glDrawElementsInstanced) and bool(glVertexAttribDivisor)):
+            return
+        try:
+            program = glCreateProgram()
+            glAttachShader(program, shaders.compileShader(VERTEX_SHADER, GL_VERTEX_SHADER))
+            glAttachShader(program, shaders.compileShader(FRAGMENT_SHADER, GL_FRAGMENT_SHADER))
+            for name, location in ATTRIBUTES.items():
+                glBindAttribLocation(program, location, name)
+            glLinkProgram(program)
+            if glGetProgramiv(program, GL_LINK_STATUS) != GL_TRUE:
+                raise RuntimeError(glGetProgramInfoLog(program))
+            self.instance_vbo = glGenBuffers(1)
+        except (RuntimeError, GLError, NullFunctionError):
+            return
+        self.program = program
+        self.instanced = True
+
+    def release(self):
+        buffers = [buffer for buffer in (self.instance_vbo, self.stream_vbo, self.stream_ibo) if buffer is not None]
+        if buffers:
+            glDeleteBuffers(len(buffers), buffers)
+        if self.program is not None:
+            glDeleteProgram(self.program)
+        self.instance_vbo = self.stream_vbo = self.stream_ibo = self.program = None
+        self.stream_capacity = 0
+        self.initialized = self.instanced = False
+
+    def update_props(self, motor_forces):
+        """Advance the propeller angles like DroneRenderer: 30 degrees per frame at full thrust."""
+        if len(self.prop_angles) != len(motor_forces):
+            self.prop_angles = np.zeros((len(motor_forces), 4))
+        self.prop_angles += np.radians(30.0) * motor_forces / self.max_thrust
+        self.prop_angles %= 2 * np.pi
+
+    def render(self, positions, rotations, motor_forces, frustum=None):
+        """
+        Draw every drone: (N, 3) positions, (N, 3) roll/pitch/yaw and (N, 4)
+        motor forces, e.g. a race field's snapshot.
+        """
+        if not self.initialized:
+            self.initialize()
+        self.update_props(motor_forces)
+
+        visible = np.ones(len(positions), dtype=bool)
+        if frustum is not None:
+            visible = frustum.spheres_visible(positions, np.full(len(positions), self.mesh.radius))
+        count = int(visible.sum())
+        self.drawn_count = count
+        self.culled_count = len(positions) - count
+        if count == 0:
+            return
+
+        instances = np.empty((count, INSTANCE_FLOATS), dtype=np.float32)
+        matrices = rotation_matrices_from_euler(rotations[visible])
+        transforms = instances[:, :12].reshape(count, 3, 4)
+        transforms[:, :, :3] = matrices
+        transforms[:, :, 3] = positions[visible]
+        instances[:, 12:] = self.prop_angles[visible]
+
+        if self.instanced:
+            self.draw_instanced(instances)
+        else:
+            self.draw_transformed(instances)
+
+    def draw_instanced(self, instances):
+        mesh = self.mesh
+        glUseProgram(self.program)
+
+        stride = mesh.vertices.strides[0]
+        glBindBuffer(GL_ARRAY_BUFFER, mesh.vbo)
+        for name, offset, size in (('position', 0, 3), ('color', 12, 3), ('pivot', 24, 4)):
+            location = ATTRIBUTES[name]
+            glEnableVertexAttribArray(location)
+            glVertexAttribPointer(location, size, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(offset))
+
+        # Orphan and refill the instance buffer every frame
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_vbo)
+        glBufferData(GL_ARRAY_BUFFER, instances.nbytes, instances, GL_STREAM_DRAW)
+        instance_stride = instances.strides[0]
+        for i, name in enumerate(('row0', 'row1', 'row2', 'props')):
+            location = ATTRIBUTES[name]
+            glEnableVertexAttribArray(location)
+            glVertexAttribPointer(location, 4, GL_FLOAT, GL_FALSE, instance_stride, ctypes.c_void_p(16 * i))
+            glVertexAttribDivisor(location, 1)
+
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, mesh.ibo)
+        glDrawElementsInstanced(GL_TRIANGLES, mesh.index_count, GL_UNSIGNED_INT, ctypes.c_void_p(0), len(instances))
+
+        for location in ATTRIBUTES.values():
+            glDisableVertexAttribArray(location)
+            glVertexAttribDivisor(location, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glUseProgram(0)
+
+    def transform_vertices(self, instances):
+        """
+        CPU version of the vertex shader: (count * V, 6) world-space positions
+        and colors for all instances.
+        """
+        mesh = self.mesh
+        count = len(instances)
+        local = np.broadcast_to(mesh.vertices[:, 0:3], (count, mesh.vertex_count, 3)).copy()
+
+        # Spin propeller vertices about their motor
+        motor = mesh.vertices[:, 9].astype(np.intp)
+        spinning = np.flatnonzero(motor >= 0)
+        angles = instances[:, 12:][:, motor[spinning]]
+        c, s = np.cos(angles), np.sin(angles)
+        pivot = mesh.vertices[spinning, 6:8]
+        d = local[:, spinning, :2] - pivot
+        local[:, spinning, 0] = pivot[:, 0] + c * d[..., 0] - s * d[..., 1]
+        local[:, spinning, 1] = pivot[:, 1] + s * d[..., 0] + c * d[..., 1]
+
+        transforms = instances[:, :12].reshape(count, 3, 4)
+        vertices = np.empty((count, mesh.vertex_count, 6), dtype=np.float32)
+        vertices[:, :, :3] = np.einsum('nij,nvj->nvi', transforms[:, :, :3], local) + transforms[:, None, :, 3]
+        vertices[:, :, 3:] = mesh.vertices[:, 3:6]
+        return vertices.reshape(-1, 6)
+
+    def draw_transformed(self, instances):
+        mesh = self.mesh
+        count = len(instances)
+        vertices = self.transform_vertices(instances)
+        if count > self.stream_capacity:
+            # Index buffer for the new capacity: the mesh indices repeated per instance
+            self.stream_capacity = max(count, 2 * self.stream_capacity)
+            offsets = np.arange(self.stream_capacity, dtype=np.uint32)[:, None] * mesh.vertex_count
+            self.stream_indices = (mesh.indices[None, :] + offsets).ravel()
+            if mesh.vbo is not None:
+                if self.stream_vbo is None:
+                    self.stream_vbo, self.stream_ibo = glGenBuffers(2)
+                glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.stream_ibo)
+                glBufferData(GL_ELEMENT_ARRAY_BUFFER, self.stream_indices.nbytes, self.stream_indices, GL_STATIC_DRAW)
+                glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+        index_count = count * mesh.index_count
+        stride = vertices.strides[0]
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        if self.stream_vbo is not None:
+            glBindBuffer(GL_ARRAY_BUFFER, self.stream_vbo)
+            glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STREAM_DRAW)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.stream_ibo)
+            glVertexPointer(3, GL_FLOAT, stride, ctypes.c_void_p(0))
+            glColorPointer(3, GL_FLOAT, stride, ctypes.c_void_p(12))
+            glDrawElements(GL_TRIANGLES, index_count, GL_UNSIGNED_INT, ctypes.c_void_p(0))
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+        else:
+            glVertexPointer(3, GL_FLOAT, 0, np.ascontiguousarray(vertices[:, :3]))
+            glColorPointer(3, GL_FLOAT, 0, np.ascontiguousarray(vertices[:, 3:]))
+            glDrawElements(GL_TRIANGLES, index_count, GL_UNSIGNED_INT, self.stream_indices[:index_count])
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
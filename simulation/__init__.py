@@ -0,0 +1,10 @@
+from .headless import HeadlessSimulator
+from .physics_loop import PhysicsLoop, StateSnapshot
+from .determinism import replay_log, first_divergence
+from .race import AIPilots, RaceField
+from .race_timing import RaceTimer
+from .prediction import TrajectoryPredictor
+
+__all__ = ['HeadlessSimulator', 'PhysicsLoop', 'StateSnapshot', 'replay_log', 'first_divergence', 'AIPilots',
+           'RaceField', 'RaceTimer',
+           'TrajectoryPredictor']
\ No newline at end of file
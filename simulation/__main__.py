@@ -0,0 +1,80 @@
+import argparse
+import functools
+import numpy as np
+
+from environment.environment import Environment
+from environment.chunked import ChunkedEnvironment
+from environment.terrain import Terrain
+from input.scripted import ScriptedInput, DEMO_KEYFRAMES
+from physics.drone_physics import DronePhysics
+from physics.fast_physics import FastDronePhysics
+from physics.rate_controlled_physics import RateControlledDronePhysics
+from recording.recorder import FlightRecorder
+from recording.log import FlightLog
+from simulation.headless import HeadlessSimulator
+from simulation.determinism import run_metadata, replay_log
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a scripted flight without a display")
+    parser.add_argument('--seconds', type=float, default=60.0, help="simulated seconds to fly")
+    parser.add_argument('--fast', action='store_true', help="use the allocation-free FastDronePhysics")
+    parser.add_argument('--controller-rate', type=float, default=None, metavar='HZ',
+                        help="fly through the acro rate controller running at this rate")
+    parser.add_argument('--dt', type=float, default=None, help="physics time step override (s)")
+    parser.add_argument('--record', default=None, help="write a flight log to this path")
+    parser.add_argument('--quantized', action='store_true', help="use the compact quantized log encoding")
+    parser.add_argument('--seed', type=int, default=0, help="environment random seed")
+    parser.add_argument('--endless', action='store_true', help="fly an endless procedurally generated course")
+    parser.add_argument('--terrain', default=None, metavar='MAP',
+                        help="fly over a heightmap terrain file (see environment.terrain)")
+    parser.add_argument('--verify', default=None, metavar='LOG',
+                        help="replay a raw flight log and report the first diverging tick")
+    args = parser.parse_args()
+    if args.terrain and args.endless:
+        parser.error("--terrain needs the fixed course; it cannot be combined with --endless")
+
+    if args.verify:
+        try:
+            log = FlightLog(args.verify)
+            tick = replay_log(log)
+        except (OSError, ValueError) as error:
+            parser.error(f"cannot verify {args.verify}: {error}")
+        if tick is None:
+            print(f"Replay of {len(log)} ticks matches {args.verify}")
+        else:
+            print(f"Replay diverges from {args.verify} at tick {tick} (t={tick * log.dt:.3f} s)")
+        return
+
+    script = ScriptedInput(DEMO_KEYFRAMES)
+    physics_factory = FastDronePhysics if args.fast else DronePhysics
+    if args.controller_rate:
+        physics_factory = functools.partial(RateControlledDronePhysics, controller_rate=args.controller_rate)
+    if args.endless:
+        environment = ChunkedEnvironment(args.seed)
+    else:
+        environment = Environment(args.seed, terrain=Terrain(args.terrain) if args.terrain else None)
+    simulator = HeadlessSimulator(input_source=script, physics_factory=physics_factory, dt=args.dt,
+                                  environment=environment)
+    if args.record:
+        simulator.recorder = FlightRecorder(args.record, simulator.dt,
+                                            encoding='quantized' if args.quantized else 'raw',
+                                            metadata=run_metadata(simulator.environment, simulator.drone_physics))
+    state = simulator.run(args.seconds)
+    if simulator.recorder is not None:
+        simulator.recorder.close()
+        print(f"Recorded {simulator.recorder.written_records} ticks to {args.record}")
+
+    print(f"Simulated {state['time']:.1f} s in {simulator.wall_time:.2f} s wall time "
+          f"({simulator.realtime_factor:.1f} sim-s/wall-s)")
+    print(f"Final position: {np.round(state['position'], 2)}, "
+          f"battery: {state['battery_remaining']:.0f} mAh, collisions: {state['collisions']}, "
+          f"state hash: {state['state_hash']:016x}")
+    controller = getattr(simulator.drone_physics, 'flight_controller', None)
+    if controller is not None:
+        print(f"Flight controller: {controller.loop_rate:.0f} Hz achieved, "
+              f"{controller.cost_per_sim_second * 1000:.1f} ms per simulated second")
+
+
+if __name__ == "__main__":
+    main()
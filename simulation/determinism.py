@@ -0,0 +1,102 @@
+"""
+Bit-for-bit replay checks.
+
+A flight is deterministic when it runs through HeadlessSimulator (or the
+PhysicsLoop) with a seeded Environment and one stick sample per physics
+tick: replaying the same sticks from the same seed reproduces every state
+hash. A raw flight log holds exactly that (sticks, sensitivities, resets,
+per-tick state hash and the seed in its metadata), so it can be re-flown
+and compared, e.g. after a refactor or an optimization of the physics code.
+"""
+import functools
+import os
+import numpy as np
+
+from environment.environment import Environment
+from environment.chunked import ChunkedEnvironment
+from environment.terrain import Terrain
+from physics.drone_physics import DronePhysics
+from physics.fast_physics import FastDronePhysics
+from physics.quaternion_physics import QuaternionDronePhysics
+from physics.rate_controlled_physics import RateControlledDronePhysics
+from recording.format import FORMAT_VERSION, EVENT_RESET
+from simulation.headless import HeadlessSimulator
+
+PHYSICS_MODELS = {cls.__name__: cls for cls in (DronePhysics, FastDronePhysics, QuaternionDronePhysics,
+                                                RateControlledDronePhysics)}
+ENVIRONMENTS = {cls.__name__: cls for cls in (Environment, ChunkedEnvironment)}
+
+
+def run_metadata(environment, drone):
+    """Flight log metadata needed to replay a run."""
+    metadata = {'seed': environment.seed, 'physics': type(drone).__name__,
+                'environment': type(environment).__name__}
+    if environment.terrain is not None:
+        metadata['terrain'] = os.path.abspath(environment.terrain.path)
+    controller = getattr(drone, 'flight_controller', None)
+    if controller is not None:
+        metadata['controller_rate'] = controller.rate
+    return metadata
+
+
+def first_divergence(hashes, reference):
+    """
+    Index of the first differing hash between two runs, or None if they
+    agree over their common length.
+    """
+    count = min(len(hashes), len(reference))
+    hashes = np.asarray(hashes[:count], dtype=np.uint64)
+    reference = np.asarray(reference[:count], dtype=np.uint64)
+    mismatch = np.flatnonzero(hashes != reference)
+    return int(mismatch[0]) if len(mismatch) else None
+
+
+def replay_log(log, physics_factory=None, chunk_size=4096):
+    """
+    Re-fly a raw flight log's sticks and compare the state hash after every
+    tick. Returns None when the replay matches, otherwise the first tick
+    (as recorded in the log) whose hash differs.
+
+    physics_factory overrides the model named in the log, which is how a new
+    physics implementation is checked against a recording of the old one.
+    """
+    if log.encoding != 'raw':
+        raise ValueError("Only raw logs store the exact sticks needed for a replay")
+    if log.version != FORMAT_VERSION:
+        raise ValueError(f"Flight log version {log.version} has no state hashes to replay against")
+    metadata = log.header.get('metadata', {})
+    if 'seed' not in metadata:
+        raise ValueError("Flight log has no environment seed to replay from")
+    if len(log) == 0:
+        return None
+    ticks = log.records['tick']
+    if ticks[0] != 1 or int(ticks[-1]) != len(log):
+        raise ValueError("Flight log does not start at tick 1 or has gaps")
+
+    if physics_factory is None:
+        physics_factory = PHYSICS_MODELS[metadata.get('physics', 'DronePhysics')]
+        if 'controller_rate' in metadata:
+            physics_factory = functools.partial(physics_factory, controller_rate=metadata['controller_rate'])
+    if 'terrain' in metadata:
+        environment = Environment(metadata['seed'], terrain=Terrain(metadata['terrain']))
+    else:
+        environment = ENVIRONMENTS[metadata.get('environment', 'Environment')](metadata['seed'])
+    simulator = HeadlessSimulator(physics_factory=physics_factory, dt=log.dt,
+                                  environment=environment, hash_states=True)
+    for chunk in log.iter_chunks(chunk_size):
+        # Fly the chunk in runs of ticks with no reset and unchanged sensitivities
+        sensitivities = chunk['sensitivities']
+        changes = chunk['events'] != 0
+        changes[1:] |= np.any(sensitivities[1:] != sensitivities[:-1], axis=1)
+        bounds = sorted(set(np.flatnonzero(changes).tolist() + [0, len(chunk)]))
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            drone = simulator.drone_physics
+            if chunk['events'][start] & EVENT_RESET:
+                environment.reset_drone(drone)
+            drone.roll_sensitivity, drone.pitch_sensitivity, drone.yaw_sensitivity = sensitivities[start].tolist()
+            simulator.state_hashes = []
+            simulator.step(chunk['sticks'][start:stop], n_steps=stop - start)
+            index = first_divergence(simulator.state_hashes, chunk['state_hash'][start:stop])
+            if index is not None:
+                return int(chunk['tick'][start + index])
+    return None
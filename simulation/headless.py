@@ -0,0 +1,151 @@
+"""
+Headless, faster-than-real-time simulation runner.
+
+Drives the same physics and collision code as DroneSimulator.run, but with
+no pygame window or OpenGL context and no wall-clock throttling.
+
+Run from the repository root:
+    python -m simulation --seconds 60
+"""
+import time
+import numpy as np
+
+from physics.drone_physics import DronePhysics
+from physics.state_hash import state_hash
+from environment.environment import Environment
+
+
+class HeadlessSimulator:
+    def __init__(self, input_source=None, environment=None, physics_factory=DronePhysics, dt=None,
+                 recorder=None, seed=None, hash_states=False):
+        # Any object with an update() -> (throttle, roll, pitch, yaw) method
+        # works as an input source, e.g. ControllerInput or ScriptedInput
+        self.input_source = input_source
+        self.environment = environment if environment is not None else Environment(seed)
+        if environment is not None and seed is not None:
+            environment.reseed(seed)
+        self.physics_factory = physics_factory
+        # Optional physics time step override; gate collisions are swept, so
+        # coarse steps (20-50 ms) do not tunnel through gate bars
+        self.physics_dt = dt
+        # Optional FlightRecorder, fed one record per tick
+        self.recorder = recorder
+        # With hash_states, state_hashes gets the state hash after every tick
+        self.hash_states = hash_states
+        self.state_hashes = []
+        self.drone_physics = None
+
+        # Counters
+        self.tick = 0
+        self.sim_time = 0.0
+        self.wall_time = 0.0
+        self.collision_count = 0
+
+        self.reset()
+
+    @property
+    def dt(self):
+        return self.drone_physics.dt
+
+    @property
+    def realtime_factor(self):
+        """Simulated seconds per wall-clock second spent inside step()"""
+        if self.wall_time <= 0:
+            return 0.0
+        return self.sim_time / self.wall_time
+
+    def reset(self):
+        """
+        Start a new flight with a fresh drone, cleared counters and the
+        environment's random generator restarted from its seed, so every
+        flight from reset() is deterministic. Returns the initial state.
+        """
+        self.drone_physics = self.physics_factory()
+        self.environment.prepare_drone(self.drone_physics)
+        self.environment.reseed()
+        if self.physics_dt is not None:
+            self.drone_physics.dt = self.physics_dt
+        if self.input_source is not None and hasattr(self.input_source, 'reset'):
+            self.input_source.reset()
+        # Scripted sources advance their clock by one physics tick per poll
+        if self.input_source is not None and hasattr(self.input_source, 'dt'):
+            self.input_source.dt = self.drone_physics.dt
+        self.tick = 0
+        self.sim_time = 0.0
+        self.wall_time = 0.0
+        self.collision_count = 0
+        self.state_hashes = []
+        return self.get_state()
+
+    def step(self, actions=None, n_steps=1):
+        """
+        Advance the simulation by n_steps physics ticks.
+
+        actions can be:
+          - None: poll the input source once per tick
+          - a (throttle, roll, pitch, yaw) tuple held for all n_steps
+          - an (n_steps, 4) array with one stick sample per tick
+        Returns the state after the last tick.
+        """
+        drone = self.drone_physics
+        environment = self.environment
+
+        per_tick = None
+        if actions is not None:
+            actions = np.asarray(actions, dtype=float)
+            if actions.ndim == 2:
+                if len(actions) != n_steps:
+                    raise ValueError(f"Expected {n_steps} actions, got {len(actions)}")
+                per_tick = actions.tolist()
+            else:
+                held = tuple(actions.tolist())
+        elif self.input_source is None:
+            raise ValueError("step() needs actions when no input source is attached")
+
+        start = time.perf_counter()
+        for i in range(n_steps):
+            if per_tick is not None:
+                throttle, roll, pitch, yaw = per_tick[i]
+            elif actions is not None:
+                throttle, roll, pitch, yaw = held
+            else:
+                throttle, roll, pitch, yaw = self.input_source.update()
+
+            previous_position = drone.position.copy()
+            drone.apply_controller_input(throttle, roll, pitch, yaw)
+            drone.update()
+            if environment.check_collisions(drone, previous_position):
+                self.collision_count += 1
+            if self.hash_states or self.recorder is not None:
+                digest = state_hash(drone)
+                if self.hash_states:
+                    self.state_hashes.append(digest)
+                if self.recorder is not None:
+                    self.recorder.record(self.tick + i + 1, drone, (throttle, roll, pitch, yaw), digest)
+        self.wall_time += time.perf_counter() - start
+
+        self.tick += n_steps
+        self.sim_time = self.tick * drone.dt
+        return self.get_state()
+
+    def run(self, seconds, actions=None):
+        """
+        Fly for the given number of simulated seconds.
+        """
+        return self.step(actions, n_steps=int(round(seconds / self.dt)))
+
+    def get_state(self):
+        drone = self.drone_physics
+        return {
+            'tick': self.tick,
+            'time': self.sim_time,
+            'position': drone.position.copy(),
+            'velocity': drone.velocity.copy(),
+            'rotation': drone.rotation.copy(),
+            'angular_velocity': drone.angular_velocity.copy(),
+            'motor_forces': drone.motor_forces.copy(),
+            'battery_remaining': drone.battery_remaining,
+            'collisions': self.collision_count,
+            'state_hash': state_hash(drone),
+        }
+
@@ -0,0 +1,310 @@
+"""
+Fixed-rate physics on its own thread.
+
+PhysicsLoop advances the drone and checks collisions at a fixed tick rate,
+independent of the render loop, and publishes a state snapshot after every
+batch of ticks. The renderer asks for interpolated_state() at display time
+and gets a blend of the last two published snapshots, so motion stays smooth
+when the render rate and the physics rate differ.
+"""
+import math
+import threading
+import time
+import numpy as np
+
+
+class StateSnapshot:
+    """
+    The drone state the renderer and HUD need, copied out of the physics drone.
+    """
+    __slots__ = ('tick', 'sim_time', 'published_at', 'input_time', 'position', 'velocity',
+                 'rotation', 'angular_velocity', 'motor_forces', 'battery_remaining',
+                 'sensitivities', 'field_position', 'field_rotation', 'field_motor_forces')
+
+    def __init__(self):
+        self.tick = 0
+        self.sim_time = 0.0
+        self.published_at = 0.0
+        # Wall-clock time of the input sample used by the last tick
+        self.input_time = 0.0
+        self.position = np.zeros(3)
+        self.velocity = np.zeros(3)
+        self.rotation = np.zeros(3)
+        self.angular_velocity = np.zeros(3)
+        self.motor_forces = np.zeros(4)
+        self.battery_remaining = 0.0
+        self.sensitivities = (0.0, 0.0, 0.0)
+        # AI drones of a RaceField, (N, 3) and (N, 4) arrays; None without one
+        self.field_position = None
+        self.field_rotation = None
+        self.field_motor_forces = None
+
+    def capture(self, drone, tick, sim_time, input_time, field=None):
+        self.tick = tick
+        self.sim_time = sim_time
+        self.input_time = input_time
+        self.position[:] = drone.position
+        self.velocity[:] = drone.velocity
+        self.rotation[:] = drone.rotation
+        self.angular_velocity[:] = drone.angular_velocity
+        self.motor_forces[:] = drone.motor_forces
+        self.battery_remaining = drone.battery_remaining
+        self.sensitivities = (drone.roll_sensitivity, drone.pitch_sensitivity, drone.yaw_sensitivity)
+        if field is not None:
+            batch = field.batch
+            if self.field_position is None or len(self.field_position) != batch.count:
+                self.field_position = np.empty((batch.count, 3))
+                self.field_rotation = np.empty((batch.count, 3))
+                self.field_motor_forces = np.empty((batch.count, 4))
+            self.field_position[:] = batch.position
+            self.field_rotation[:] = batch.rotation
+            self.field_motor_forces[:] = batch.motor_forces
+
+    def apply_to(self, drone):
+        """Write the snapshot into a (render-side) drone and invalidate its derived state."""
+        drone.position = self.position.copy()
+        drone.velocity = self.velocity.copy()
+        drone.rotation = self.rotation.copy()
+        drone.angular_velocity = self.angular_velocity.copy()
+        drone.motor_forces = self.motor_forces.copy()
+        drone.battery_remaining = self.battery_remaining
+        drone.roll_sensitivity, drone.pitch_sensitivity, drone.yaw_sensitivity = self.sensitivities
+        drone.invalidate_derived()
+
+    @classmethod
+    def interpolate(cls, previous, current, alpha):
+        """
+        Blend two snapshots; alpha = 0 gives previous and 1 gives current.
+        Yaw is blended along the shorter arc since it wraps at 2*pi.
+        """
+        result = cls()
+        result.tick = current.tick
+        result.sim_time = previous.sim_time + (current.sim_time - previous.sim_time) * alpha
+        result.published_at = current.published_at
+        result.input_time = previous.input_time + (current.input_time - previous.input_time) * alpha
+        result.position = previous.position + (current.position - previous.position) * alpha
+        result.velocity = previous.velocity + (current.velocity - previous.velocity) * alpha
+        delta = current.rotation - previous.rotation
+        delta[2] = (delta[2] + math.pi) % (2 * math.pi) - math.pi
+        result.rotation = previous.rotation + delta * alpha
+        result.rotation[2] %= 2 * math.pi
+        result.angular_velocity = (previous.angular_velocity +
+                                   (current.angular_velocity - previous.angular_velocity) * alpha)
+        result.motor_forces = current.motor_forces.copy()
+        result.battery_remaining = current.battery_remaining
+        result.sensitivities = current.sensitivities
+        if current.field_position is not None and previous.field_position is not None:
+            result.field_position = previous.field_position + (current.field_position - previous.field_position) * alpha
+            delta = current.field_rotation - previous.field_rotation
+            delta[:, 2] = (delta[:, 2] + math.pi) % (2 * math.pi) - math.pi
+            result.field_rotation = previous.field_rotation + delta * alpha
+            result.field_rotation[:, 2] %= 2 * math.pi
+            result.field_motor_forces = current.field_motor_forces.copy()
+        return result
+
+
+class PhysicsLoop:
+    """
+    Runs physics and collision checks at a fixed rate on a background thread.
+
+    input_fn(tick_time) is called once per tick with the wall-clock time
+    (time.perf_counter) the tick stands for, and returns
+    ((throttle, roll, pitch, yaw), sample_time): the sticks to apply and when
+    they were sampled. Ticks run in bursts, so tick_time is usually slightly
+    in the past; an InputSampler returns the sample nearest to it.
+    When the thread falls behind by more than max_substeps ticks (a stall, a
+    debugger break, a slow machine), the extra time is dropped instead of
+    being caught up, and added to dropped_time.
+
+    An optional RaceField of AI drones is stepped on the same tick and
+    published in the same snapshots. An optional RaceTimer times the
+    drone's laps; its crossing tests count as collision time. An optional
+    TelemetryServer is offered every published snapshot.
+
+    Snapshots are double-buffered: the published (previous, current) pair is
+    swapped under a lock while the next snapshot is filled in a third, back
+    buffer, so the physics thread never waits on the renderer.
+    """
+
+    def __init__(self, drone_physics, environment, input_fn, rate=None, max_substeps=10, recorder=None,
+                 field=None, timer=None, telemetry=None):
+        self.drone_physics = drone_physics
+        self.environment = environment
+        self.input_fn = input_fn
+        self.field = field
+        self.timer = timer
+        self.telemetry = telemetry
+        # Optional FlightRecorder, fed one record per tick
+        self.recorder = recorder
+        if rate is not None:
+            if not 100 <= rate <= 1000:
+                raise ValueError(f"Physics rate must be between 100 and 1000 Hz, got {rate}")
+            drone_physics.dt = 1.0 / rate
+            if field is not None:
+                field.batch.dt = drone_physics.dt
+        self.max_substeps = max_substeps
+        self.paused = False
+
+        # Counters (written by the physics thread only)
+        self.tick = 0
+        self.input_time = 0.0
+        # Sticks applied on the last tick
+        self.sticks = (0.0, 0.0, 0.0, 0.0)
+        # Events of submitted commands, logged with the next tick
+        self.events = 0
+        self.collision_count = 0
+        self.dropped_time = 0.0
+        self.dropped_ticks = 0
+        # Cumulative seconds spent in dynamics and in collision checks
+        self.physics_time = 0.0
+        self.collision_time = 0.0
+        self.field_time = 0.0
+
+        # Published snapshot pair plus the back buffer being filled
+        self.previous = StateSnapshot()
+        self.current = StateSnapshot()
+        self.back = StateSnapshot()
+        self._lock = threading.Lock()
+        self._commands = []
+        self._running = False
+        self._thread = None
+        self.publish()
+        self.publish()
+
+    @property
+    def dt(self):
+        return self.drone_physics.dt
+
+    @property
+    def rate(self):
+        return 1.0 / self.drone_physics.dt
+
+    @property
+    def sim_time(self):
+        return self.tick * self.drone_physics.dt
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self.run, name="physics", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, command, events=0):
+        """
+        Queue a callable to run on the physics thread before the next tick,
+        e.g. a reset or a sensitivity change made from the UI thread. events
+        are the EVENT_ bits (recording.format) the recording of the next tick
+        gets, so that a replay can repeat the command.
+        """
+        with self._lock:
+            self._commands.append((command, events))
+
+    def run(self):
+        dt = self.drone_physics.dt
+        accumulator = 0.0
+        last = time.perf_counter()
+        while self._running:
+            now = time.perf_counter()
+            elapsed = now - last
+            last = now
+
+            with self._lock:
+                commands, self._commands = self._commands, []
+            for command, events in commands:
+                command()
+                self.events |= events
+            if commands:
+                self.publish()
+
+            if self.paused:
+                accumulator = 0.0
+            else:
+                accumulator += elapsed
+                steps = int(accumulator / dt)
+                if steps > self.max_substeps:
+                    # Too far behind: run the cap and drop the rest
+                    dropped = steps - self.max_substeps
+                    self.dropped_ticks += dropped
+                    self.dropped_time += dropped * dt
+                    accumulator -= dropped * dt
+                    steps = self.max_substeps
+                # Wall-clock time the simulation has reached; tick i covers up to base + (i + 1) * dt
+                base = now - accumulator
+                for i in range(steps):
+                    self.step(base + (i + 1) * dt)
+                accumulator -= steps * dt
+                if steps:
+                    self.publish()
+
+            # Sleep until the next tick is due
+            remaining = dt - accumulator - (time.perf_counter() - last)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def step(self, tick_time=None):
+        """
+        One physics tick: input, dynamics, collisions.
+        """
+        if tick_time is None:
+            tick_time = time.perf_counter()
+        drone = self.drone_physics
+        self.sticks, self.input_time = self.input_fn(tick_time)
+        throttle, roll, pitch, yaw = self.sticks
+        start = time.perf_counter()
+        previous_position = drone.position.copy()
+        drone.apply_controller_input(throttle, roll, pitch, yaw)
+        drone.update()
+        middle = time.perf_counter()
+        if self.environment.check_collisions(drone, previous_position):
+            self.collision_count += 1
+        if self.timer is not None:
+            self.timer.update(previous_position, drone.position, (self.tick + 1) * drone.dt, drone.dt)
+        end = time.perf_counter()
+        self.physics_time += middle - start
+        self.collision_time += end - middle
+        if self.field is not None:
+            self.field.step()
+            self.field_time += time.perf_counter() - end
+        self.tick += 1
+        if self.recorder is not None:
+            self.recorder.record(self.tick, drone, (throttle, roll, pitch, yaw), events=self.events)
+        self.events = 0
+
+    def publish(self):
+        snapshot = self.back
+        snapshot.capture(self.drone_physics, self.tick, self.sim_time, self.input_time, self.field)
+        snapshot.published_at = time.perf_counter()
+        with self._lock:
+            self.back = self.previous
+            self.previous = self.current
+            self.current = snapshot
+        if self.telemetry is not None:
+            self.telemetry.publish(snapshot, self.sticks)
+
+    def latest_state(self):
+        """A copy of the last published snapshot: the exact state at a whole tick."""
+        with self._lock:
+            return StateSnapshot.interpolate(self.current, self.current, 1.0)
+
+    def interpolated_state(self, now=None):
+        """
+        State to display at wall-clock time now: the previous snapshot blended
+        toward the current one by how much of the interval between them has
+        elapsed since the current one was published. Rendering therefore runs
+        one publish interval (normally one tick) behind physics.
+        """
+        if now is None:
+            now = time.perf_counter()
+        with self._lock:
+            previous, current = self.previous, self.current
+            span = max(current.sim_time - previous.sim_time, self.drone_physics.dt)
+            alpha = (now - current.published_at) / span
+            alpha = min(max(alpha, 0.0), 1.0)
+            return StateSnapshot.interpolate(previous, current, alpha)
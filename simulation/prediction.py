@@ -0,0 +1,222 @@
+"""
+Predicted flight path under the current stick inputs.
+
+TrajectoryPredictor rolls a copy of the drone state forward with the sticks
+held, for the FPV view's lookahead line. The rollout is the DronePhysics
+model written out on Python floats (as in FastDronePhysics): with the sticks
+held the motor forces, and with them the total thrust and body torques,
+are constant, so a tick costs a few float operations and no allocations.
+
+The path is kept between frames. While the sticks stay the same the drone
+flies along the predicted path, so a new state a few ticks later only drops
+the points already flown and extends the end; the path is recomputed from
+scratch only when the sticks change or the drone leaves the prediction (a
+collision, a reset). Stepping and impact tests stop when the frame's time
+budget runs out, and the next frame carries on where they stopped.
+"""
+import math
+import time
+import numpy as np
+
+from environment.collision import ground_time_of_impact
+
+
+class TrajectoryPredictor:
+    """
+    Lookahead of horizon seconds for a drone in an environment.
+
+    update(state) takes the latest physics state (a StateSnapshot or
+    anything with tick, position, velocity, rotation, angular_velocity and
+    motor_forces) and returns the path: an (n, 3) float32 array of predicted
+    positions, one per physics tick, starting at the state's position.
+    The path stops early at a predicted impact; impact is then 'gate' or
+    'ground' and impact_point and impact_time (seconds ahead) say where and
+    when.
+
+    Prediction holds the motor forces of the state. With the direct mixing
+    of DronePhysics that is exactly holding the sticks; under a rate
+    controller it is an approximation.
+    """
+
+    # Ticks stepped between time-budget checks and impact tests
+    block_size = 25
+
+    def __init__(self, drone, environment, horizon=2.0, budget=0.002, tolerance=1e-6):
+        self.drone = drone
+        self.environment = environment
+        self.horizon = horizon
+        # Wall-clock seconds update() may spend per call
+        self.budget = budget
+        # Distance within which the drone counts as still on the predicted path
+        self.tolerance = tolerance
+
+        self.tick = None
+        self.forces = None
+        # Predicted positions as (x, y, z) tuples; points[0] is at self.tick
+        self.points = []
+        # Full state at the last point: position, velocity, rotation, angular velocity
+        self.tail = None
+        # Points up to checked_count have been tested for impacts
+        self.checked_count = 0
+        self.impact = None
+        self.impact_point = None
+        self.impact_time = None
+
+        # Statistics of the last update
+        self.reused_ticks = 0
+        self.stepped_ticks = 0
+        self.update_time = 0.0
+
+    @property
+    def horizon_ticks(self):
+        return int(round(self.horizon / self.drone.dt))
+
+    @property
+    def complete(self):
+        """Whether the path reaches the horizon or a predicted impact."""
+        return self.impact is not None or len(self.points) > self.horizon_ticks
+
+    def update(self, state):
+        start = time.perf_counter()
+        forces = tuple(float(f) for f in state.motor_forces)
+        shift = state.tick - self.tick if self.tick is not None else -1
+        self.reused_ticks = 0
+        self.stepped_ticks = 0
+
+        if forces == self.forces and 0 <= shift < len(self.points) and self.on_path(state, shift):
+            # Same sticks, state on the predicted path: drop the flown points
+            if shift:
+                del self.points[:shift]
+                self.checked_count = max(self.checked_count - shift, 1)
+                if self.impact is not None:
+                    self.impact_time -= shift * self.drone.dt
+            self.reused_ticks = len(self.points) - 1
+        else:
+            self.restart(state, forces)
+        self.tick = state.tick
+
+        deadline = start + self.budget
+        target = self.horizon_ticks + 1
+        while self.impact is None and time.perf_counter() < deadline:
+            if len(self.points) < target:
+                self.stepped_ticks += self.step(min(self.block_size, target - len(self.points)))
+            if self.checked_count < len(self.points):
+                self.check_impacts()
+            elif len(self.points) >= target:
+                break
+
+        self.update_time = time.perf_counter() - start
+        return np.array(self.points, dtype=np.float32)
+
+    def on_path(self, state, index):
+        x, y, z = self.points[index]
+        px, py, pz = state.position
+        return abs(px - x) <= self.tolerance and abs(py - y) <= self.tolerance and abs(pz - z) <= self.tolerance
+
+    def restart(self, state, forces):
+        self.forces = forces
+        position = tuple(float(v) for v in state.position)
+        self.points = [position]
+        self.tail = (position, tuple(float(v) for v in state.velocity),
+                     tuple(float(v) for v in state.rotation), tuple(float(v) for v in state.angular_velocity))
+        self.checked_count = 1
+        self.impact = None
+        self.impact_point = None
+        self.impact_time = None
+
+    def step(self, ticks):
+        """
+        Extend the path by ticks physics ticks from the tail state, in the
+        operation order of FastDronePhysics.update. Returns the ticks stepped.
+        """
+        drone = self.drone
+        dt = drone.dt
+        f0, f1, f2, f3 = self.forces
+        total_force = ((f0 + f1) + f2) + f3
+        (rx0, ry0, _), (rx1, ry1, _), (rx2, ry2, _), (rx3, ry3, _) = drone.motor_positions.tolist()
+        ix, iy, iz = drone.moment_of_inertia.tolist()
+        # Held forces: constant angular acceleration from the motors
+        torque_x = ((ry0 * f0 + ry1 * f1) + ry2 * f2) + ry3 * f3
+        torque_y = ((-(rx0 * f0) - rx1 * f1) - rx2 * f2) - rx3 * f3
+        torque_z = ((f0 * 0.3 - f1 * 0.3) + f2 * 0.3) - f3 * 0.3
+        motor_x, motor_y, motor_z = torque_x / ix, torque_y / iy, torque_z / iz
+        mass = drone.mass
+        weight = -mass * drone.g
+        drag = -drone.drag_coefficient
+        damping = -drone.angular_damping
+        limit = math.pi / 2 - 0.1
+        two_pi = 2 * math.pi
+
+        (px, py, pz), (vx, vy, vz), (roll, pitch, yaw), (wx, wy, wz) = self.tail
+        points = self.points
+        for _ in range(ticks):
+            sr, cr = math.sin(roll), math.cos(roll)
+            sp, cp = math.sin(pitch), math.cos(pitch)
+            sy, cy = math.sin(yaw), math.cos(yaw)
+            ax = ((sy * sr + cy * sp * cr) * total_force + drag * vx * abs(vx)) / mass
+            ay = ((sy * sp * cr - cy * sr) * total_force + drag * vy * abs(vy)) / mass
+            az = (((cp * cr) * total_force + weight) + drag * vz * abs(vz)) / mass
+            vx += ax * dt
+            vy += ay * dt
+            vz += az * dt
+            px += vx * dt
+            py += vy * dt
+            pz += vz * dt
+
+            wx += (motor_x + damping * wx * abs(wx)) * dt
+            wy += (motor_y + damping * wy * abs(wy)) * dt
+            wz += (motor_z + damping * wz * abs(wz)) * dt
+            cp_safe = max(abs(cp), 0.001) * math.copysign(1, cp)
+            tp = math.tan(pitch)
+            roll_rate = (wx + sr * tp * wy) + cr * tp * wz
+            pitch_rate = cr * wy + -sr * wz
+            yaw_rate = sr / cp_safe * wy + cr / cp_safe * wz
+            roll = min(max(roll + roll_rate * dt, -limit), limit)
+            pitch = min(max(pitch + pitch_rate * dt, -limit), limit)
+            yaw = (yaw + yaw_rate * dt) % two_pi
+            points.append((px, py, pz))
+
+        self.tail = ((px, py, pz), (vx, vy, vz), (roll, pitch, yaw), (wx, wy, wz))
+        return ticks
+
+    def check_impacts(self):
+        """
+        Test the path segments not yet checked against the ground and the
+        gates, and cut the path at the earliest impact.
+        """
+        first = self.checked_count - 1
+        segment_points = np.array(self.points[first:])
+        starts, ends = segment_points[:-1], segment_points[1:]
+        self.checked_count = len(self.points)
+
+        ground = self.environment.ground_levels(ends[:, 0], ends[:, 1]) + 0.1
+        below = np.flatnonzero(ends[:, 2] < ground)
+        impact_segment = int(below[0]) if len(below) else len(starts)
+        impact, toi = None, 1.0
+        if len(below):
+            impact, toi = 'ground', ground_time_of_impact(starts[impact_segment], ends[impact_segment],
+                                                          ground[impact_segment])
+
+        # Gates, on the segments before the ground impact only
+        radius = self.drone.size
+        low = segment_points.min(axis=0) - radius
+        high = segment_points.max(axis=0) + radius
+        for index in self.environment.collision_indices():
+            if (low > index.course_high).any() or (high < index.course_low).any():
+                continue
+            for segment in np.flatnonzero(index.sweeps_near(starts, ends, radius)).tolist():
+                if segment > impact_segment:
+                    break
+                gate_index, gate_toi = index.sweep(starts[segment], ends[segment], radius)
+                if gate_index >= 0 and (segment < impact_segment or gate_toi < toi):
+                    impact, impact_segment, toi = 'gate', segment, gate_toi
+                    break
+
+        if impact is not None:
+            start = starts[impact_segment]
+            contact = start + (ends[impact_segment] - start) * toi
+            self.impact = impact
+            self.impact_point = contact
+            self.impact_time = (first + impact_segment + toi) * self.drone.dt
+            del self.points[first + impact_segment + 1:]
+            self.points.append(tuple(contact.tolist()))
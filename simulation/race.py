@@ -0,0 +1,210 @@
+"""
+Race mode: a field of AI-piloted drones flying the course.
+
+All drones live in one DronePhysicsBatch and are flown by AIPilots, a
+vectorized controller that turns waypoints into stick inputs for every
+drone at once, so a tick costs a handful of numpy calls whether the field
+has ten drones or three hundred.
+"""
+import math
+import numpy as np
+
+from physics.drone_physics import DronePhysics
+from physics.drone_physics_batch import DronePhysicsBatch
+from simulation.race_timing import RaceTimer
+
+
+class AIPilots:
+    """
+    Waypoint-following pilots for every drone in a DronePhysicsBatch.
+
+    Each gate is flown through its opening as the collision model sees it:
+    the frame lies in the gate's horizontal plane, so a pilot lines up above
+    the gate, drops through the middle and climbs on to the next one. Stick
+    inputs come from a cascade of velocity tracking, tilt targets and PD
+    attitude control, inverted through the same motor mixing as
+    DronePhysics.apply_controller_input.
+    """
+
+    def __init__(self, batch, gate_positions, speeds, clearance=1.5, max_tilt=0.9):
+        self.batch = batch
+        self.gate_positions = np.asarray(gate_positions, dtype=float).reshape(-1, 3)
+        self.speeds = np.asarray(speeds, dtype=float)
+        self.clearance = clearance
+        self.max_tilt = max_tilt
+        # Horizontal distance from a gate's center that clears its frame
+        self.gate_radius = 2.5
+
+        # Per drone: index of the next gate, and whether it is above (0) or
+        # dropping through (1) that gate
+        self.gate_index = np.zeros(batch.count, dtype=np.intp)
+        self.phase = np.zeros(batch.count, dtype=np.intp)
+        self.gates_passed = np.zeros(batch.count, dtype=np.int64)
+
+        # Gains
+        self.velocity_gain = 2.0
+        self.attitude_gain = 60.0
+        self.attitude_damping = 12.0
+        self.yaw_gain = 4.0
+        self.yaw_damping = 2.0
+        self.climb_gain = 1.5
+        self.max_climb_rate = 4.0
+
+    def waypoints(self):
+        """(N, 3) current target point of every drone."""
+        targets = self.gate_positions[self.gate_index].copy()
+        targets[:, 2] += np.where(self.phase == 0, self.clearance, -self.clearance)
+        return targets
+
+    def advance(self):
+        """Move drones on to their next waypoint once they reach the current one."""
+        batch = self.batch
+        gates = self.gate_positions[self.gate_index]
+        offset = batch.position - gates
+        horizontal = np.hypot(offset[:, 0], offset[:, 1])
+
+        # Lined up above the gate: start dropping through it
+        lined_up = (self.phase == 0) & (horizontal < 0.6) & (offset[:, 2] > 0.0)
+        # Below the gate's plane: it has been passed
+        through = (self.phase == 1) & (offset[:, 2] < -0.75 * self.clearance)
+        self.phase[lined_up] = 1
+        self.phase[through] = 0
+        self.gate_index[through] = (self.gate_index[through] + 1) % len(self.gate_positions)
+        self.gates_passed += through
+
+    def control(self):
+        """
+        Stick inputs for every drone: (throttle, roll, pitch, yaw), each an (N,) array.
+        """
+        batch = self.batch
+        g = batch.g
+        position = batch.position
+        velocity = batch.velocity
+        phi = batch.rotation[:, 0]
+        theta = batch.rotation[:, 1]
+        psi = batch.rotation[:, 2]
+
+        self.advance()
+        offset = self.waypoints() - position
+
+        # Horizontal velocity toward the waypoint, slowing on the approach
+        distance = np.hypot(offset[:, 0], offset[:, 1])
+        speed = np.minimum(self.speeds, 1.5 * distance)
+        scale = speed / np.maximum(distance, 1e-6)
+        accel_x = self.velocity_gain * (offset[:, 0] * scale - velocity[:, 0])
+        accel_y = self.velocity_gain * (offset[:, 1] * scale - velocity[:, 1])
+
+        # Tilt targets: lift along the body z axis gives, near level, an
+        # acceleration of g * theta along the body x axis (cos psi, sin psi)
+        # and -g * phi along the body y axis (-sin psi, cos psi)
+        cos_psi, sin_psi = np.cos(psi), np.sin(psi)
+        accel_right = accel_x * cos_psi + accel_y * sin_psi
+        accel_forward = -accel_x * sin_psi + accel_y * cos_psi
+        theta_target = np.clip(np.arctan(accel_right / g), -self.max_tilt, self.max_tilt)
+        phi_target = np.clip(-np.arctan(accel_forward / g), -self.max_tilt, self.max_tilt)
+
+        # Face the waypoint (the body y axis is forward), unless on top of it
+        heading = np.arctan2(offset[:, 1], offset[:, 0]) - math.pi / 2
+        yaw_error = (heading - psi + math.pi) % (2 * math.pi) - math.pi
+        yaw_error[distance < 1.0] = 0.0
+
+        # Collective thrust: hold the climb rate toward the waypoint's height,
+        # but stay low until clear of the gate just flown through
+        climb_rate = np.clip(self.climb_gain * offset[:, 2], -self.max_climb_rate, self.max_climb_rate)
+        behind = position - self.gate_positions[self.gate_index - 1]
+        under = (np.hypot(behind[:, 0], behind[:, 1]) < self.gate_radius) & (behind[:, 2] < 0.5)
+        climb_rate[under] = np.minimum(climb_rate[under], 0.0)
+        accel_z = 2.0 * (climb_rate - velocity[:, 2])
+        tilt = np.maximum(np.cos(phi) * np.cos(theta), 0.5)
+        thrust = batch.mass * (g + accel_z) / tilt
+        thrust_base = np.clip(thrust / 4.0, 0.05 * batch.max_motor_thrust, 0.9 * batch.max_motor_thrust)
+        throttle = 2.0 * thrust_base / batch.max_motor_thrust - 1.0
+
+        # PD attitude control, inverted through the motor mixing: a pitch
+        # stick p gives a torque of -4 * size * p * sensitivity * thrust_base
+        # about body x, a roll stick about body y, and the yaw stick gives
+        # -4 * yaw_torque_constant * stick * sensitivity * thrust_base about z
+        rates = batch.angular_velocity
+        inertia = batch.moment_of_inertia
+        sensitivities = batch.sensitivities
+        arm = 4.0 * batch.size * thrust_base
+        alpha_x = self.attitude_gain * (phi_target - phi) - self.attitude_damping * rates[:, 0]
+        alpha_y = self.attitude_gain * (theta_target - theta) - self.attitude_damping * rates[:, 1]
+        alpha_z = self.yaw_gain * yaw_error - self.yaw_damping * rates[:, 2]
+        pitch = np.clip(-alpha_x * inertia[:, 0] / (arm * sensitivities[:, 1]), -1.0, 1.0)
+        roll = np.clip(-alpha_y * inertia[:, 1] / (arm * sensitivities[:, 0]), -1.0, 1.0)
+        yaw_arm = 4.0 * batch.yaw_torque_constant * thrust_base * sensitivities[:, 2]
+        yaw = np.clip(-alpha_z * inertia[:, 2] / yaw_arm, -1.0, 1.0)
+        return throttle, roll, pitch, yaw
+
+
+class RaceField:
+    """
+    A field of AI drones on an Environment's course, stepped as one batch.
+
+    step() is called once per physics tick (by the PhysicsLoop in race mode)
+    and runs the pilots, the batched dynamics, the batched gate collisions
+    and lap timing. Drones do not collide with each other.
+
+    The field draws its collision spin from its own generator, so the
+    player's flight (and its recording) does not depend on the field.
+    """
+
+    def __init__(self, environment, count, seed=0, template=None, backend=None):
+        if not environment.gates:
+            raise ValueError("Race mode needs a course with gates")
+        self.environment = environment
+        if template is None:
+            template = DronePhysics()
+        self.template = template
+        self.batch = DronePhysicsBatch(count, template, backend=backend)
+        self.batch.terrain = environment.terrain
+        self.seed = seed
+        self.rng = None
+        rng = np.random.default_rng(seed)
+        # Mixed skill: every pilot has its own cruise speed
+        self.pilots = AIPilots(self.batch, [gate.position for gate in environment.gates],
+                               speeds=rng.uniform(2.5, 4.0, count))
+        self.timer = RaceTimer(environment.gates, count)
+        self.collision_count = 0
+        self.time = 0.0
+        self.reset()
+
+    @property
+    def count(self):
+        return self.batch.count
+
+    def start_positions(self):
+        """Starting grid: rows of drones behind the origin, 1.5 m apart."""
+        columns = math.ceil(math.sqrt(self.count))
+        index = np.arange(self.count)
+        positions = np.empty((self.count, 3))
+        positions[:, 0] = (index % columns - (columns - 1) / 2) * 1.5
+        positions[:, 1] = -5.0 - (index // columns) * 1.5
+        positions[:, 2] = 1.0 + self.environment.ground_levels(positions[:, 0], positions[:, 1])
+        return positions
+
+    def reset(self):
+        batch = self.batch
+        batch.position[:] = self.start_positions()
+        batch.velocity[:] = 0.0
+        batch.rotation[:] = 0.0
+        batch.angular_velocity[:] = 0.0
+        batch.motor_forces[:] = 0.0
+        batch.battery_remaining[:] = batch.battery_capacity
+        self.pilots.gate_index[:] = 0
+        self.pilots.phase[:] = 0
+        self.pilots.gates_passed[:] = 0
+        self.timer.reset()
+        self.time = 0.0
+        self.rng = np.random.default_rng([self.seed, 1])
+
+    def step(self):
+        batch = self.batch
+        previous_positions = batch.position.copy()
+        batch.apply_controller_input(*self.pilots.control())
+        batch.update()
+        collided = self.environment.check_collisions_batch(batch, previous_positions, self.rng)
+        self.collision_count += int(collided.sum())
+        self.time += batch.dt
+        self.timer.update(previous_positions, batch.position, self.time, batch.dt)
@@ -0,0 +1,163 @@
+"""
+Race timing: gate crossings, laps and splits.
+
+RaceTimer follows one or more drones round an ordered course. Every tick it
+tests each drone's step (previous to current position) against the plane of
+the next gate it has to fly through and a few gates after it, so the cost
+per tick depends on the number of drones and the lookahead, not on the
+length of the course.
+"""
+import math
+import numpy as np
+
+
+class RaceTimer:
+    """
+    Lap and split timing for count drones on an ordered list of gates.
+
+    Gate 0 is the start/finish gate: a drone's clock starts when it first
+    flies through it, and every later pass through it completes a lap. The
+    other gates have to be flown in order; each gives a split, the time since
+    the start of the lap.
+
+    A gate is passed when a step crosses its plane inside the opening. The
+    plane and opening are those of the gate as drawn and as collided with:
+    the frame lies in the gate's local XY plane (rotated about Z by the
+    gate's rotation), so the plane is local z = 0 and the opening is the
+    square inside the bars.
+    Crossings in either direction count. The crossing time is interpolated
+    within the tick from the distances of the two positions to the plane.
+
+    Besides the next gate, lookahead more gates are tested. Passing one of
+    those first skips the gates in between: each is recorded as missed and
+    adds miss_penalty seconds to the lap time.
+    """
+
+    def __init__(self, gates, count=1, lookahead=2, miss_penalty=2.0):
+        if not gates:
+            raise ValueError("Race timing needs a course with gates")
+        self.count = count
+        self.miss_penalty = miss_penalty
+
+        # Packed gate frames, as in GateCollisionIndex
+        self.gate_count = len(gates)
+        self.lookahead = min(lookahead, self.gate_count - 1)
+        self.centers = np.array([gate.position for gate in gates], dtype=float).reshape(-1, 3)
+        self.cos = np.array([math.cos(math.radians(-gate.rotation)) for gate in gates])
+        self.sin = np.array([math.sin(math.radians(-gate.rotation)) for gate in gates])
+        # Half-width of the opening inside the bars
+        self.opening = np.array([gate.half_size - gate.thickness for gate in gates])
+        self._slots = np.arange(self.lookahead + 1)
+        self._no_drones = np.zeros(0, dtype=np.intp)
+
+        self.reset()
+
+    def reset(self):
+        count = self.count
+        # Per drone: the gate it has to pass next, whether its clock is
+        # running, and the current lap's start time and penalty seconds
+        self.next_gate = np.zeros(count, dtype=np.intp)
+        self.started = np.zeros(count, dtype=bool)
+        self.lap_start = np.zeros(count)
+        self.penalty = np.zeros(count)
+        # Latest split (or lap time, when gate 0 was passed) and best lap; NaN until set
+        self.last_split = np.full(count, math.nan)
+        self.best_lap = np.full(count, math.nan)
+        # Per drone: completed lap times (penalties included), the splits of
+        # the current and of the last completed lap, and (lap, gate) misses
+        self.laps = [[] for _ in range(count)]
+        self.splits = [[] for _ in range(count)]
+        self.last_lap_splits = [[] for _ in range(count)]
+        self.missed = [[] for _ in range(count)]
+
+    @property
+    def lap_count(self):
+        """(count,) completed laps."""
+        return np.array([len(laps) for laps in self.laps])
+
+    def plane_crossing(self, gate, start, end):
+        """
+        For (N,) gate indices and (N, 3) steps: whether each step crosses the
+        gate plane inside the opening, and the fraction of the step where it does.
+        """
+        cos, sin = self.cos[gate], self.sin[gate]
+        centers = self.centers[gate]
+        start_z = start[:, 2] - centers[:, 2]
+        end_z = end[:, 2] - centers[:, 2]
+        crosses = (start_z > 0.0) != (end_z > 0.0)
+        fraction = start_z / np.where(crosses, start_z - end_z, 1.0)
+        point = start + (end - start) * fraction[:, None] - centers
+        local_x = point[:, 0] * cos - point[:, 1] * sin
+        local_y = point[:, 0] * sin + point[:, 1] * cos
+        opening = self.opening[gate]
+        inside = (np.abs(local_x) <= opening) & (np.abs(local_y) <= opening)
+        return crosses & inside, fraction
+
+    def update(self, previous_positions, positions, time, dt):
+        """
+        Test one tick of every drone, from previous_positions to positions,
+        where time is the simulated time at the end of the tick and dt its
+        length. Positions are (count, 3) arrays, or (3,) for a single drone.
+        Returns the indices of the drones that passed a gate.
+        """
+        start = np.asarray(previous_positions, dtype=float).reshape(-1, 3)
+        end = np.asarray(positions, dtype=float).reshape(-1, 3)
+
+        # (count, lookahead + 1) window of gates per drone. Most ticks cross
+        # no gate's height at all, which a comparison of z values rules out.
+        # Drones that have not started only look for the start gate.
+        window = (self.next_gate[:, None] + self._slots) % self.gate_count
+        heights = self.centers[window, 2]
+        candidates = (start[:, 2:3] > heights) != (end[:, 2:3] > heights)
+        candidates[:, 1:] &= self.started[:, None]
+        if not candidates.any():
+            return self._no_drones
+
+        # Full test on the candidates; np.nonzero lists them by drone, then
+        # slot, so the first hit per drone is the earliest gate in its window
+        drones, slots = np.nonzero(candidates)
+        crossed, fraction = self.plane_crossing(window[drones, slots], start[drones], end[drones])
+        passed, first = np.unique(drones[crossed], return_index=True)
+        for drone, slot, step_fraction in zip(passed.tolist(), slots[crossed][first].tolist(),
+                                              fraction[crossed][first].tolist()):
+            self.pass_gate(drone, slot, time - dt + step_fraction * dt)
+        return passed
+
+    def pass_gate(self, drone, slot, crossing_time):
+        """Record drone passing the gate slot places after its next one at crossing_time."""
+        gate = (int(self.next_gate[drone]) + slot) % self.gate_count
+        self.next_gate[drone] = (gate + 1) % self.gate_count
+        if not self.started[drone]:
+            self.started[drone] = True
+            self.lap_start[drone] = crossing_time
+            return
+
+        lap = len(self.laps[drone])
+        for skipped in range(slot):
+            self.missed[drone].append((lap, (gate - slot + skipped) % self.gate_count))
+        self.penalty[drone] += slot * self.miss_penalty
+
+        elapsed = crossing_time - self.lap_start[drone]
+        if gate == 0:
+            lap_time = float(elapsed + self.penalty[drone])
+            self.laps[drone].append(lap_time)
+            self.last_lap_splits[drone] = self.splits[drone]
+            self.splits[drone] = []
+            self.lap_start[drone] = crossing_time
+            self.penalty[drone] = 0.0
+            self.last_split[drone] = lap_time
+            if not lap_time >= self.best_lap[drone]:
+                self.best_lap[drone] = lap_time
+        else:
+            self.splits[drone].append(float(elapsed))
+            self.last_split[drone] = elapsed
+
+    def standings(self):
+        """
+        Drone indices ordered by race position: most gates passed first,
+        ties broken by who passed their last gate earliest.
+        """
+        progress = self.lap_count * self.gate_count + (self.next_gate - 1) % self.gate_count
+        progress = np.where(self.started, progress, -1)
+        last_time = np.array([splits[-1] if splits else 0.0 for splits in self.splits]) + self.lap_start
+        return np.lexsort((last_time, -progress))
@@ -0,0 +1,327 @@
+"""
+Parameter sweeps over drone and control settings.
+
+Every configuration flies the same scripted stick profile headless, and the
+metrics of all runs are collected into one columnar NPZ file: one array per
+parameter and per metric, indexed by configuration. Configurations come from
+a full grid or from uniform random sampling, and run in batches across a
+ProcessPoolExecutor.
+
+Only a bounded number of batches is in flight at once, and every finished
+batch is written to its own file in OUT.partial/ straight away. An
+interrupted sweep resumes from those files when it is started again with
+the same spec, and the final NPZ is assembled once all batches are done.
+
+Run from the repository root:
+    python -m simulation.sweep --grid mass=0.4,0.5,0.6 --grid drag_coefficient=0.3,0.5 --out sweep.npz
+    python -m simulation.sweep --sample mass=0.3:0.8 --sample max_motor_thrust=2:4 --samples 500 --out sweep.npz
+    python -m simulation.sweep --spec sweep.json --out sweep.npz
+
+A spec file holds the same settings as JSON:
+    {"grid": {"mass": [0.4, 0.5]}, "seconds": 10,
+     "profile": [[0, 0.0, 0, 0, 0], [2, -0.35, 0, 0, 0]]}
+    {"sample": {"count": 500, "seed": 0, "ranges": {"mass": [0.3, 0.8]}}}
+"""
+import argparse
+import concurrent.futures
+import json
+import math
+import os
+import shutil
+import time
+import numpy as np
+
+from input.scripted import ScriptedInput, DEMO_KEYFRAMES
+from physics.drone_physics import DronePhysics
+from simulation.headless import HeadlessSimulator
+
+# Tunable parameters. moment_of_inertia scales all three axes of the
+# default inertia; the _x/_y/_z variants set one axis in kg·m².
+PARAMETERS = ('mass', 'drag_coefficient', 'max_motor_thrust', 'angular_damping', 'moment_of_inertia',
+              'moment_of_inertia_x', 'moment_of_inertia_y', 'moment_of_inertia_z',
+              'roll_sensitivity', 'pitch_sensitivity', 'yaw_sensitivity')
+
+METRICS = ('hover_throttle', 'max_speed', 'time_to_max_speed', 'speed_overshoot',
+           'battery_drain', 'min_altitude', 'final_altitude', 'collisions')
+
+
+def configure_drone(params):
+    """A DronePhysics with the given parameter values applied."""
+    drone = DronePhysics()
+    inertia = drone.moment_of_inertia.astype(float)
+    for name, value in params.items():
+        if name == 'moment_of_inertia':
+            inertia = inertia * value
+        elif name.startswith('moment_of_inertia_'):
+            inertia['xyz'.index(name[-1])] = value
+        elif name in PARAMETERS:
+            setattr(drone, name, float(value))
+        else:
+            raise ValueError(f"Unknown sweep parameter {name!r}")
+    drone.moment_of_inertia = inertia
+    return drone
+
+
+class TraceRecorder:
+    """
+    Recorder for HeadlessSimulator that keeps the per-tick speed and
+    altitude of one run in preallocated arrays.
+    """
+
+    def __init__(self, ticks):
+        self.speed = np.zeros(ticks)
+        self.altitude = np.zeros(ticks)
+
+    def record(self, tick, drone, sticks, digest=None):
+        velocity = drone.velocity
+        self.speed[tick - 1] = math.sqrt(velocity[0] ** 2 + velocity[1] ** 2 + velocity[2] ** 2)
+        self.altitude[tick - 1] = drone.position[2]
+
+
+def flight_metrics(drone, trace, dt, collisions):
+    """
+    Metrics of one run. hover_throttle is the stick throttle that holds a
+    level drone in the air (above 1.0 it cannot hover); time_to_max_speed is
+    the time to reach 90% of the top speed; speed_overshoot is how far the
+    top speed exceeds the mean speed over the last tenth of the run, as a
+    fraction of it; battery_drain is in mAh per minute.
+    """
+    seconds = len(trace.speed) * dt
+    max_speed = float(trace.speed.max())
+    settled = float(trace.speed[-max(1, len(trace.speed) // 10):].mean())
+    reached = np.flatnonzero(trace.speed >= 0.9 * max_speed)
+    return {
+        'hover_throttle': 2.0 * drone.mass * drone.g / (4.0 * drone.max_motor_thrust) - 1.0,
+        'max_speed': max_speed,
+        'time_to_max_speed': float((reached[0] + 1) * dt) if len(reached) else math.nan,
+        'speed_overshoot': max_speed / settled - 1.0 if settled > 1e-6 else math.nan,
+        'battery_drain': (drone.battery_capacity - drone.battery_remaining) / seconds * 60.0,
+        'min_altitude': float(trace.altitude.min()),
+        'final_altitude': float(trace.altitude[-1]),
+        'collisions': collisions,
+    }
+
+
+class SweepSpec:
+    """
+    Which configurations to run and how to fly them.
+
+    Configurations are numbered 0..count-1 and can be generated for any
+    index range on their own, so no process ever holds the full list: grid
+    configurations are unravelled from the index, and sampled ones are
+    drawn from a generator seeded with (seed, index).
+    """
+
+    def __init__(self, grid=None, sample=None, profile=None, seconds=10.0, dt=None, seed=0):
+        if (grid is None) == (sample is None):
+            raise ValueError("A sweep needs exactly one of a grid or a sample spec")
+        self.grid = {name: [float(v) for v in values] for name, values in (grid or {}).items()}
+        self.sample = sample
+        self.profile = [tuple(float(v) for v in keyframe) for keyframe in (profile or DEMO_KEYFRAMES)]
+        self.seconds = float(seconds)
+        self.dt = dt
+        # Environment seed shared by every run
+        self.seed = seed
+        for name in self.parameter_names:
+            if name not in PARAMETERS:
+                raise ValueError(f"Unknown sweep parameter {name!r}; choose from {', '.join(PARAMETERS)}")
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(grid=data.get('grid'), sample=data.get('sample'), profile=data.get('profile'),
+                   seconds=data.get('seconds', 10.0), dt=data.get('dt'), seed=data.get('seed', 0))
+
+    def to_dict(self):
+        return {'grid': self.grid or None, 'sample': self.sample, 'profile': self.profile,
+                'seconds': self.seconds, 'dt': self.dt, 'seed': self.seed}
+
+    @property
+    def parameter_names(self):
+        if self.sample is not None:
+            return sorted(self.sample['ranges'])
+        return list(self.grid)
+
+    @property
+    def count(self):
+        if self.sample is not None:
+            return int(self.sample['count'])
+        return math.prod(len(values) for values in self.grid.values())
+
+    def configurations(self, start, stop):
+        """{parameter: (stop - start,) array} for configurations start..stop-1."""
+        names = self.parameter_names
+        if self.sample is not None:
+            seed = self.sample.get('seed', 0)
+            lows = np.array([self.sample['ranges'][name][0] for name in names], dtype=float)
+            highs = np.array([self.sample['ranges'][name][1] for name in names], dtype=float)
+            values = np.array([np.random.default_rng([seed, index]).uniform(lows, highs)
+                               for index in range(start, stop)]).reshape(stop - start, len(names))
+            return {name: values[:, i] for i, name in enumerate(names)}
+        shape = [len(self.grid[name]) for name in names]
+        indices = np.unravel_index(np.arange(start, stop), shape)
+        return {name: np.asarray(self.grid[name])[index] for name, index in zip(names, indices)}
+
+
+def run_batch(spec_data, start, stop):
+    """
+    Fly configurations start..stop-1 of a spec (runs in a worker process).
+    Returns {column: array} with the parameters, metrics and indices.
+    """
+    spec = SweepSpec.from_dict(spec_data)
+    configurations = spec.configurations(start, stop)
+    columns = {name: np.full(stop - start, math.nan) for name in METRICS}
+    for row in range(stop - start):
+        params = {name: float(values[row]) for name, values in configurations.items()}
+        simulator = HeadlessSimulator(input_source=ScriptedInput(spec.profile),
+                                      physics_factory=lambda: configure_drone(params),
+                                      dt=spec.dt, seed=spec.seed)
+        ticks = int(round(spec.seconds / simulator.dt))
+        trace = TraceRecorder(ticks)
+        simulator.recorder = trace
+        state = simulator.step(n_steps=ticks)
+        metrics = flight_metrics(simulator.drone_physics, trace, simulator.dt, state['collisions'])
+        for name, value in metrics.items():
+            columns[name][row] = value
+    columns.update(configurations)
+    columns['index'] = np.arange(start, stop)
+    return columns
+
+
+class Sweep:
+    """
+    Runs a SweepSpec in batches over a process pool, writing every finished
+    batch to partial_dir so an interrupted sweep can resume.
+    """
+
+    def __init__(self, spec, out_path, workers=None, batch_size=8):
+        self.spec = spec
+        self.out_path = out_path
+        self.partial_dir = out_path + '.partial'
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_count = math.ceil(spec.count / batch_size)
+
+    def batch_path(self, batch):
+        return os.path.join(self.partial_dir, f"batch_{batch:06d}.npz")
+
+    def prepare(self):
+        """
+        Create the partial directory, or check a leftover one belongs to this
+        sweep. Returns the batches still to run.
+        """
+        settings = {'spec': self.spec.to_dict(), 'batch_size': self.batch_size}
+        settings_path = os.path.join(self.partial_dir, 'sweep.json')
+        if os.path.isdir(self.partial_dir):
+            with open(settings_path) as file:
+                if json.load(file) != json.loads(json.dumps(settings)):
+                    raise ValueError(f"{self.partial_dir} holds a different sweep; remove it to start over")
+        else:
+            os.makedirs(self.partial_dir)
+            with open(settings_path, 'w') as file:
+                json.dump(settings, file)
+        return [batch for batch in range(self.batch_count) if not os.path.exists(self.batch_path(batch))]
+
+    def write_batch(self, batch, columns):
+        # Write to a temporary file first so a crash never leaves a truncated batch
+        path = self.batch_path(batch)
+        temporary = path + '.tmp.npz'
+        np.savez(temporary, **columns)
+        os.replace(temporary, path)
+
+    def run(self):
+        pending = self.prepare()
+        done = self.batch_count - len(pending)
+        if done:
+            print(f"Resuming: {done} of {self.batch_count} batches already done")
+        spec_data = self.spec.to_dict()
+        start_time = time.perf_counter()
+        finished = 0
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.workers) as pool:
+            # Keep at most two batches per worker in flight
+            in_flight = {}
+            queue = iter(pending)
+            while True:
+                while len(in_flight) < 2 * self.workers:
+                    batch = next(queue, None)
+                    if batch is None:
+                        break
+                    start = batch * self.batch_size
+                    stop = min(start + self.batch_size, self.spec.count)
+                    in_flight[pool.submit(run_batch, spec_data, start, stop)] = batch
+                if not in_flight:
+                    break
+                completed, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in completed:
+                    self.write_batch(in_flight.pop(future), future.result())
+                    finished += 1
+                elapsed = time.perf_counter() - start_time
+                print(f"\r{done + finished}/{self.batch_count} batches, "
+                      f"{finished * self.batch_size / elapsed:.1f} configurations/s", end='', flush=True)
+        if finished:
+            print()
+        return self.merge()
+
+    def merge(self):
+        """Concatenate the batch files, in order, into the output NPZ."""
+        parts = {}
+        for batch in range(self.batch_count):
+            with np.load(self.batch_path(batch)) as data:
+                for name in data.files:
+                    parts.setdefault(name, []).append(data[name])
+        columns = {name: np.concatenate(arrays) for name, arrays in parts.items()}
+        columns['spec'] = np.array(json.dumps(self.spec.to_dict()))
+        np.savez(self.out_path, **columns)
+        shutil.rmtree(self.partial_dir)
+        return columns
+
+
+def parse_grid(items):
+    grid = {}
+    for item in items:
+        name, _, values = item.partition('=')
+        grid[name] = [float(value) for value in values.split(',')]
+    return grid
+
+
+def parse_ranges(items):
+    ranges = {}
+    for item in items:
+        name, _, bounds = item.partition('=')
+        low, _, high = bounds.partition(':')
+        ranges[name] = [float(low), float(high)]
+    return ranges
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep drone parameters over scripted headless flights")
+    parser.add_argument('--spec', default=None, help="JSON sweep spec (grid or sample, profile, seconds)")
+    parser.add_argument('--grid', action='append', default=[], metavar='NAME=V1,V2,...',
+                        help="grid values for a parameter (repeatable)")
+    parser.add_argument('--sample', action='append', default=[], metavar='NAME=LOW:HIGH',
+                        help="uniform sampling range for a parameter (repeatable)")
+    parser.add_argument('--samples', type=int, default=100, help="configurations to sample")
+    parser.add_argument('--sample-seed', type=int, default=0)
+    parser.add_argument('--seconds', type=float, default=10.0, help="simulated seconds per run")
+    parser.add_argument('--out', required=True, help="output NPZ file")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--batch-size', type=int, default=8, help="configurations per worker task")
+    args = parser.parse_args()
+
+    if args.spec:
+        with open(args.spec) as file:
+            spec = SweepSpec.from_dict(json.load(file))
+    elif args.grid:
+        spec = SweepSpec(grid=parse_grid(args.grid), seconds=args.seconds)
+    elif args.sample:
+        spec = SweepSpec(sample={'count': args.samples, 'seed': args.sample_seed,
+                                 'ranges': parse_ranges(args.sample)}, seconds=args.seconds)
+    else:
+        parser.error("give --spec, --grid or --sample")
+
+    print(f"{spec.count} configurations of {', '.join(spec.parameter_names)}, {spec.seconds:g} s each")
+    columns = Sweep(spec, args.out, workers=args.workers, batch_size=args.batch_size).run()
+    print(f"Wrote {len(columns['index'])} results to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
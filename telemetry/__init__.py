@@ -0,0 +1,4 @@
+from .packet import PACKET_SIZE, pack, unpack
+from .server import TelemetryServer
+
+__all__ = ['TelemetryServer', 'PACKET_SIZE', 'pack', 'unpack']
\ No newline at end of file
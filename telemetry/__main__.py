@@ -0,0 +1,58 @@
+"""
+Print live telemetry from a running simulator (main.py --telemetry PORT).
+
+Subscribes over UDP and renews the subscription while it runs.
+
+Run from the repository root:
+    python -m telemetry
+    python -m telemetry --port 9870 --rate 5
+"""
+import argparse
+import socket
+import time
+
+from telemetry.packet import unpack
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print live simulator telemetry")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9870, help="the simulator's telemetry UDP port")
+    parser.add_argument('--rate', type=float, default=5.0, help="packets per second to ask for")
+    parser.add_argument('--renew', type=float, default=2.0, help="seconds between subscription renewals")
+    args = parser.parse_args()
+
+    server = (args.host, args.port)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(0.5)
+    request = f"subscribe {args.rate:g}".encode('ascii')
+    renewed = -float('inf')
+    try:
+        while True:
+            if time.monotonic() - renewed >= args.renew:
+                sock.sendto(request, server)
+                renewed = time.monotonic()
+            try:
+                data, _ = sock.recvfrom(4096)
+            except socket.timeout:
+                continue
+            except ConnectionRefusedError:
+                # Nothing listening yet; keep asking
+                time.sleep(args.renew)
+                continue
+            packet = unpack(data)
+            x, y, z = packet['position']
+            roll, pitch, yaw = packet['rotation']
+            throttle = packet['sticks'][0]
+            print(f"t={packet['sim_time']:8.2f}s  pos=({x:7.2f}, {y:7.2f}, {z:6.2f})  "
+                  f"rpy=({roll:+.2f}, {pitch:+.2f}, {yaw:.2f})  throttle={throttle:+.2f}  "
+                  f"battery={packet['battery_remaining']:6.0f} mAh  fps={packet['fps']:5.1f}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.sendto(b"unsubscribe", server)
+        sock.close()
+
+
+if __name__ == "__main__":
+    main()
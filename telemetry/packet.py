@@ -0,0 +1,72 @@
+"""
+Binary telemetry packet format.
+
+One packet is one fixed-size little-endian struct, the same over UDP (one
+datagram per packet) and WebSocket (one binary message per packet):
+
+    magic      4s   b"DTEL"
+    version    u16
+    sequence   u32  counts packed packets (each subscriber gets a subset)
+    tick       u32  physics tick of the state
+    sim_time   f64  simulated seconds
+    then float32: position (3), velocity (3), rotation (3, roll/pitch/yaw),
+    angular_velocity (3), motor_forces (4), battery_remaining,
+    sticks (4, throttle/roll/pitch/yaw as applied), and the render loop's
+    frame_time, fps, input_latency and physics_time (seconds of physics
+    work in the last frame).
+
+Floats are single precision: telemetry is for display and logging, exact
+replays come from raw flight logs (see recording.format).
+"""
+import struct
+
+MAGIC = b"DTEL"
+FORMAT_VERSION = 1
+
+# (name, float count) of the float32 fields, in packet order
+FLOAT_FIELDS = (
+    ('position', 3),
+    ('velocity', 3),
+    ('rotation', 3),
+    ('angular_velocity', 3),
+    ('motor_forces', 4),
+    ('battery_remaining', 1),
+    ('sticks', 4),
+    ('frame_time', 1),
+    ('fps', 1),
+    ('input_latency', 1),
+    ('physics_time', 1),
+)
+FLOAT_COUNT = sum(count for _, count in FLOAT_FIELDS)
+
+PACKET = struct.Struct(f'<4sHIId{FLOAT_COUNT}f')
+PACKET_SIZE = PACKET.size
+
+# Frame timings before the render loop reports any
+NO_FRAME = (0.0, 0.0, 0.0, 0.0)
+
+
+def pack(sequence, snapshot, sticks, frame=NO_FRAME):
+    """
+    Packet bytes for a StateSnapshot (or anything with its fields), the
+    sticks applied on its tick and the frame timings tuple.
+    """
+    return PACKET.pack(MAGIC, FORMAT_VERSION, sequence & 0xFFFFFFFF, snapshot.tick & 0xFFFFFFFF,
+                       snapshot.sim_time, *snapshot.position.tolist(), *snapshot.velocity.tolist(),
+                       *snapshot.rotation.tolist(), *snapshot.angular_velocity.tolist(),
+                       *snapshot.motor_forces.tolist(), snapshot.battery_remaining, *sticks, *frame)
+
+
+def unpack(data):
+    """A received packet as a dict of fields (tuples for vectors)."""
+    if len(data) != PACKET_SIZE or not data.startswith(MAGIC):
+        raise ValueError("Not a telemetry packet")
+    values = PACKET.unpack(data)
+    if values[1] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported telemetry version {values[1]}")
+    packet = {'sequence': values[2], 'tick': values[3], 'sim_time': values[4]}
+    i = 5
+    for name, count in FLOAT_FIELDS:
+        packet[name] = values[i] if count == 1 else values[i:i + count]
+        i += count
+    return packet
@@ -0,0 +1,367 @@
+"""
+Live telemetry over UDP and WebSocket.
+
+TelemetryServer runs an asyncio event loop on its own thread and streams
+packets (see telemetry.packet) to any number of local subscribers:
+
+  - UDP: a client sends the datagram b"subscribe" (or b"subscribe 20" for
+    20 packets/s) to the UDP port and receives one datagram per packet. A
+    subscription lapses after udp_timeout seconds unless it is sent again;
+    b"unsubscribe" ends it at once.
+  - WebSocket: a client connects to ws://host:websocket_port/?rate=20 and
+    receives one binary message per packet.
+
+The simulation thread only calls publish(), which returns at once unless a
+packet is due: it packs the state into the latest-packet slot, nothing
+else. Each subscriber is sent the latest packet at its own rate by the
+loop thread; a client whose socket buffer is full (it reads too slowly)
+skips packets, counted in dropped, instead of holding anything up.
+"""
+import asyncio
+import base64
+import hashlib
+import math
+import socket
+import threading
+import time
+from urllib.parse import urlsplit, parse_qs
+
+from telemetry.packet import NO_FRAME, pack
+
+WEBSOCKET_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def websocket_frame(payload, opcode=0x2):
+    """An unmasked, final server-to-client frame (binary by default)."""
+    length = len(payload)
+    if length < 126:
+        header = bytes((0x80 | opcode, length))
+    elif length < 1 << 16:
+        header = bytes((0x80 | opcode, 126)) + length.to_bytes(2, 'big')
+    else:
+        header = bytes((0x80 | opcode, 127)) + length.to_bytes(8, 'big')
+    return header + payload
+
+
+async def read_websocket_frame(reader):
+    """(opcode, payload) of the next client frame, unmasked."""
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length = int.from_bytes(await reader.readexactly(2), 'big')
+    elif length == 127:
+        length = int.from_bytes(await reader.readexactly(8), 'big')
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask is not None:
+        payload = bytes(b ^ mask[i & 3] for i, b in enumerate(payload))
+    return first & 0x0F, payload
+
+
+class Subscriber:
+    """One client: where packets go, its rate limit and counters."""
+
+    def __init__(self, kind, address, rate, transport, expires=None):
+        self.kind = kind
+        self.address = address
+        self.interval = 1.0 / rate
+        self.transport = transport
+        # Loop time of this subscriber's next packet, and the last sequence sent
+        self.next_due = 0.0
+        self.sequence = None
+        # UDP subscriptions lapse at this loop time unless renewed
+        self.expires = expires
+        self.sent = 0
+        self.dropped = 0
+
+    @property
+    def rate(self):
+        return 1.0 / self.interval
+
+    def write(self, packet, frame):
+        """Send a packet: the datagram over UDP, its WebSocket frame otherwise."""
+        if self.kind == 'udp':
+            self.transport.sendto(packet, self.address)
+        else:
+            self.transport.write(frame)
+
+
+class _UDPProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+
+    def datagram_received(self, data, address):
+        self.server._udp_request(data, address)
+
+    def error_received(self, exc):
+        # e.g. port unreachable from a client that went away; it lapses on its own
+        pass
+
+
+class TelemetryServer:
+    """
+    Publishes flight state to UDP and WebSocket subscribers on localhost.
+
+    Rates are packets per second per subscriber: default_rate when a client
+    asks for none, never more than max_rate. A port of 0 picks a free one
+    (see udp_port and websocket_port after start()); None disables that
+    transport. Subscribers whose socket has more than max_buffered bytes
+    queued skip packets until it drains.
+    """
+
+    def __init__(self, host='127.0.0.1', udp_port=9870, websocket_port=9871, default_rate=30.0, max_rate=120.0,
+                 max_buffered=64 * 1024, udp_timeout=5.0):
+        self.host = host
+        self.udp_port = udp_port
+        self.websocket_port = websocket_port
+        self.default_rate = default_rate
+        self.max_rate = max_rate
+        self.max_buffered = max_buffered
+        self.udp_timeout = udp_timeout
+
+        # (kind, address) -> Subscriber; only touched on the loop thread
+        self.subscribers = {}
+        # Open WebSocket connections, handshaken or not (loop thread only)
+        self._connections = set()
+        # Latest (sequence, packet), replaced as a whole by publish()
+        self.latest = (0, None)
+        # Frame timings from the render loop, see update_frame()
+        self.frame = NO_FRAME
+
+        # Publish-side rate limit: pack at twice the fastest subscriber's
+        # rate (the interval is written by the loop thread only)
+        self._pack_interval = math.inf
+        self._last_pack = -math.inf
+        self._sequence = 0
+
+        # Counters, including subscribers that have left
+        self.sent_count = 0
+        self.dropped_count = 0
+
+        self._thread = None
+        self._loop = None
+        self._udp = None
+        self._stopping = None
+        self._ready = threading.Event()
+        self._error = None
+
+    @property
+    def subscriber_count(self):
+        return len(self.subscribers)
+
+    def start(self):
+        """Start the loop thread; returns once the sockets are bound (raises OSError if they cannot be)."""
+        if self._thread is not None:
+            return
+        self._ready.clear()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            self._thread.join()
+            self._thread = None
+            raise self._error
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._stopping.set)
+        self._thread.join()
+        self._thread = None
+
+    def publish(self, snapshot, sticks):
+        """
+        Offer the state after a physics tick (a StateSnapshot and the sticks
+        applied on it). Called from the simulation thread; packs a packet
+        only when a subscriber may be due for one, and never blocks.
+        """
+        now = time.perf_counter()
+        if now - self._last_pack < self._pack_interval:
+            return
+        self._last_pack = now
+        self._sequence += 1
+        self.latest = (self._sequence, pack(self._sequence, snapshot, sticks, self.frame))
+
+    def update_frame(self, frame_time, fps, input_latency, physics_time):
+        """Frame timings from the render loop, sent with the following packets."""
+        self.frame = (frame_time, fps, input_latency, physics_time)
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        try:
+            loop.run_until_complete(self._serve())
+        finally:
+            loop.close()
+
+    async def _serve(self):
+        loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        websocket_server = None
+        try:
+            if self.udp_port is not None:
+                self._udp, _ = await loop.create_datagram_endpoint(
+                    lambda: _UDPProtocol(self), local_addr=(self.host, self.udp_port))
+                self.udp_port = self._udp.get_extra_info('sockname')[1]
+            if self.websocket_port is not None:
+                websocket_server = await asyncio.start_server(self._serve_websocket, self.host, self.websocket_port)
+                self.websocket_port = websocket_server.sockets[0].getsockname()[1]
+        except OSError as error:
+            self._error = error
+            if self._udp is not None:
+                self._udp.close()
+            self._ready.set()
+            return
+        self._ready.set()
+
+        pump = asyncio.ensure_future(self._pump())
+        await self._stopping.wait()
+        pump.cancel()
+        if websocket_server is not None:
+            websocket_server.close()
+        for subscriber in list(self.subscribers.values()):
+            if subscriber.kind == 'websocket':
+                subscriber.transport.write(websocket_frame(b"\x03\xe9", opcode=0x8))  # 1001: going away
+        # Closing the connections ends their handlers; let them finish before the loop closes
+        for writer in list(self._connections):
+            writer.close()
+        self.subscribers.clear()
+        if self._udp is not None:
+            self._udp.close()
+        handlers = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        if handlers:
+            _, pending = await asyncio.wait(handlers, timeout=0.5)
+            if pending:
+                # A client that is not reading never drains its buffer: cut it off
+                for writer in list(self._connections):
+                    writer.transport.abort()
+                await asyncio.wait(pending)
+
+    def _add(self, subscriber):
+        subscriber.next_due = self._loop.time()
+        self.subscribers[(subscriber.kind, subscriber.address)] = subscriber
+        self._rates_changed()
+
+    def _remove(self, subscriber):
+        if self.subscribers.get((subscriber.kind, subscriber.address)) is subscriber:
+            del self.subscribers[(subscriber.kind, subscriber.address)]
+            self._rates_changed()
+
+    def _rates_changed(self):
+        fastest = max((s.rate for s in self.subscribers.values()), default=0.0)
+        self._pack_interval = 0.5 / fastest if fastest else math.inf
+
+    def _clamp_rate(self, rate):
+        if rate is None or not rate > 0:
+            return self.default_rate
+        return min(rate, self.max_rate)
+
+    def _udp_request(self, data, address):
+        words = data.split()
+        if not words:
+            return
+        command = words[0].lower()
+        if command == b"subscribe":
+            try:
+                rate = float(words[1]) if len(words) > 1 else None
+            except ValueError:
+                rate = None
+            rate = self._clamp_rate(rate)
+            expires = self._loop.time() + self.udp_timeout
+            subscriber = self.subscribers.get(('udp', address))
+            if subscriber is None:
+                self._add(Subscriber('udp', address, rate, self._udp, expires))
+            else:
+                # A renewal, possibly at a new rate
+                subscriber.expires = expires
+                if subscriber.rate != rate:
+                    subscriber.interval = 1.0 / rate
+                    self._rates_changed()
+        elif command == b"unsubscribe":
+            subscriber = self.subscribers.get(('udp', address))
+            if subscriber is not None:
+                self._remove(subscriber)
+
+    async def _serve_websocket(self, reader, writer):
+        subscriber = None
+        self._connections.add(writer)
+        try:
+            try:
+                request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5.0)
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+            lines = request.decode('latin-1').split("\r\n")
+            parts = lines[0].split()
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            key = headers.get('sec-websocket-key')
+            if len(parts) < 2 or key is None or headers.get('upgrade', '').lower() != 'websocket':
+                writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                return
+            accept = base64.b64encode(hashlib.sha1(key.encode('ascii') + WEBSOCKET_GUID).digest())
+            writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                         b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+
+            rate = parse_qs(urlsplit(parts[1]).query).get('rate', [None])[0]
+            try:
+                rate = float(rate) if rate is not None else None
+            except ValueError:
+                rate = None
+            # A small kernel buffer too, so a slow client backs up where it is seen
+            writer.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.max_buffered)
+            writer.transport.set_write_buffer_limits(high=self.max_buffered)
+            subscriber = Subscriber('websocket', writer.get_extra_info('peername'), self._clamp_rate(rate),
+                                    writer.transport)
+            self._add(subscriber)
+
+            # Nothing is expected from the client but pings and a close
+            while True:
+                opcode, payload = await read_websocket_frame(reader)
+                if opcode == 0x8:
+                    writer.write(websocket_frame(payload[:2], opcode=0x8))
+                    return
+                if opcode == 0x9:
+                    writer.write(websocket_frame(payload, opcode=0xA))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if subscriber is not None:
+                self._remove(subscriber)
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _pump(self):
+        """Send every due subscriber the latest packet, then sleep until the next is due."""
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self.subscribers:
+                # Idle: look for new subscribers now and then
+                await asyncio.sleep(0.05)
+                continue
+            now = loop.time()
+            sequence, packet = self.latest
+            # Framed once for all WebSocket subscribers
+            frame = websocket_frame(packet) if packet is not None else None
+            next_due = math.inf
+            for subscriber in list(self.subscribers.values()):
+                if subscriber.expires is not None and now > subscriber.expires:
+                    self._remove(subscriber)
+                    continue
+                if now >= subscriber.next_due:
+                    if packet is not None and sequence != subscriber.sequence:
+                        if subscriber.transport.get_write_buffer_size() > self.max_buffered:
+                            # Back-pressure: this client is behind, skip the packet
+                            subscriber.dropped += 1
+                            self.dropped_count += 1
+                        else:
+                            subscriber.write(packet, frame)
+                            subscriber.sent += 1
+                            self.sent_count += 1
+                        subscriber.sequence = sequence
+                    # Keep the cadence, but do not burst to catch up after a late wake-up
+                    subscriber.next_due = max(subscriber.next_due + subscriber.interval, now)
+                next_due = min(next_due, subscriber.next_due)
+            await asyncio.sleep(max(next_due - loop.time(), 0.0))
@@ -1,3 +1,19 @@
-from .math_utils import rotation_matrix_from_euler
+from .profiler import FrameProfiler
+from .math_utils import (
+    rotation_matrix_from_euler,
+    rotation_matrices_from_euler,
+    quaternion_multiply,
+    quaternion_from_euler,
+    euler_from_quaternion,
+    rotation_matrix_from_quaternion,
+)
 
-__all__ = ['rotation_matrix_from_euler']
\ No newline at end of file
+__all__ = [
+    'rotation_matrix_from_euler',
+    'rotation_matrices_from_euler',
+    'quaternion_multiply',
+    'quaternion_from_euler',
+    'euler_from_quaternion',
+    'rotation_matrix_from_quaternion',
+    'FrameProfiler',
+]
\ No newline at end of file
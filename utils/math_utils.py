@@ -6,27 +6,92 @@ def rotation_matrix_from_euler(roll, pitch, yaw):
     Create rotation matrix from Euler angles (roll, pitch, yaw) in radians.
     Returns a 3x3 rotation matrix.
     """
-    # Rotation around X-axis (roll)
-    R_x = np.array([
-        [1, 0, 0],
-        [0, math.cos(roll), -math.sin(roll)],
-        [0, math.sin(roll), math.cos(roll)]
+    sr, cr = math.sin(roll), math.cos(roll)
+    sp, cp = math.sin(pitch), math.cos(pitch)
+    sy, cy = math.sin(yaw), math.cos(yaw)
+
+    # Combined rotation matrix (yaw -> pitch -> roll), i.e. R_z @ R_y @ R_x
+    # written out in closed form to avoid building three matrices and two matmuls
+    return np.array([
+        [cy * cp, cy * sp * sr - sy * cr, sy * sr + cy * sp * cr],
+        [sy * cp, sy * sp * sr + cy * cr, sy * sp * cr - cy * sr],
+        [-sp, cp * sr, cp * cr]
     ])
 
-    # Rotation around Y-axis (pitch)
-    R_y = np.array([
-        [math.cos(pitch), 0, math.sin(pitch)],
-        [0, 1, 0],
-        [-math.sin(pitch), 0, math.cos(pitch)]
+
+def rotation_matrices_from_euler(angles):
+    """
+    Vectorized rotation_matrix_from_euler for an (N, 3) array of roll, pitch, yaw.
+    Returns an (N, 3, 3) array of rotation matrices.
+    """
+    angles = np.asarray(angles, dtype=float)
+    sr, cr = np.sin(angles[:, 0]), np.cos(angles[:, 0])
+    sp, cp = np.sin(angles[:, 1]), np.cos(angles[:, 1])
+    sy, cy = np.sin(angles[:, 2]), np.cos(angles[:, 2])
+
+    # Expanded form of R_z @ R_y @ R_x
+    R = np.empty((len(angles), 3, 3))
+    R[:, 0, 0] = cy * cp
+    R[:, 0, 1] = cy * sp * sr - sy * cr
+    R[:, 0, 2] = sy * sr + cy * sp * cr
+    R[:, 1, 0] = sy * cp
+    R[:, 1, 1] = sy * sp * sr + cy * cr
+    R[:, 1, 2] = sy * sp * cr - cy * sr
+    R[:, 2, 0] = -sp
+    R[:, 2, 1] = cp * sr
+    R[:, 2, 2] = cp * cr
+    return R
+
+
+def quaternion_multiply(q1, q2):
+    """
+    Hamilton product of two quaternions given as (w, x, y, z).
+    """
+    w1, x1, y1, z1 = q1
+    w2, x2, y2, z2 = q2
+    return np.array([
+        w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+        w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+        w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+        w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2
     ])
 
-    # Rotation around Z-axis (yaw)
-    R_z = np.array([
-        [math.cos(yaw), -math.sin(yaw), 0],
-        [math.sin(yaw), math.cos(yaw), 0],
-        [0, 0, 1]
+
+def quaternion_from_euler(roll, pitch, yaw):
+    """
+    Create a unit quaternion (w, x, y, z) with the same orientation as
+    rotation_matrix_from_euler(roll, pitch, yaw).
+    """
+    cr, sr = math.cos(roll / 2), math.sin(roll / 2)
+    cp, sp = math.cos(pitch / 2), math.sin(pitch / 2)
+    cy, sy = math.cos(yaw / 2), math.sin(yaw / 2)
+    return np.array([
+        cr * cp * cy + sr * sp * sy,
+        sr * cp * cy - cr * sp * sy,
+        cr * sp * cy + sr * cp * sy,
+        cr * cp * sy - sr * sp * cy
     ])
 
-    # Combined rotation matrix (yaw -> pitch -> roll)
-    R = R_z @ R_y @ R_x
-    return R
\ No newline at end of file
+
+def euler_from_quaternion(q):
+    """
+    Convert a unit quaternion (w, x, y, z) to (roll, pitch, yaw) in radians.
+    Yaw is returned in [0, 2π) like DronePhysics.rotation.
+    """
+    w, x, y, z = q
+    roll = math.atan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y))
+    pitch = math.asin(max(-1.0, min(1.0, 2 * (w * y - z * x))))
+    yaw = math.atan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z)) % (2 * math.pi)
+    return np.array([roll, pitch, yaw])
+
+
+def rotation_matrix_from_quaternion(q):
+    """
+    Create a 3x3 rotation matrix from a unit quaternion (w, x, y, z).
+    """
+    w, x, y, z = q
+    return np.array([
+        [1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)],
+        [2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)],
+        [2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)]
+    ])
@@ -0,0 +1,126 @@
+import gc
+import json
+import sys
+import time
+import numpy as np
+
+
+class FrameProfiler:
+    """
+    Per-frame stage timings in a fixed-size ring buffer.
+
+    The main loop calls begin_frame(), then lap(stage) after each stage (one
+    perf_counter call: the stage's time is the time since the previous lap),
+    and end_frame(). Work done on other threads, e.g. physics ticks, is
+    reported per frame with add(stage, seconds).
+
+    Alongside the timings each frame records the change in
+    sys.getallocatedblocks() (net memory blocks allocated by the frame) and
+    the number of garbage collections it triggered; both are cheap counters,
+    not a full allocation trace.
+    """
+
+    def __init__(self, stages, capacity=600, thread_stages=()):
+        self.stages = tuple(stages) + tuple(thread_stages)
+        self.thread_stages = tuple(thread_stages)
+        self.index = {stage: i for i, stage in enumerate(self.stages)}
+        self.capacity = capacity
+
+        # Ring buffers, one row per frame
+        self.durations = np.zeros((capacity, len(self.stages)))
+        self.starts = np.zeros((capacity, len(self.stages)))
+        self.frame_starts = np.zeros(capacity)
+        self.frame_times = np.zeros(capacity)
+        self.allocated_blocks = np.zeros(capacity, dtype=np.int64)
+        self.gc_collections = np.zeros(capacity, dtype=np.int64)
+        self.frame_count = 0
+
+        self._row = 0
+        self._frame_start = 0.0
+        self._last_lap = 0.0
+        self._blocks = 0
+        self._collections = 0
+        self.origin = time.perf_counter()
+
+    def begin_frame(self):
+        self._row = self.frame_count % self.capacity
+        self.durations[self._row] = 0.0
+        self.starts[self._row] = 0.0
+        self._blocks = sys.getallocatedblocks()
+        self._collections = self.gc_collection_count()
+        now = time.perf_counter()
+        self._frame_start = now
+        self._last_lap = now
+
+    def lap(self, stage):
+        """End the current stage: charge the time since the last lap to it."""
+        now = time.perf_counter()
+        column = self.index[stage]
+        self.starts[self._row, column] = self._last_lap
+        self.durations[self._row, column] += now - self._last_lap
+        self._last_lap = now
+
+    def add(self, stage, seconds):
+        """Charge time measured elsewhere (e.g. on the physics thread) to this frame."""
+        column = self.index[stage]
+        self.starts[self._row, column] = self._frame_start
+        self.durations[self._row, column] += seconds
+
+    def end_frame(self):
+        now = time.perf_counter()
+        row = self._row
+        self.frame_starts[row] = self._frame_start
+        self.frame_times[row] = now - self._frame_start
+        self.allocated_blocks[row] = sys.getallocatedblocks() - self._blocks
+        self.gc_collections[row] = self.gc_collection_count() - self._collections
+        self.frame_count += 1
+
+    @staticmethod
+    def gc_collection_count():
+        return sum(generation['collections'] for generation in gc.get_stats())
+
+    def recent_rows(self):
+        """Ring buffer rows of the recorded frames, oldest first."""
+        count = min(self.frame_count, self.capacity)
+        return (self.frame_count - count + np.arange(count)) % self.capacity
+
+    def percentiles(self, percents=(50, 95, 99)):
+        """
+        {stage: per-percentile milliseconds} over the frames in the buffer,
+        plus 'frame' for whole frames and 'allocated_blocks' for the block counts.
+        """
+        rows = self.recent_rows()
+        if len(rows) == 0:
+            return {}
+        stage_ms = np.percentile(self.durations[rows], percents, axis=0) * 1000.0
+        result = {stage: tuple(stage_ms[:, i]) for i, stage in enumerate(self.stages)}
+        result['frame'] = tuple(np.percentile(self.frame_times[rows], percents) * 1000.0)
+        result['allocated_blocks'] = tuple(np.percentile(self.allocated_blocks[rows], percents))
+        return result
+
+    def export_chrome_trace(self, path):
+        """
+        Write the buffered frames as a Chrome trace (chrome://tracing or
+        Perfetto): one complete event per stage per frame, main-loop stages on
+        one track and other-thread stages on another, plus allocation counters.
+        """
+        events = []
+        thread_ids = {stage: (2 if stage in self.thread_stages else 1) for stage in self.stages}
+        for row in self.recent_rows():
+            frame_start = (self.frame_starts[row] - self.origin) * 1e6
+            events.append({'name': 'frame', 'ph': 'X', 'pid': 1, 'tid': 0,
+                           'ts': frame_start, 'dur': self.frame_times[row] * 1e6})
+            for stage, column in self.index.items():
+                duration = self.durations[row, column]
+                if duration <= 0.0:
+                    continue
+                events.append({'name': stage, 'ph': 'X', 'pid': 1, 'tid': thread_ids[stage],
+                               'ts': (self.starts[row, column] - self.origin) * 1e6,
+                               'dur': duration * 1e6})
+            events.append({'name': 'memory', 'ph': 'C', 'pid': 1, 'ts': frame_start,
+                           'args': {'allocated_blocks': int(self.allocated_blocks[row]),
+                                    'gc_collections': int(self.gc_collections[row])}})
+        metadata = [{'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': name}}
+                    for tid, name in ((0, 'frames'), (1, 'main loop'), (2, 'physics thread'))]
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}, file)